@@ -12,6 +12,7 @@ from huggingface_hub import InferenceClient
 import logging
 import mysql.connector
 import requests
+from provider_client import get_provider_client
 
 # Load environment variables (support env.txt or .env)
 if os.path.exists('env.txt'):
@@ -118,7 +119,7 @@ def get_ai_response(prompt, max_tokens=500, expect_json=False):
     # OpenRouter fallback if configured
     if openrouter_api_key:
         app.logger.debug("AI provider: OpenRouter")
-        url = "https://openrouter.ai/api/v1/chat/completions"
+        url = f"{os.getenv('OPENROUTER_BASE_URL', 'https://openrouter.ai/api/v1').rstrip('/')}/chat/completions"
     headers = {
             "Authorization": f"Bearer {openrouter_api_key}",
             "Content-Type": "application/json",
@@ -132,7 +133,7 @@ def get_ai_response(prompt, max_tokens=500, expect_json=False):
         "max_tokens": max_tokens,
         "temperature": 0.7
     }
-        response = requests.post(url, headers=headers, json=payload)
+        response = get_provider_client().post(url, headers=headers, json=payload)
     if response.status_code != 200:
             try:
                 detail = response.json()
@@ -190,7 +191,7 @@ def get_ai_response(prompt, max_tokens=500, expect_json=False):
         "max_tokens": max_tokens,
         "temperature": 0.7
     }
-    response = requests.post(url, headers=headers, json=data)
+    response = get_provider_client().post(url, headers=headers, json=data)
     if response.status_code != 200:
         try:
             detail = response.json()
@@ -0,0 +1,516 @@
+"""
+ASGI (asyncio) serving path for the LLM-bound interview routes.
+
+working_app.py calls OpenRouter with blocking requests, so one worker can
+only have as many interviews waiting on the LLM as it has threads. This app
+serves /configure, /submit_answer, /interview_tips and /summary on an event
+loop with an httpx client instead: an interview waiting on the model costs a
+coroutine, not a thread.
+
+Route contracts and sessions are the same as working_app's (the same
+server-side session store, or with SESSION_BACKEND=cookie the cookie signed
+with Flask's serializer and the same SECRET_KEY), so both apps can run side
+by side behind one proxy: send these four routes to
+
+    uvicorn asgi_app:app --port 5001
+
+and everything else to the Flask app. Prompts, parsing, fallbacks, the model
+health registry, response cache and rate limiter are shared with working_app,
+and so are the routes' decisions (working_app's _begin_interview,
+_tips_result, _response_cache_slot and friends): only the awaiting differs.
+Calls into the session store, question bank, history database and response
+cache block on SQLite or Redis, so they run in Starlette's threadpool.
+Background scoring (submit_answer's "async" flag) and SSE streaming stay on
+the Flask side; here every answer is scored inline, after any answers the
+Flask app is still scoring are collected from the shared job results.
+"""
+import os
+import copy
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+import httpx
+from flask.sessions import SecureCookieSessionInterface
+from itsdangerous import BadSignature
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, HTMLResponse, RedirectResponse
+from starlette.routing import Route, Mount
+from starlette.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
+
+import working_app
+from working_app import (
+    app as flask_app, NO_HEALTHY_MODELS, QUESTIONS_DEADLINE, TIPS_DEADLINE, FALLBACK_FANOUT, DEADLINE_EXCEEDED,
+    QUESTIONS_REQUEST, QUESTIONS_FALLBACK, TIPS_REQUEST, TIPS_FALLBACK, SUMMARY_REQUEST, QUESTIONS_FAILED,
+    _openrouter_headers, _available_models, _hedge_delay, _chat_payload, _completion_content, _ends_chain,
+    _chain_result, _response_without_model, _response_cache_slot, _cached_response, _cache_response, _fallback_result,
+    _begin_interview, _finish_configure, _questions_prompt, _question_fallback_prompts, _questions_from_response,
+    _fallback_question_list, _check_answer, _feedback_prompt, _append_turn, _store_evaluation, _settle_pending_feedback,
+    _next_question_payload, _interview_summary_prompt, _rolling_summary, _complete_interview, _tips_prompt,
+    _tips_fallback_prompts, _tips_result, _fallback_tips_result, _prefetched_tips, _cached_summary, _generated_summary,
+    _summary_page_data
+)
+from provider_client import AsyncProviderClient
+from model_health import health_registry
+from llm_cache import get_response_cache
+from question_bank import get_question_bank
+from prefetch import prefetcher, NOT_PREFETCHED
+from session_store import ServerSessionInterface
+from transcript import Transcript
+from llm_schemas import validate_questions, validate_tips, schema_stats
+from single_flight import AsyncSingleFlight
+from rate_limiter import rate_limiter, CRITICAL, NORMAL
+
+logger = logging.getLogger(__name__)
+
+_provider_client = None
+_provider_client_loop = None
+_single_flight = AsyncSingleFlight()
+
+
+def get_async_provider_client():
+    """Return the running event loop's httpx client (created on first use, closed at shutdown)"""
+    global _provider_client, _provider_client_loop
+    loop = asyncio.get_running_loop()
+    if _provider_client is None or _provider_client_loop is not loop:
+        _provider_client = AsyncProviderClient()
+        _provider_client_loop = loop
+    return _provider_client
+
+
+async def _try_model(client, url, headers, model, prompt, max_tokens, priority=NORMAL):
+    """Async _try_model: one chat completion attempt, admitted by the rate limiter"""
+    limiter_key = headers.get("Authorization")
+    try:
+        admitted, reason = await rate_limiter.acquire_async(limiter_key, priority)
+        if not admitted:
+            logger.warning(f"Not sending {priority} request to {model}: {reason}")
+            health_registry.release_probe(model)
+            return None, ('rate_limited', reason)
+
+        logger.debug(f"Trying OpenRouter with model: {model}")
+        started = time.monotonic()
+        try:
+            response = await client.post(url, headers=headers, json=_chat_payload(model, prompt, max_tokens))
+        except httpx.HTTPError as e:
+            health_registry.record_failure(model, 'error', str(e), latency=time.monotonic() - started)
+            raise
+    except asyncio.CancelledError:
+        # Lost a hedged race: give back a half-open probe slot
+        health_registry.release_probe(model)
+        raise
+    rate_limiter.update_from_response(limiter_key, response.status_code, response.headers)
+    return _completion_content(model, response, started)
+
+
+async def _sequential_model_chain(client, url, headers, models, prompt, max_tokens, priority=NORMAL):
+    failure = None
+    current = 0
+    try:
+        for index, model in enumerate(models):
+            current = index
+            content, failure = await _try_model(client, url, headers, model, prompt, max_tokens, priority)
+            if _ends_chain(failure):
+                return content, failure
+        return None, failure
+    finally:
+        for unused in models[current:]:
+            health_registry.release_probe(unused)
+
+
+async def _hedged_model_chain(client, url, headers, models, prompt, max_tokens, hedge_delay, priority=NORMAL):
+    """Async _hedged_model_chain: losing attempts are cancelled outright"""
+    remaining = list(models)
+    pending = {}
+    failure = None
+
+    def launch_next():
+        model = remaining.pop(0)
+        task = asyncio.ensure_future(_try_model(client, url, headers, model, prompt, max_tokens, priority))
+        pending[task] = model
+
+    launch_next()
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, timeout=hedge_delay if remaining else None,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                logger.debug(f"No answer after {hedge_delay}s, hedging with {remaining[0]}")
+                launch_next()
+                continue
+
+            for task in done:
+                model = pending.pop(task)
+                try:
+                    content, attempt_failure = task.result()
+                except httpx.HTTPError as e:
+                    logger.warning(f"Model {model} request error: {str(e)}")
+                    content, attempt_failure = None, ('error', str(e))
+
+                if attempt_failure is None:
+                    return content, None
+                failure = attempt_failure
+                if _ends_chain(attempt_failure):
+                    for model in remaining:
+                        health_registry.release_probe(model)
+                    remaining.clear()
+                elif remaining:
+                    launch_next()
+        return None, failure
+    finally:
+        for task, model in pending.items():
+            task.cancel()
+            health_registry.release_probe(model)
+        for model in remaining:
+            health_registry.release_probe(model)
+
+
+async def _openrouter_response(prompt, max_tokens, expect_json, openrouter_api_key, priority=NORMAL):
+    try:
+        client = get_async_provider_client()
+        # Read at call time so tests and the benchmark can point it elsewhere
+        url = working_app.OPENROUTER_CHAT_URL
+        headers = _openrouter_headers(openrouter_api_key)
+        models_to_try = _available_models()
+        if not models_to_try:
+            return dict(NO_HEALTHY_MODELS)
+
+        hedge_delay = _hedge_delay()
+        if hedge_delay is not None:
+            content, failure = await _hedged_model_chain(client, url, headers, models_to_try, prompt, max_tokens, hedge_delay, priority)
+        else:
+            content, failure = await _sequential_model_chain(client, url, headers, models_to_try, prompt, max_tokens, priority)
+        return _chain_result(content, failure, prompt, expect_json)
+
+    except httpx.TimeoutException:
+        logger.error("OpenRouter API timeout")
+        return {"error": "AI request timed out"}
+    except httpx.HTTPError as e:
+        logger.error(f"OpenRouter API request error: {str(e)}")
+        return {"error": f"AI request failed: {str(e)}"}
+    except Exception as e:
+        logger.error(f"Unexpected error in AI call: {str(e)}")
+        return {"error": f"Unexpected error: {str(e)}"}
+
+
+async def get_ai_response(prompt, max_tokens=500, expect_json=False, cache_ttl=None, priority=NORMAL, validate=None):
+    """Async working_app.get_ai_response (same results, cache and coalescing rules)"""
+    result = _response_without_model(prompt, expect_json)
+    if result is not None:
+        return result
+
+    openrouter_api_key = os.getenv('OPENROUTER_API_KEY')
+    response_cache, response_key, flight_key = _response_cache_slot(prompt, max_tokens, expect_json, cache_ttl, priority)
+    if response_cache is not None:
+        # The cache may be a SQLite or Redis backend: keep its I/O off the event loop
+        cached_result = await run_in_threadpool(_cached_response, response_cache, response_key, validate)
+        if cached_result is not None:
+            return cached_result
+
+    async def fetch():
+        result = await _openrouter_response(prompt, max_tokens, expect_json, openrouter_api_key, priority)
+        if response_cache is not None:
+            await run_in_threadpool(_cache_response, response_cache, response_key, result, cache_ttl, validate)
+        return result
+
+    if os.getenv('SINGLE_FLIGHT', 'thread').lower() in ['off', 'none', 'false', '0']:
+        return await fetch()
+    return await _single_flight.do(flight_key, fetch)
+
+
+async def _ai_response_before(deadline, prompt, **kwargs):
+    """Async working_app._ai_response_before: the call is cancelled at the deadline"""
+    try:
+        return await asyncio.wait_for(get_ai_response(prompt, **kwargs), timeout=max(deadline - time.monotonic(), 0))
+    except asyncio.TimeoutError:
+        logger.warning("AI request still running at the deadline, cancelling it")
+        return dict(DEADLINE_EXCEEDED)
+
+
+async def _first_valid_response(prompts, validate, deadline, max_tokens, cache_ttl, priority):
+    """Async working_app._first_valid_response: losing prompts are cancelled outright"""
+    if time.monotonic() >= deadline:
+        logger.warning("Deadline passed before the fallback prompts could start")
+        return None
+    remaining = list(enumerate(prompts, 1))
+    pending = {}
+
+    def launch_next():
+        attempt, prompt = remaining.pop(0)
+        logger.info(f"Trying AI fallback attempt {attempt}")
+        task = asyncio.ensure_future(get_ai_response(prompt, max_tokens, True, cache_ttl, priority, validate))
+        pending[task] = attempt
+
+    while remaining and len(pending) < FALLBACK_FANOUT:
+        launch_next()
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, timeout=max(deadline - time.monotonic(), 0),
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                logger.warning(f"Deadline passed with {len(pending)} fallback attempts in flight")
+                return None
+            for task in done:
+                result = _fallback_result(pending.pop(task), task.result(), validate, remaining)
+                if result is not None:
+                    return result
+                if remaining:
+                    launch_next()
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _interview_tips(job_role, interview_type, deadline):
+    """Async working_app._interview_tips: (payload, status_code) for tips generated before deadline"""
+    tips_response = await _ai_response_before(deadline, _tips_prompt(job_role, interview_type), **TIPS_REQUEST)
+    result = _tips_result(tips_response)
+    if result is not None:
+        return result
+    fallback_tips = await _first_valid_response(_tips_fallback_prompts(job_role, interview_type), validate_tips, deadline, **TIPS_FALLBACK)
+    return _fallback_tips_result(fallback_tips)
+
+
+async def _prefetched(key, name, timeout):
+    """Async prefetcher.take: awaits a prefetch in flight without holding a thread"""
+    future = prefetcher.future(key, name)
+    if future is not None and not future.cancelled():
+        try:
+            # shield: giving up at the timeout must not cancel the prefetch itself
+            result = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+        except asyncio.TimeoutError:
+            logger.info(f"Prefetch of {name} still running after {timeout}s")
+        except Exception as e:
+            logger.warning(f"Prefetch of {name} failed: {e}")
+        else:
+            prefetcher.record(True)
+            return result
+    prefetcher.record(False)
+    return NOT_PREFETCHED
+
+
+# --- Flask-compatible cookie session -------------------------------------
+
+_session_interface = SecureCookieSessionInterface()
+
+
+def _cookie_session(request):
+    serializer = _session_interface.get_signing_serializer(flask_app)
+    cookie = request.cookies.get(flask_app.config['SESSION_COOKIE_NAME'])
+    if serializer is None or not cookie:
+        return {}
+    try:
+        return serializer.loads(cookie, max_age=int(flask_app.permanent_session_lifetime.total_seconds()))
+    except BadSignature:
+        return {}
+
+
+def _set_session_cookie(response, value):
+    config = flask_app.config
+    name = config['SESSION_COOKIE_NAME']
+    if value is None:
+        response.delete_cookie(name, path=config['SESSION_COOKIE_PATH'] or '/')
+        return
+    response.set_cookie(
+        name,
+        value,
+        path=config['SESSION_COOKIE_PATH'] or '/',
+        domain=config['SESSION_COOKIE_DOMAIN'],
+        secure=config['SESSION_COOKIE_SECURE'],
+        httponly=config['SESSION_COOKIE_HTTPONLY'],
+        samesite=config['SESSION_COOKIE_SAMESITE']
+    )
+
+
+def _load_server_session(interface, cookie):
+    """The request's server-side session with every field read, so handlers never block on the store"""
+    sess = interface.load(flask_app, cookie)
+    sess.preload()
+    return sess
+
+
+def with_session(handler):
+    """Call handler(request, sess) and write the session back if it changed.
+
+    Uses the Flask app's server-side session store when it has one (only the
+    changed fields are written), else the signed cookie session.
+    """
+    async def endpoint(request):
+        interface = flask_app.session_interface
+        if isinstance(interface, ServerSessionInterface):
+            # The store is SQLite or Redis: read it all and write back in a worker thread
+            sess = await run_in_threadpool(_load_server_session, interface, request.cookies.get(flask_app.config['SESSION_COOKIE_NAME']))
+            response = await handler(request, sess)
+            action = await run_in_threadpool(interface.persist, flask_app, sess)
+            if action is not None:
+                _set_session_cookie(response, interface.cookie_value(flask_app, sess) if action == 'set' else None)
+            return response
+
+        sess = _cookie_session(request)
+        before = copy.deepcopy(sess)
+        response = await handler(request, sess)
+        if sess != before:
+            _set_session_cookie(response, _session_interface.get_signing_serializer(flask_app).dumps(dict(sess)) if sess else None)
+        return response
+    return endpoint
+
+
+async def _json_body(request):
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+_templates = Environment(
+    loader=FileSystemLoader(os.path.join(flask_app.root_path, flask_app.template_folder)),
+    autoescape=select_autoescape(['html'])
+)
+_templates.globals['url_for'] = lambda endpoint, filename='': f"/static/{filename}"
+
+
+# --- Routes ---------------------------------------------------------------
+
+@with_session
+async def configure_interview(request, sess):
+    try:
+        data = await _json_body(request)
+        if not data:
+            return JSONResponse({'status': 'error', 'message': 'No data received'}, status_code=400)
+
+        # The question bank is a SQLite file
+        questions = await run_in_threadpool(_begin_interview, sess, data)
+        generated = questions is None
+        if generated:
+            deadline = time.monotonic() + QUESTIONS_DEADLINE
+            prompt = _questions_prompt(sess)
+            questions_response = await _ai_response_before(deadline, prompt, **QUESTIONS_REQUEST)
+
+            questions, error_message = _questions_from_response(questions_response, prompt)
+            if error_message:
+                return JSONResponse({'status': 'error', 'message': error_message}, status_code=500)
+            if questions is None:
+                questions = _fallback_question_list(await _first_valid_response(
+                    _question_fallback_prompts(sess), validate_questions, deadline, **QUESTIONS_FALLBACK))
+                if questions is None:
+                    return JSONResponse({'status': 'error', 'message': QUESTIONS_FAILED}, status_code=500)
+
+        return JSONResponse(await run_in_threadpool(_finish_configure, sess, questions, generated))
+    except Exception as e:
+        logger.error(f"Error in configure_interview: {str(e)}", exc_info=True)
+        return JSONResponse({'status': 'error', 'message': f'Configuration failed: {str(e)}'}, status_code=500)
+
+
+@with_session
+async def submit_answer(request, sess):
+    try:
+        question_index, question, user_answer, error_message = _check_answer(sess, await _json_body(request))
+        if error_message:
+            return JSONResponse({'status': 'error', 'message': error_message}, status_code=400)
+
+        # Answers the Flask app scores in the background are read from the shared job results
+        await run_in_threadpool(_settle_pending_feedback, sess)
+
+        prompt = _feedback_prompt(question, user_answer, sess.get('interview_type', 'Technical'), sess.get('job_role'))
+        feedback = await get_ai_response(prompt, expect_json=True, max_tokens=400, priority=CRITICAL)
+
+        evaluation = _store_evaluation(sess, _append_turn(sess, question_index, user_answer), feedback)
+        payload = _next_question_payload(sess, question_index, evaluation)
+        if payload is None:
+            summary_resp = _rolling_summary(sess)
+            if summary_resp is None:
+                summary_resp = await get_ai_response(_interview_summary_prompt(sess), expect_json=True, max_tokens=400, priority=NORMAL)
+            # Records the interview in the history database
+            payload = await run_in_threadpool(_complete_interview, sess, evaluation, summary_resp)
+        return JSONResponse(payload)
+
+    except Exception as e:
+        logger.error(f"Error in submit_answer: {str(e)}", exc_info=True)
+        return JSONResponse({'status': 'error', 'message': str(e)}, status_code=500)
+
+
+@with_session
+async def get_interview_tips(request, sess):
+    try:
+        deadline = time.monotonic() + TIPS_DEADLINE
+        prefetched = await _prefetched(sess.get('interview_id'), 'tips', TIPS_DEADLINE)
+        result = _prefetched_tips(prefetched, deadline)
+        if result is None:
+            result = await _interview_tips(sess.get('job_role', 'Software Engineer'), sess.get('interview_type', 'Technical'), deadline)
+        payload, status_code = result
+        return JSONResponse(payload, status_code=status_code)
+
+    except Exception as e:
+        logger.error(f"Error generating interview tips: {str(e)}")
+        return JSONResponse({'status': 'error', 'message': str(e)}, status_code=500)
+
+
+@with_session
+async def summary_page(request, sess):
+    try:
+        if not sess.get('feedback_received') and not sess.get('interview_complete'):
+            return RedirectResponse('/', status_code=302)
+
+        summary_content = None
+        if len(Transcript(sess)) > 0:
+            summary_content = _cached_summary(sess)
+            if summary_content is None:
+                summary_content = _generated_summary(sess, await get_ai_response(_interview_summary_prompt(sess), **SUMMARY_REQUEST))
+
+        html = _templates.get_template('summary.html').render(summary=_summary_page_data(sess, summary_content))
+        return HTMLResponse(html)
+    except Exception as e:
+        logger.error(f"Error in summary_page: {str(e)}", exc_info=True)
+        return RedirectResponse('/', status_code=302)
+
+
+async def health(request):
+    return JSONResponse({'status': 'ok', 'message': 'Server is running'})
+
+
+def _metrics():
+    response_cache = get_response_cache()
+    question_bank = get_question_bank()
+    return {
+        'provider_client': _provider_client.stats() if _provider_client else None,
+        'model_health': health_registry.snapshot(),
+        'response_cache': response_cache.stats() if response_cache else None,
+        'single_flight': _single_flight.stats(),
+        'rate_limiter': rate_limiter.stats(),
+        'response_schemas': schema_stats(),
+        'question_bank': question_bank.stats() if question_bank else None,
+        'prefetch': prefetcher.stats(),
+        'sessions': flask_app.session_interface.stats() if isinstance(flask_app.session_interface, ServerSessionInterface) else None
+    }
+
+
+async def ai_metrics(request):
+    # Cache, bank and session stats may query their databases
+    return JSONResponse(await run_in_threadpool(_metrics))
+
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    global _provider_client
+    if _provider_client is not None:
+        await _provider_client.aclose()
+        _provider_client = None
+
+
+app = Starlette(
+    routes=[
+        Route('/configure', configure_interview, methods=['POST']),
+        Route('/submit_answer', submit_answer, methods=['POST']),
+        Route('/interview_tips', get_interview_tips),
+        Route('/summary', summary_page),
+        Route('/health', health),
+        Route('/ai_metrics', ai_metrics),
+        Mount('/static', StaticFiles(directory=os.path.join(flask_app.root_path, 'static')), name='static')
+    ],
+    lifespan=lifespan
+)
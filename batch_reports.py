@@ -0,0 +1,150 @@
+"""
+Render PDF reports for a whole cohort of stored interviews.
+
+/export_pdf renders the one interview in the caller's session. This reads
+every interview kept in the session store (SESSION_BACKEND, or --sessions
+for a SQLite file), describes each with pdf_report.describe_report and lays
+them out with the same render_report_file, so a report is identical to the
+one the candidate downloads. Reports render in a process pool with one
+worker per core by default, and are written to a directory or, when the
+output ends in .zip, added to a single zip as they finish:
+
+    python batch_reports.py reports/
+    python batch_reports.py cohort.zip --role "Data Scientist" --workers 8
+
+Only interviews with at least one scored answer are exported. The summary
+is the one the interview already stored (or its rolling summary); no LLM is
+called, and interviews without one get the same fallback summary as
+/export_pdf. Progress and throughput go to stderr.
+"""
+import os
+import re
+import sys
+import json
+import time
+import zipfile
+import argparse
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from pdf_report import describe_report, render_report_file
+from rolling_summary import RollingSummary
+from session_store import SQLiteSessionBackend, build_session_interface_from_env
+from transcript import Transcript
+
+_UNSAFE = re.compile(r'[^A-Za-z0-9]+')
+
+
+def stored_summary(sess):
+    """The summary the interview already has for its current transcript, or None"""
+    artifact = sess.get('summary_artifact')
+    if artifact and artifact['version'] == Transcript(sess).version:
+        return artifact['summary']
+    return RollingSummary.from_dict(sess.get('rolling_summary')).summary()
+
+
+def load_interviews(backend, sids=None, role=None):
+    """Yield (sid, session dict) for stored interviews with a scored answer"""
+    for sid in sids or backend.sids():
+        sess = {field: json.loads(raw) for field, raw in backend.get_all(sid).items()}
+        if role and (sess.get('job_role') or '').lower() != role.lower():
+            continue
+        if Transcript(sess).scores():
+            yield sid, sess
+
+
+def report_name(sid, report):
+    """File name for a report: date, role and the start of the session id"""
+    date = _UNSAFE.sub('', (report.get('date') or '')[:10])
+    role = _UNSAFE.sub('-', report.get('job_role') or 'interview').strip('-').lower()
+    return f"{date}_{role}_{sid[:8]}.pdf"
+
+
+def render_batch(interviews, out, workers=None, progress=None):
+    """Render every (sid, session) into the directory or .zip at out; returns throughput stats"""
+    workers = workers or os.cpu_count() or 1
+    to_zip = out.lower().endswith('.zip')
+    directory = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(out))) if to_zip else out
+    os.makedirs(directory, exist_ok=True)
+    archive = zipfile.ZipFile(out, 'w', zipfile.ZIP_STORED) if to_zip else None
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    stats = {'reports': 0, 'bytes': 0, 'fallback_summaries': 0, 'failed': 0}
+    started = time.monotonic()
+    pending = {}
+
+    def collect(done):
+        for future in done:
+            name = pending.pop(future)
+            path = os.path.join(directory, name)
+            try:
+                stats['bytes'] += future.result()
+            except Exception as e:
+                stats['failed'] += 1
+                print(f"\n{name}: {e}", file=sys.stderr)
+                continue
+            stats['reports'] += 1
+            if archive is not None:
+                # PDF streams are already compressed
+                archive.write(path, name)
+                os.remove(path)
+            if progress:
+                progress(stats, time.monotonic() - started)
+
+    try:
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context(method)) as pool:
+            for sid, sess in interviews:
+                summary = stored_summary(sess)
+                stats['fallback_summaries'] += summary is None
+                report = describe_report(sess, summary)
+                name = report_name(sid, report)
+                pending[pool.submit(render_report_file, report, os.path.join(directory, name))] = name
+                # Bound the reports held in memory to a few per worker
+                if len(pending) >= workers * 4:
+                    collect(wait(pending, return_when=FIRST_COMPLETED).done)
+            while pending:
+                collect(wait(pending, return_when=FIRST_COMPLETED).done)
+    finally:
+        if archive is not None:
+            archive.close()
+            for name in os.listdir(directory):
+                os.remove(os.path.join(directory, name))
+            os.rmdir(directory)
+    seconds = time.monotonic() - started
+    stats.update(workers=workers, seconds=round(seconds, 2),
+                 reports_per_s=round(stats['reports'] / seconds, 2) if seconds else None)
+    return stats
+
+
+def _print_progress(stats, elapsed):
+    rate = stats['reports'] / elapsed if elapsed else 0
+    print(f"\r{stats['reports']} reports, {stats['bytes'] / 1e6:.1f} MB, {rate:.1f} reports/s",
+          end='', file=sys.stderr, flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render PDF reports for every stored interview")
+    parser.add_argument('out', help='output directory, or a .zip file')
+    parser.add_argument('--sessions', help='SQLite session file (default: the store configured by SESSION_BACKEND)')
+    parser.add_argument('--sid', action='append', help='only this session id (repeatable)')
+    parser.add_argument('--role', help='only interviews for this job role')
+    parser.add_argument('--workers', type=int, help='render processes (default: one per core)')
+    args = parser.parse_args()
+
+    if args.sessions:
+        backend = SQLiteSessionBackend(args.sessions)
+    else:
+        interface = build_session_interface_from_env()
+        if interface is None:
+            parser.error("SESSION_BACKEND=cookie keeps no interviews on the server")
+        backend = interface.backend
+    stats = render_batch(load_interviews(backend, args.sid, args.role), args.out, args.workers, _print_progress)
+    print(file=sys.stderr)
+    print(f"{stats['reports']} reports ({stats['bytes'] / 1e6:.1f} MB) in {stats['seconds']}s with {stats['workers']} workers: "
+          f"{stats['reports_per_s']} reports/s, {stats['fallback_summaries']} without a stored summary, "
+          f"{stats['failed']} failed -> {args.out}")
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Concurrency benchmark: threaded Flask app vs the ASGI app.
+
+Starts fake_openrouter.py (fixed latency per chat completion), then for
+each app and each concurrency level runs that many complete interviews at
+once (/configure, /interview_tips, 5 x /submit_answer, /summary) and reports
+per-interview wall time, route p95 latency, errors and throughput.
+
+The Flask app runs on a fixed-size thread pool, like gunicorn's gthread
+worker (--flask-threads); the ASGI app runs under uvicorn. Each app gets one
+process. The response cache and single-flight are turned off so every LLM
+call really goes to the fake provider.
+
+    pip install httpx starlette uvicorn
+    python bench_concurrency.py --levels 10,50,100,200 --latency 0.5 --flask-threads 16
+
+An app "sustains" a level when no request failed and p95 interview time stays
+within --slo seconds. Numbers depend on the machine; rerun rather than quote.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+from loadtest import serve_flask, free_port, wait_for, percentile, start_process
+
+
+def serve_fake_provider(port, latency):
+    """fake_openrouter answering every prompt after `latency` seconds"""
+    from fake_openrouter import FakeOpenRouter
+    FakeOpenRouter({'default': {'latency': latency}}, port=port).server.serve_forever()
+
+
+async def _run_interview(base_url, route_times, errors):
+    import httpx
+    started = time.perf_counter()
+    async with httpx.AsyncClient(base_url=base_url, timeout=300) as client:
+        async def call(method, path, **kwargs):
+            t0 = time.perf_counter()
+            response = await client.request(method, path, **kwargs)
+            route_times.setdefault(path, []).append(time.perf_counter() - t0)
+            if response.status_code >= 400:
+                errors.append(f"{path}: {response.status_code}")
+            return response
+
+        response = await call('POST', '/configure', json={'job_role': 'Backend Engineer', 'interview_type': 'Behavioral'})
+        total = response.json().get('total_questions', 0) if response.status_code == 200 else 0
+        await call('GET', '/interview_tips')
+        for i in range(total):
+            await call('POST', '/submit_answer', json={'answer': f'My answer number {i} with a concrete example.'})
+        await call('GET', '/summary')
+    return time.perf_counter() - started
+
+
+async def _run_level(base_url, concurrency):
+    route_times, errors = {}, []
+    started = time.perf_counter()
+    results = await asyncio.gather(*[_run_interview(base_url, route_times, errors) for _ in range(concurrency)],
+                                   return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    durations = [r for r in results if isinstance(r, float)]
+    errors.extend(repr(r) for r in results if isinstance(r, BaseException))
+    return {
+        'concurrency': concurrency,
+        'interviews_per_s': round(len(durations) / elapsed, 2),
+        'interview_p50': round(percentile(durations, 50) or 0, 2),
+        'interview_p95': round(percentile(durations, 95) or 0, 2),
+        'submit_answer_p95': round(percentile(route_times.get('/submit_answer', []), 95) or 0, 3),
+        'errors': len(errors)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--levels', default='10,50,100,200', help='comma-separated concurrent interview counts')
+    parser.add_argument('--latency', type=float, default=0.5, help='fake provider seconds per completion')
+    parser.add_argument('--flask-threads', type=int, default=16, help='request threads for the Flask app')
+    parser.add_argument('--slo', type=float, default=10.0, help='p95 interview seconds that still counts as sustained')
+    parser.add_argument('--apps', default='flask,asgi')
+    parser.add_argument('--json', help='also write results to this file')
+    parser.add_argument('--serve-fake', nargs=2, metavar=('PORT', 'LATENCY'), help=argparse.SUPPRESS)
+    parser.add_argument('--serve-flask', nargs=2, metavar=('PORT', 'THREADS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_fake:
+        return serve_fake_provider(int(args.serve_fake[0]), float(args.serve_fake[1]))
+    if args.serve_flask:
+        return serve_flask(int(args.serve_flask[0]), int(args.serve_flask[1]))
+
+    levels = [int(level) for level in args.levels.split(',')]
+    fake_port = free_port()
+    env = dict(os.environ,
+               FAKE_AI='false', OPENROUTER_API_KEY='bench', OPENROUTER_BASE_URL=f"http://127.0.0.1:{fake_port}/api/v1",
+               OPENROUTER_RPM='1000000', OPENROUTER_RPD='100000000', LLM_CACHE_BACKEND='off', SINGLE_FLIGHT='off',
+               OPENROUTER_READ_TIMEOUT='300')
+    env.pop('OPENROUTER_HEDGE_DELAY', None)
+
+    fake = start_process([sys.executable, __file__, '--serve-fake', str(fake_port), str(args.latency)], env)
+    results = {}
+    try:
+        for name in args.apps.split(','):
+            port = free_port()
+            if name == 'flask':
+                cmd = [sys.executable, __file__, '--serve-flask', str(port), str(args.flask_threads)]
+                label = f"flask ({args.flask_threads} threads)"
+            else:
+                cmd = [sys.executable, '-m', 'uvicorn', 'asgi_app:app', '--port', str(port), '--log-level', 'warning']
+                label = 'asgi (uvicorn)'
+            server = start_process(cmd, env)
+            try:
+                base_url = f"http://127.0.0.1:{port}"
+                wait_for(f"{base_url}/health")
+                results[label] = [asyncio.run(_run_level(base_url, level)) for level in levels]
+            finally:
+                server.terminate()
+                server.wait()
+    finally:
+        fake.terminate()
+        fake.wait()
+
+    print(f"fake provider latency {args.latency}s per completion, 7 LLM calls per interview (8 with SUMMARY_MODE=full)")
+    header = f"{'app':<22}{'conc':>6}{'int/s':>8}{'p50 s':>8}{'p95 s':>8}{'answer p95':>12}{'errors':>8}"
+    print(header)
+    print('-' * len(header))
+    for label, rows in results.items():
+        for row in rows:
+            print(f"{label:<22}{row['concurrency']:>6}{row['interviews_per_s']:>8}{row['interview_p50']:>8}"
+                  f"{row['interview_p95']:>8}{row['submit_answer_p95']:>12}{row['errors']:>8}")
+        sustained = [row['concurrency'] for row in rows if row['errors'] == 0 and row['interview_p95'] <= args.slo]
+        print(f"{label}: sustains {max(sustained) if sustained else 0} concurrent interviews within p95 <= {args.slo}s")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'latency': args.latency, 'slo': args.slo, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
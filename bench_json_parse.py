@@ -0,0 +1,176 @@
+"""
+Micro-benchmark: llm_json.parse_llm_json vs the regex cascade it replaced.
+
+The corpus is a set of model outputs in the shapes seen in the logs:
+- clean JSON
+- JSON in code fences or wrapped in chatty prose
+- truncated replies
+- replies with trailing commas or single quotes
+- numbered and bulleted lists
+
+fake_openrouter's malformed variants are added to these, plus long outputs
+and adversarial inputs: unbalanced braces, and text that is nearly all
+brackets. Pass --corpus with a JSON list of captured outputs to benchmark
+your own. Each item is either a string or {"prompt": ..., "content": ...}.
+
+    python bench_json_parse.py
+    python bench_json_parse.py --corpus captured.json --repeat 200
+"""
+import re
+import json
+import time
+import random
+import logging
+import argparse
+
+from fake_openrouter import QUESTIONS, FEEDBACK, SUMMARY, TIPS, malform
+from llm_json import parse_llm_json
+
+QUESTION_PROMPT = "Generate exactly 5 technical interview questions"
+FEEDBACK_PROMPT = "Evaluate this answer and give a score"
+SUMMARY_PROMPT = "Write an interview summary"
+
+
+def legacy_parse_json_like(content, prompt=""):
+    """working_app._parse_json_like before llm_json, minus logging"""
+    if not isinstance(content, str):
+        return content
+    content = content.strip()
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        pass
+    if content.startswith('```') and content.endswith('```'):
+        content = re.sub(r'^```(?:json)?\s*', '', content, flags=re.IGNORECASE)
+        content = re.sub(r'\s*```$', '', content)
+        content = content.strip()
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        pass
+    for pattern in (r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', r'\{.*?\}', r'\[[^\[\]]*(?:\[[^\[\]]*\][^\[\]]*)*\]', r'\[.*?\]'):
+        match = re.search(pattern, content, re.DOTALL)
+        if match:
+            try:
+                return json.loads(match.group())
+            except json.JSONDecodeError:
+                continue
+    if any(keyword in prompt.lower() for keyword in ['generate', 'questions', 'interview']):
+        for pattern in (r'"([^"]+)"', r'\d+\.\s*([^\n]+)', r'[-*]\s*([^\n]+)'):
+            found = re.findall(pattern, content)
+            if len(found) >= 3:
+                return found
+        lines = [line.strip() for line in content.split('\n') if line.strip()]
+        valid = [line for line in lines
+                 if not line.startswith('[') and not line.startswith('{') and not line.startswith('```')
+                 and not line.startswith('Generate') and len(line) > 20 and '?' in line]
+        if len(valid) >= 3:
+            return valid
+    if any(keyword in prompt.lower() for keyword in ['feedback', 'summary', 'evaluate', 'score']):
+        data = {}
+        score = re.search(r'(?:score|rating)[\s:]*(\d+)', content, re.IGNORECASE)
+        if score:
+            data['score'] = int(score.group(1))
+        feedback = re.search(r'(?:feedback|evaluation|assessment)[\s:]*([^.]+)', content, re.IGNORECASE)
+        if feedback:
+            data['feedback'] = feedback.group(1).strip()
+        suggestions = re.search(r'(?:suggestion|improvement|recommendation)[\s:]*([^.]+)', content, re.IGNORECASE)
+        if suggestions:
+            data['suggestions'] = suggestions.group(1).strip()
+        if data:
+            return data
+    quoted = re.findall(r'"([^"]+)"', content)
+    if len(quoted) >= 2:
+        return quoted
+    return None
+
+
+def build_corpus(seed=7):
+    """(category, prompt, content) triples"""
+    questions = json.dumps(QUESTIONS)
+    feedback = json.dumps(FEEDBACK[0])
+    summary = json.dumps(SUMMARY)
+    corpus = [
+        ('clean', QUESTION_PROMPT, questions),
+        ('clean', FEEDBACK_PROMPT, feedback),
+        ('clean', SUMMARY_PROMPT, summary),
+        ('clean', "Give interview tips", json.dumps(TIPS)),
+        ('wrapped', QUESTION_PROMPT, f"```json\n{questions}\n```"),
+        ('wrapped', FEEDBACK_PROMPT, f"Here is my evaluation of the candidate:\n\n```json\n{feedback}\n```\n\nThe answer covers the basics {{but lacks depth}}."),
+        ('wrapped', FEEDBACK_PROMPT, f'Sure! {feedback} I hope this helps. Note: a "score" of 7 means solid.'),
+        ('wrapped', SUMMARY_PROMPT, "Based on the transcript [see above], here is the summary:\n" + summary),
+        ('lists', QUESTION_PROMPT, "Here are your questions:\n" + "\n".join(f"{i}. {q}" for i, q in enumerate(QUESTIONS, 1))),
+        ('lists', QUESTION_PROMPT, "Questions:\n" + "\n".join(f"- {q}" for q in QUESTIONS)),
+        ('lists', FEEDBACK_PROMPT, "Score: 6\nFeedback: The answer is relevant but vague. Suggestions: give a concrete example."),
+        ('truncated', QUESTION_PROMPT, questions[:len(questions) * 3 // 4]),
+        ('truncated', SUMMARY_PROMPT, '{"overall_score": 7, "strengths": ["Clear communication", "Good examples"], "areas_for_improvement": ["Depth on'),
+        ('long', SUMMARY_PROMPT, ("The candidate discussed {design trade-offs} at length. " * 400) + summary + (" Further notes follow." * 400)),
+        ('long', FEEDBACK_PROMPT, feedback[:-1] + ', "details": "' + ('x' * 30000) + '"}'),
+        ('adversarial', FEEDBACK_PROMPT, '{' * 4000),
+        ('adversarial', QUESTION_PROMPT, '[' * 4000 + ' what?'),
+        ('adversarial', FEEDBACK_PROMPT, ('{ "a": 1, ' * 800) + 'score: 5'),
+        ('adversarial', SUMMARY_PROMPT, '{' + ('{}' * 3000) + ' no close'),
+    ]
+    rng = random.Random(seed)
+    for prompt, content in ((QUESTION_PROMPT, questions), (FEEDBACK_PROMPT, feedback), (SUMMARY_PROMPT, summary)):
+        for _ in range(6):
+            corpus.append(('malformed', prompt, malform(content, rng)))
+    return corpus
+
+
+def _parse(fn, prompt, content):
+    try:
+        return fn(content, prompt)
+    except Exception as e:
+        return e
+
+
+def _time(fn, prompt, content, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        _parse(fn, prompt, content)
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LLM JSON extraction against the old regex cascade")
+    parser.add_argument('--corpus', help='JSON list of captured outputs (strings or {"prompt", "content"})')
+    parser.add_argument('--repeat', type=int, default=50, help='parses per item and implementation')
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    corpus = build_corpus()
+    if args.corpus:
+        with open(args.corpus) as f:
+            for item in json.load(f):
+                item = item if isinstance(item, dict) else {'content': item}
+                corpus.append(('captured', item.get('prompt', ''), item['content']))
+
+    rows = {}
+    for category, prompt, content in corpus:
+        row = rows.setdefault(category, {'items': 0, 'legacy': 0.0, 'new': 0.0, 'worst_legacy': 0.0, 'differs': 0, 'raised': 0})
+        repeat = max(1, args.repeat // 10) if category == 'adversarial' else args.repeat
+        legacy = _time(legacy_parse_json_like, prompt, content, repeat)
+        new = _time(parse_llm_json, prompt, content, repeat)
+        row['items'] += 1
+        row['legacy'] += legacy
+        row['new'] += new
+        row['worst_legacy'] = max(row['worst_legacy'], legacy)
+        old, result = _parse(legacy_parse_json_like, prompt, content), _parse(parse_llm_json, prompt, content)
+        if isinstance(old, Exception):
+            row['raised'] += 1
+        elif old != result:
+            row['differs'] += 1
+
+    header = f"{'category':<12}{'items':>6}{'legacy us':>12}{'new us':>10}{'speedup':>9}{'worst legacy ms':>17}{'differs':>9}{'legacy raised':>15}"
+    print(header)
+    print('-' * len(header))
+    for category, row in rows.items():
+        legacy_us = row['legacy'] / row['items'] * 1e6
+        new_us = row['new'] / row['items'] * 1e6
+        print(f"{category:<12}{row['items']:>6}{legacy_us:>12.1f}{new_us:>10.1f}{legacy_us / new_us:>8.1f}x"
+              f"{row['worst_legacy'] * 1000:>17.2f}{row['differs']:>9}{row['raised']:>15}")
+
+
+if __name__ == '__main__':
+    main()
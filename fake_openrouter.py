@@ -0,0 +1,383 @@
+"""
+Local stand-in for the OpenRouter chat completions API.
+
+FAKE_AI short-circuits inside get_ai_response, so it never exercises the
+HTTP client, model chain, circuit breaker, rate limiter or JSON parsing.
+This server speaks enough of POST /api/v1/chat/completions (plain and
+stream=true SSE) to run that real code path offline and reproducibly:
+
+    python fake_openrouter.py --port 8099 --latency lognormal:0.4:0.5 --error-rate 0.05
+    OPENROUTER_BASE_URL=http://127.0.0.1:8099/api/v1 OPENROUTER_API_KEY=test python working_app.py
+
+Behaviour comes from a profile (--config profile.json, or a dict in code):
+
+    {
+      "seed": 7,
+      "default": {"latency": "uniform:0.2:0.8", "malformed_rate": 0.1},
+      "models": {
+        "google/gemma-7b-it:free": {"status": 503},
+        "mistralai/mistral-7b-instruct:free": {"rate_limit_rate": 0.2, "retry_after": 2}
+      }
+    }
+
+Per-model settings (missing ones come from "default"):
+- latency:          seconds before answering: "0.5", "uniform:a:b", "normal:mean:sd",
+                    "lognormal:median:sigma" or "exp:mean"
+- chunk_delay:      seconds between streamed chunks; chunk_chars: characters per chunk
+- status:           always answer with this HTTP status (e.g. 404, 503)
+- error_rate:       probability of an error_status (default 503) answer
+- rate_limit_rate:  probability of a 429; retry_after sets its Retry-After seconds
+- rpm:              per-API-key requests per minute before real 429s with reset headers
+- malformed_rate:   probability the content is broken or loosely formatted JSON
+- stream_cut_rate:  probability a stream is cut off before [DONE]
+- content:          fixed reply instead of the prompt-aware canned one
+
+GET /stats reports what was served, with token counts taken as whitespace-separated
+words. GET /api/v1/models lists profiled models.
+"""
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_BEHAVIOR = {
+    'latency': '0',
+    'chunk_delay': 0.02,
+    'chunk_chars': 16,
+    'status': None,
+    'error_rate': 0.0,
+    'error_status': 503,
+    'rate_limit_rate': 0.0,
+    'retry_after': 1,
+    'rpm': None,
+    'malformed_rate': 0.0,
+    'stream_cut_rate': 0.0,
+    'content': None
+}
+
+QUESTIONS = [
+    "Tell me about a project where you had to learn a new technology quickly.",
+    "How do you approach debugging an issue you cannot reproduce locally?",
+    "Describe a time you disagreed with a teammate and how you resolved it.",
+    "How do you decide what to test in a new feature?",
+    "What is a technical decision you would make differently today, and why?"
+]
+FEEDBACK = [
+    {"feedback": "Clear structure and a relevant example, but the outcome is vague.", "score": 6,
+     "suggestions": "State the measurable result of your actions.", "corrections": "",
+     "strength": "Clear structure", "improvement": "Quantify outcomes", "resource": "STAR method guides"},
+    {"feedback": "Strong, specific answer that shows ownership and good judgement.", "score": 8,
+     "suggestions": "Mention what you would do differently next time.", "corrections": "",
+     "strength": "Ownership and judgement", "improvement": "Reflect on lessons learned", "resource": "Mock interview practice"},
+    {"feedback": "The answer stays general and does not address the question directly.", "score": 4,
+     "suggestions": "Use the STAR method to anchor the answer in one situation.", "corrections": "",
+     "strength": "Relevant experience", "improvement": "Answer the question directly", "resource": "STAR method guides"}
+]
+SUMMARY = {
+    "strengths": ["Clear communication", "Structured answers", "Relevant experience"],
+    "improvements": ["Quantify outcomes", "Go deeper on trade-offs", "Keep answers focused"],
+    "resources": ["STAR method guides", "System design primers", "Mock interview practice"],
+    "overall_score": 7
+}
+TIPS = [
+    "Research the company's products before the interview",
+    "Prepare three stories using the STAR method",
+    "Think out loud when solving technical problems",
+    "Ask the interviewer about the team's biggest challenge",
+    "Send a short thank-you note afterwards"
+]
+
+
+def parse_latency(spec):
+    """Turn a latency spec into a function rng -> seconds"""
+    if isinstance(spec, (int, float)):
+        return lambda rng: float(spec)
+    kind, _, args = str(spec).partition(':')
+    try:
+        values = [float(v) for v in args.split(':')] if args else []
+        if not values:
+            fixed = float(kind)
+            return lambda rng: fixed
+        if kind == 'uniform':
+            low, high = values
+            return lambda rng: rng.uniform(low, high)
+        if kind == 'normal':
+            mean, sd = values
+            return lambda rng: max(rng.gauss(mean, sd), 0.0)
+        if kind == 'lognormal':
+            median, sigma = values
+            return lambda rng: median * rng.lognormvariate(0.0, sigma)
+        if kind == 'exp':
+            mean, = values
+            return lambda rng: rng.expovariate(1.0 / mean) if mean > 0 else 0.0
+    except ValueError:
+        pass
+    raise ValueError(f"Invalid latency spec: {spec!r}")
+
+
+def canned_content(prompt, rng):
+    """Prompt-aware reply in the shape each app prompt asks for"""
+    lowered = prompt.lower()
+    if 'summary' in lowered:
+        return json.dumps(SUMMARY)
+    if 'tips' in lowered or 'advice' in lowered:
+        return json.dumps(TIPS)
+    if 'score' in lowered or 'evaluat' in lowered:
+        return json.dumps(rng.choice(FEEDBACK))
+    if 'questions' in lowered:
+        return json.dumps(QUESTIONS)
+    return "OK"
+
+
+def malform(content, rng):
+    """Break or loosen a JSON reply the way real models do"""
+    variants = [
+        lambda c: c[:max(len(c) * 2 // 3, 1)],
+        lambda c: f"Sure! Here is the JSON you asked for:\n{c}\nLet me know if you need anything else.",
+        lambda c: f"```json\n{c}\n```",
+        lambda c: c[:-1] + ',' + c[-1:] if c[-1:] in '}]' else c + ',',
+        lambda c: c.replace('"', "'")
+    ]
+    return rng.choice(variants)(content)
+
+
+class FakeOpenRouter:
+    """Threaded fake provider; start() returns the base URL to use as OPENROUTER_BASE_URL"""
+
+    def __init__(self, profile=None, host='127.0.0.1', port=0):
+        profile = profile or {}
+        self.default = dict(DEFAULT_BEHAVIOR, **profile.get('default', {}))
+        self.models = {name: dict(self.default, **behavior) for name, behavior in profile.get('models', {}).items()}
+        self._latency = {}
+        self._rng = random.Random(profile.get('seed'))
+        self._lock = threading.Lock()
+        self._windows = {}
+        self._stats = {'requests': 0, 'streams': 0, 'by_model': {}, 'by_status': {}, 'malformed': 0, 'cut_streams': 0,
+                       'prompt_tokens': 0, 'completion_tokens': 0}
+        self.server = _Server((host, port), _Handler)
+        self.server.fake = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/api/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def behavior(self, model):
+        return self.models.get(model, self.default)
+
+    def random(self):
+        with self._lock:
+            return self._rng.random()
+
+    def latency(self, behavior):
+        spec = behavior['latency']
+        with self._lock:
+            sampler = self._latency.get(spec)
+            if sampler is None:
+                sampler = self._latency[spec] = parse_latency(spec)
+            return sampler(self._rng)
+
+    def content(self, behavior, prompt):
+        with self._lock:
+            content = behavior['content'] if behavior['content'] is not None else canned_content(prompt, self._rng)
+            if behavior['malformed_rate'] and self._rng.random() < behavior['malformed_rate']:
+                self._stats['malformed'] += 1
+                content = malform(content, self._rng)
+            return content
+
+    def take_rpm_slot(self, api_key, rpm):
+        """Sliding one-minute window per key; returns seconds until a slot frees, 0 if admitted"""
+        now = time.time()
+        with self._lock:
+            window = [t for t in self._windows.get(api_key, []) if now - t < 60]
+            if len(window) >= rpm:
+                self._windows[api_key] = window
+                return 60 - (now - window[0])
+            window.append(now)
+            self._windows[api_key] = window
+            return 0
+
+    def record(self, model, status, stream=False, cut=False, prompt='', content=''):
+        with self._lock:
+            self._stats['requests'] += 1
+            # Whitespace-separated words stand in for tokens, as in the usage block
+            self._stats['prompt_tokens'] += len(prompt.split())
+            self._stats['completion_tokens'] += len(content.split())
+            self._stats['streams'] += int(stream)
+            self._stats['cut_streams'] += int(cut)
+            self._stats['by_model'][model] = self._stats['by_model'].get(model, 0) + 1
+            self._stats['by_status'][str(status)] = self._stats['by_status'].get(str(status), 0) + 1
+
+    def stats(self):
+        with self._lock:
+            return json.loads(json.dumps(self._stats))
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # load tests open hundreds of connections at once
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, str(value))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        fake = self.server.fake
+        if self.path.rstrip('/') == '/stats':
+            return self._send_json(200, fake.stats())
+        if self.path.rstrip('/') == '/api/v1/models':
+            return self._send_json(200, {"data": [{"id": name} for name in fake.models]})
+        self._send_json(404, {"error": {"code": 404, "message": "Not found"}})
+
+    def do_POST(self):
+        fake = self.server.fake
+        raw = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.path.rstrip('/') != '/api/v1/chat/completions':
+            return self._send_json(404, {"error": {"code": 404, "message": "Not found"}})
+        try:
+            request = json.loads(raw)
+            model = request['model']
+            prompt = request['messages'][-1]['content']
+        except (ValueError, KeyError, IndexError, TypeError):
+            fake.record(None, 400)
+            return self._send_json(400, {"error": {"code": 400, "message": "Invalid request body"}})
+
+        behavior = fake.behavior(model)
+        stream = bool(request.get('stream'))
+        time.sleep(fake.latency(behavior))
+
+        status, headers, message = self._injected_failure(fake, behavior)
+        if status:
+            fake.record(model, status)
+            return self._send_json(status, {"error": {"code": status, "message": message}}, headers)
+
+        content = fake.content(behavior, prompt)
+        if stream:
+            return self._stream(fake, behavior, model, prompt, content)
+        fake.record(model, 200, prompt=prompt, content=content)
+        self._send_json(200, {
+            "id": f"gen-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": len(content.split()),
+                      "total_tokens": len(prompt.split()) + len(content.split())}
+        })
+
+    def _injected_failure(self, fake, behavior):
+        """(status, headers, message) for a failure to inject, or (None, None, None)"""
+        if behavior['status'] and behavior['status'] != 200:
+            return behavior['status'], {}, f"Injected {behavior['status']}"
+        if behavior['rpm']:
+            wait = fake.take_rpm_slot(self.headers.get('Authorization', ''), behavior['rpm'])
+            if wait:
+                reset_ms = int((time.time() + wait) * 1000)
+                return 429, {'X-RateLimit-Limit': behavior['rpm'], 'X-RateLimit-Remaining': 0,
+                             'X-RateLimit-Reset': reset_ms}, "Rate limit exceeded"
+        if behavior['rate_limit_rate'] and fake.random() < behavior['rate_limit_rate']:
+            return 429, {'Retry-After': behavior['retry_after']}, "Injected rate limit"
+        if behavior['error_rate'] and fake.random() < behavior['error_rate']:
+            return behavior['error_status'], {}, "Injected upstream error"
+        return None, None, None
+
+    def _stream(self, fake, behavior, model, prompt, content):
+        cut = bool(behavior['stream_cut_rate']) and fake.random() < behavior['stream_cut_rate']
+        fake.record(model, 200, stream=True, cut=cut, prompt=prompt, content=content)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        if cut:
+            self.send_header('Connection', 'close')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        generation = f"gen-{uuid.uuid4().hex[:12]}"
+        size = max(int(behavior['chunk_chars']), 1)
+        pieces = [content[i:i + size] for i in range(0, len(content), size)] or ['']
+        self._write_chunk(b": OPENROUTER PROCESSING\n\n")
+        for index, piece in enumerate(pieces):
+            if cut and index >= len(pieces) // 2:
+                # Drop the connection mid-answer without a terminating chunk
+                self.close_connection = True
+                return
+            event = {"id": generation, "object": "chat.completion.chunk", "model": model,
+                     "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+            self._write_chunk(f"data: {json.dumps(event)}\n\n".encode('utf-8'))
+            time.sleep(float(behavior['chunk_delay']))
+        final = {"id": generation, "object": "chat.completion.chunk", "model": model,
+                 "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+        self._write_chunk(f"data: {json.dumps(final)}\n\n".encode('utf-8'))
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local fake OpenRouter chat completions server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--config', help='JSON profile file (see module docstring)')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--latency', help='default latency spec, e.g. 0.5 or lognormal:0.4:0.5')
+    parser.add_argument('--error-rate', type=float)
+    parser.add_argument('--rate-limit-rate', type=float)
+    parser.add_argument('--malformed-rate', type=float)
+    parser.add_argument('--rpm', type=int, help='per-key requests per minute before 429s')
+    args = parser.parse_args(argv)
+
+    profile = {}
+    if args.config:
+        with open(args.config) as f:
+            profile = json.load(f)
+    profile.setdefault('default', {})
+    if args.seed is not None:
+        profile['seed'] = args.seed
+    for option, key in [('latency', 'latency'), ('error_rate', 'error_rate'), ('rate_limit_rate', 'rate_limit_rate'),
+                        ('malformed_rate', 'malformed_rate'), ('rpm', 'rpm')]:
+        if getattr(args, option) is not None:
+            profile['default'][key] = getattr(args, option)
+    for behavior in [profile['default']] + list(profile.get('models', {}).values()):
+        if 'latency' in behavior:
+            parse_latency(behavior['latency'])  # fail fast on a bad spec
+
+    fake = FakeOpenRouter(profile, args.host, args.port)
+    print(f"Fake OpenRouter listening on {fake.base_url}", file=sys.stderr)
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,290 @@
+"""
+Interview history: one row per finished interview, read a page at a time.
+
+The old app opened a new MySQL connection for every /history request and
+every finished interview, and /history returned the whole table, every
+candidate's interviews included. Here each row carries the candidate_id of
+the browser session that finished it, and a page only ever reads one
+candidate's rows:
+- connections come from a small pool (HISTORY_POOL_SIZE), opened on first
+  use and reused; a connection that raised is closed instead of reused
+- interview_history is indexed on (candidate_id, date) and on date, and
+  /history pages through one candidate's rows with a keyset cursor: each
+  page returns next_before ("<date>|<id>"), and the next page starts
+  strictly after that row, so deep pages cost the same as the first and
+  rows recorded meanwhile do not shift the pages
+- role, type and domain filters are plain equality on the same query
+
+Backends:
+- SQLiteHistoryStore: on-disk, shared by all workers on the host, runs with
+  no database server (HISTORY_PATH)
+- MySQLHistoryStore: the original interview_history database, needs the
+  optional mysql-connector-python package (HISTORY_MYSQL_*)
+"""
+import os
+import time
+import queue
+import sqlite3
+import threading
+import logging
+from datetime import datetime
+from contextlib import contextmanager
+
+try:
+    import mysql.connector
+except ImportError:  # optional: only needed for HISTORY_BACKEND=mysql
+    mysql = None
+
+logger = logging.getLogger(__name__)
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def parse_before(before):
+    """(date, id) from a next_before cursor; a bare date pages from before that date"""
+    date, _, row_id = before.partition('|')
+    date = datetime.fromisoformat(date.strip()).strftime(DATE_FORMAT)
+    return date, int(row_id) if row_id else None
+
+
+class ConnectionPool:
+    """At most size DB-API connections, opened lazily and handed out one caller at a time"""
+
+    def __init__(self, connect, size=4, timeout=10.0):
+        self._connect = connect
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.waits = 0
+
+    @contextmanager
+    def connection(self):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.waits += 1
+            if not self._slots.acquire(timeout=self.timeout):
+                raise TimeoutError(f"No history connection free after {self.timeout}s")
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+                with self._lock:
+                    self.opened += 1
+            try:
+                yield conn
+            except BaseException:
+                # The connection may be broken or mid-transaction; do not reuse it
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+                raise
+            self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class HistoryStore:
+    """interview_history in a SQL database; subclasses supply the connection and schema"""
+
+    name = None
+    placeholder = '?'
+    schema = ()
+    indexes = ()
+
+    def __init__(self, connect, pool_size=4):
+        self.pid = os.getpid()
+        self.pool = ConnectionPool(connect, pool_size)
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.pages = 0
+        self.page_seconds = 0.0
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            for statement in self.schema:
+                cursor.execute(statement)
+            self._migrate(cursor)
+            for statement in self.indexes:
+                cursor.execute(statement)
+            conn.commit()
+            cursor.close()
+
+    def _migrate(self, cursor):
+        """Bring a table created elsewhere up to the schema; nothing to do by default"""
+
+    def record(self, candidate_id, role, interview_type, domain, score, date=None):
+        """Store one finished interview of candidate_id; returns its id"""
+        date = date or datetime.now().strftime(DATE_FORMAT)
+        p = self.placeholder
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'INSERT INTO interview_history (candidate_id, date, role, type, domain, score) '
+                           f'VALUES ({p}, {p}, {p}, {p}, {p}, {p})',
+                           (candidate_id, date, role, interview_type, domain, score))
+            row_id = cursor.lastrowid
+            conn.commit()
+            cursor.close()
+        with self._lock:
+            self.recorded += 1
+        return row_id
+
+    def page(self, candidate_id, before=None, limit=10, role=None, interview_type=None, domain=None):
+        """Up to limit of candidate_id's interviews, newest first, older than the before cursor"""
+        started = time.monotonic()
+        p = self.placeholder
+        where, params = [f'candidate_id = {p}'], [candidate_id]
+        for column, value in (('role', role), ('type', interview_type), ('domain', domain)):
+            if value:
+                where.append(f'{column} = {p}')
+                params.append(value)
+        if before:
+            date, row_id = parse_before(before)
+            if row_id is None:
+                where.append(f'date < {p}')
+                params.append(date)
+            else:
+                where.append(f'(date < {p} OR (date = {p} AND id < {p}))')
+                params.extend([date, date, row_id])
+        sql = 'SELECT id, date, role, type, domain, score FROM interview_history WHERE ' + ' AND '.join(where)
+        # One row past the page tells whether there is a next one
+        sql += f' ORDER BY date DESC, id DESC LIMIT {p}'
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params + [limit + 1])
+            rows = cursor.fetchall()
+            cursor.close()
+        items = []
+        for row_id, date, role, interview_type, domain, score in rows[:limit]:
+            if isinstance(date, datetime):
+                date = date.strftime(DATE_FORMAT)
+            items.append({'id': row_id, 'date': date, 'role': role, 'type': interview_type, 'domain': domain, 'score': score})
+        with self._lock:
+            self.pages += 1
+            self.page_seconds += time.monotonic() - started
+        next_before = f"{items[-1]['date']}|{items[-1]['id']}" if len(rows) > limit else None
+        return {'items': items, 'next_before': next_before}
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': self.name,
+                'recorded': self.recorded,
+                'pages': self.pages,
+                'avg_page_ms': round(self.page_seconds / self.pages * 1000, 2) if self.pages else None,
+                'pool_size': self.pool.size,
+                'connections_opened': self.pool.opened,
+                'pool_waits': self.pool.waits
+            }
+
+    def close(self):
+        self.pool.close()
+
+
+class SQLiteHistoryStore(HistoryStore):
+    """History in a local SQLite file, no database server needed"""
+
+    name = 'sqlite'
+    placeholder = '?'
+    schema = (
+        'CREATE TABLE IF NOT EXISTS interview_history ('
+        'id INTEGER PRIMARY KEY, candidate_id TEXT, date TEXT NOT NULL, role TEXT, type TEXT, domain TEXT, score REAL)',
+    )
+    indexes = (
+        'CREATE INDEX IF NOT EXISTS idx_interview_history_date ON interview_history (date)',
+        'CREATE INDEX IF NOT EXISTS idx_interview_history_candidate_date ON interview_history (candidate_id, date)'
+    )
+
+    def __init__(self, path='history.sqlite3', pool_size=4):
+        self.path = path
+        super().__init__(self._connect, pool_size)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _migrate(self, cursor):
+        cursor.execute('PRAGMA table_info(interview_history)')
+        if 'candidate_id' not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute('ALTER TABLE interview_history ADD COLUMN candidate_id TEXT')
+
+
+class MySQLHistoryStore(HistoryStore):
+    """History in MySQL, as the original app kept it"""
+
+    name = 'mysql'
+    placeholder = '%s'
+    schema = (
+        'CREATE TABLE IF NOT EXISTS interview_history ('
+        'id BIGINT AUTO_INCREMENT PRIMARY KEY, candidate_id VARCHAR(64), date DATETIME NOT NULL, role VARCHAR(255), '
+        'type VARCHAR(64), domain VARCHAR(255), score DOUBLE, INDEX idx_interview_history_date (date), '
+        'INDEX idx_interview_history_candidate_date (candidate_id, date))',
+    )
+
+    def __init__(self, pool_size=4, **config):
+        if mysql is None:
+            raise RuntimeError("HISTORY_BACKEND=mysql needs the mysql-connector-python package")
+        self.config = config
+        super().__init__(self._connect, pool_size)
+
+    def _connect(self):
+        return mysql.connector.connect(**self.config)
+
+    def _migrate(self, cursor):
+        # A table made by the old app has neither the id the cursor pages on, the
+        # candidate column nor the indexes; its rows belong to no candidate
+        for column, definition in (('id', 'BIGINT AUTO_INCREMENT PRIMARY KEY FIRST'), ('candidate_id', 'VARCHAR(64)')):
+            cursor.execute("SELECT COUNT(*) FROM information_schema.columns WHERE table_schema = DATABASE() "
+                           "AND table_name = 'interview_history' AND column_name = %s", (column,))
+            if not cursor.fetchone()[0]:
+                cursor.execute(f'ALTER TABLE interview_history ADD COLUMN {column} {definition}')
+        for index, columns in (('idx_interview_history_date', 'date'), ('idx_interview_history_candidate_date', 'candidate_id, date')):
+            cursor.execute("SELECT COUNT(*) FROM information_schema.statistics WHERE table_schema = DATABASE() "
+                           "AND table_name = 'interview_history' AND index_name = %s", (index,))
+            if not cursor.fetchone()[0]:
+                cursor.execute(f'CREATE INDEX {index} ON interview_history ({columns})')
+
+
+def build_history_store_from_env():
+    """Build the store configured by HISTORY_BACKEND (sqlite, mysql or off)"""
+    backend_name = os.getenv('HISTORY_BACKEND', 'sqlite').lower()
+    if backend_name in ['off', 'none', 'false', '0']:
+        return None
+    pool_size = int(os.getenv('HISTORY_POOL_SIZE', '4'))
+    if backend_name == 'mysql':
+        return MySQLHistoryStore(
+            pool_size,
+            host=os.getenv('HISTORY_MYSQL_HOST', 'localhost'),
+            port=int(os.getenv('HISTORY_MYSQL_PORT', '3306')),
+            user=os.getenv('HISTORY_MYSQL_USER', 'root'),
+            password=os.getenv('HISTORY_MYSQL_PASSWORD', ''),
+            database=os.getenv('HISTORY_MYSQL_DATABASE', 'interview_sim')
+        )
+    return SQLiteHistoryStore(os.getenv('HISTORY_PATH', 'history.sqlite3'), pool_size)
+
+
+_store = None
+_store_built = False
+_lock = threading.Lock()
+
+
+def get_history_store():
+    """Return this process's history store (None when disabled); a forked worker opens its own connections"""
+    global _store, _store_built
+    with _lock:
+        if not _store_built or (_store is not None and _store.pid != os.getpid()):
+            _store = build_history_store_from_env()
+            _store_built = True
+        return _store
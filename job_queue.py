@@ -0,0 +1,220 @@
+"""
+Bounded in-process background job queue.
+
+Used to take slow LLM calls (answer scoring) off Flask's request threads:
+the route submits a job and returns at once, and the result is picked up
+later through a status endpoint. Jobs run in the worker process that
+created them and are dropped JOB_RESULT_TTL seconds after finishing.
+
+The session is shared by every worker, so the next request may land on a
+worker that never saw the job. Finished jobs are therefore also published
+to a JobResultStore (JOB_RESULTS=sqlite, JOB_RESULTS_PATH) that every worker
+on the host reads: get() and wait() look there when the job is not local.
+"""
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class QueueFull(Exception):
+    """Raised when the queue already holds max_pending unfinished jobs"""
+
+
+class Job:
+    def __init__(self, kind):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    @classmethod
+    def finished_elsewhere(cls, job_id, kind, status, result, error, created, finished):
+        """A job another worker ran, rebuilt from its stored result"""
+        job = cls(kind)
+        job.id = job_id
+        job.status = status
+        job.result = result
+        job.error = error
+        job.created = created
+        job.finished = finished
+        job._done.set()
+        return job
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'error': self.error,
+            'created': self.created,
+            'finished': self.finished
+        }
+
+
+class JobResultStore:
+    """Finished job results in SQLite, readable by every worker on the host"""
+
+    def __init__(self, path='job_results.sqlite3', result_ttl=900.0):
+        self.path = path
+        self.result_ttl = result_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS job_results ('
+            'job_id TEXT PRIMARY KEY, kind TEXT, status TEXT NOT NULL, result TEXT, error TEXT, '
+            'created REAL, finished REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_job_results_finished ON job_results (finished)')
+        self._conn.commit()
+
+    def put(self, job):
+        with self._lock:
+            self._conn.execute('DELETE FROM job_results WHERE finished < ?', (time.time() - self.result_ttl,))
+            self._conn.execute(
+                'INSERT OR REPLACE INTO job_results (job_id, kind, status, result, error, created, finished) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (job.id, job.kind, job.status, json.dumps(job.result), job.error, job.created, job.finished)
+            )
+            self._conn.commit()
+
+    def get(self, job_id):
+        """The finished Job stored under job_id, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT kind, status, result, error, created, finished FROM job_results WHERE job_id = ? AND finished >= ?',
+                (job_id, time.time() - self.result_ttl)
+            ).fetchone()
+        if row is None:
+            return None
+        kind, status, result, error, created, finished = row
+        return Job.finished_elsewhere(job_id, kind, status, json.loads(result), error, created, finished)
+
+
+class JobQueue:
+    """Runs jobs on a bounded thread pool and keeps their results for a while"""
+
+    def __init__(self, max_workers=None, max_pending=None, result_ttl=None, result_store=None):
+        self.max_workers = max_workers or int(os.getenv('JOB_WORKERS', '4'))
+        self.max_pending = max_pending or int(os.getenv('JOB_MAX_PENDING', '100'))
+        self.result_ttl = result_ttl or float(os.getenv('JOB_RESULT_TTL', '900'))
+        self.result_store = result_store
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.rejected = 0
+        self.remote_hits = 0
+
+    def _expire(self, now):
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished is not None and now - job.finished > self.result_ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _pending(self):
+        return sum(1 for job in self._jobs.values() if job.finished is None)
+
+    def submit(self, kind, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs) and return its Job; raises QueueFull when saturated"""
+        job = Job(kind)
+        with self._lock:
+            self._expire(time.time())
+            if self._pending() >= self.max_pending:
+                self.rejected += 1
+                raise QueueFull(f"{self.max_pending} jobs already pending")
+            self._jobs[job.id] = job
+            self.submitted += 1
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = RUNNING
+        try:
+            job.result = fn(*args, **kwargs)
+            job.status = DONE
+        except Exception as e:
+            logger.error(f"Job {job.kind} {job.id} failed: {e}", exc_info=True)
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished = time.time()
+            if self.result_store is not None:
+                try:
+                    self.result_store.put(job)
+                except Exception as e:
+                    logger.error(f"Could not publish result of job {job.id}: {e}")
+            job._done.set()
+
+    def get(self, job_id):
+        """The job, from this process or as finished by another worker; None if unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None and self.result_store is not None:
+            job = self.result_store.get(job_id)
+            if job is not None:
+                with self._lock:
+                    self.remote_hits += 1
+        return job
+
+    def wait(self, job_id, timeout=0):
+        """The job once finished, waiting up to timeout seconds; None if it is not finished (or unknown)"""
+        deadline = time.monotonic() + timeout
+        delay = 0.05
+        while True:
+            job = self.get(job_id)
+            if job is not None and job.wait(max(deadline - time.monotonic(), 0)):
+                return job
+            remaining = deadline - time.monotonic()
+            if job is not None or remaining <= 0:
+                return None
+            # Running on another worker: poll the shared results
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.5)
+
+    def stats(self):
+        with self._lock:
+            self._expire(time.time())
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return {
+                'workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'submitted': self.submitted,
+                'rejected': self.rejected,
+                'remote_hits': self.remote_hits,
+                'results': 'sqlite' if self.result_store is not None else 'memory',
+                'jobs': counts
+            }
+
+
+def build_result_store_from_env():
+    """Build the shared result store configured by JOB_RESULTS (sqlite or off)"""
+    if os.getenv('JOB_RESULTS', 'sqlite').lower() in ['off', 'none', 'false', '0']:
+        return None
+    return JobResultStore(os.getenv('JOB_RESULTS_PATH', 'job_results.sqlite3'),
+                          float(os.getenv('JOB_RESULT_TTL', '900')))
+
+
+scoring_queue = JobQueue(result_store=build_result_store_from_env())
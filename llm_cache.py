@@ -0,0 +1,220 @@
+"""
+Content-addressed cache for parsed LLM responses.
+
+Entries are keyed by a hash of (model, prompt, max_tokens, temperature) and
+hold the value get_ai_response would return after _parse_json_like, so a hit
+skips both the upstream request and the parsing. Every hit is one request
+less against the OpenRouter free-tier daily quota.
+
+Backends:
+- MemoryLRUBackend: in-process OrderedDict, per worker
+- SQLiteBackend: on-disk, shared by all workers on the host
+"""
+import os
+import copy
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+MISS = object()
+
+
+def cache_key(model, prompt, max_tokens, temperature):
+    raw = json.dumps([model, prompt, max_tokens, temperature], ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class MemoryLRUBackend:
+    """Size-bounded in-process LRU with per-entry expiry"""
+
+    name = 'memory'
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISS
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return MISS
+            self._entries.move_to_end(key)
+            return copy.deepcopy(value)
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def size(self):
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteBackend:
+    """On-disk cache shared between workers; evicts least recently used rows past max_entries"""
+
+    name = 'sqlite'
+
+    def __init__(self, path='llm_cache.sqlite3', max_entries=5000):
+        self.path = path
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS llm_cache ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, last_access REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)')
+        self._conn.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT value, expires_at FROM llm_cache WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return MISS
+            if row[1] < now:
+                self._conn.execute('DELETE FROM llm_cache WHERE key = ?', (key,))
+                self._conn.commit()
+                return MISS
+            self._conn.execute('UPDATE llm_cache SET last_access = ? WHERE key = ?', (now, key))
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)',
+                (key, json.dumps(value), now + ttl, now)
+            )
+            self._conn.execute('DELETE FROM llm_cache WHERE expires_at < ?', (now,))
+            overflow = self._conn.execute('SELECT COUNT(*) FROM llm_cache').fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    'DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_access LIMIT ?)',
+                    (overflow,)
+                )
+                self.evictions += overflow
+            self._conn.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute('DELETE FROM llm_cache WHERE key = ?', (key,))
+            self._conn.commit()
+
+    def size(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM llm_cache').fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM llm_cache')
+            self._conn.commit()
+
+
+class ResponseCache:
+    """Backend-agnostic cache front with hit/miss counters"""
+
+    def __init__(self, backend, default_ttl=3600):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def get(self, key):
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            value = MISS
+        with self._lock:
+            if value is MISS:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        try:
+            self.backend.set(key, value, ttl or self.default_ttl)
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {e}")
+            return
+        with self._lock:
+            self.stores += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                'backend': self.backend.name,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stores': self.stores,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+                'evictions': self.backend.evictions,
+                'default_ttl': self.default_ttl
+            }
+        try:
+            stats['entries'] = self.backend.size()
+        except Exception:
+            stats['entries'] = None
+        return stats
+
+
+def build_cache_from_env():
+    """Build the cache configured by LLM_CACHE_BACKEND (memory, sqlite or off)"""
+    backend_name = os.getenv('LLM_CACHE_BACKEND', 'memory').lower()
+    if backend_name in ['off', 'none', 'false', '0']:
+        return None
+    max_entries = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '512'))
+    if backend_name == 'sqlite':
+        backend = SQLiteBackend(os.getenv('LLM_CACHE_PATH', 'llm_cache.sqlite3'), max_entries)
+    else:
+        backend = MemoryLRUBackend(max_entries)
+    return ResponseCache(backend, int(os.getenv('LLM_CACHE_TTL', '3600')))
+
+
+_cache = None
+_cache_built = False
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Return this process's response cache (None when disabled)"""
+    global _cache, _cache_built
+    with _cache_lock:
+        if not _cache_built or (_cache is not None and _cache.pid != os.getpid()):
+            _cache = build_cache_from_env()
+            _cache_built = True
+        return _cache
@@ -0,0 +1,329 @@
+"""
+Single-pass JSON extraction for LLM output.
+
+Models wrap JSON in code fences, prose and trailing commentary, and sometimes
+cut it off. extract_json() walks the text once, tracking string/escape state
+and bracket depth, and hands each balanced candidate to json.loads. Candidate
+spans never overlap, so the work is linear in the length of the output.
+
+When no JSON value is found, parse_llm_json() falls back to the heuristic
+extractors: quoted, numbered, bulleted and line-by-line questions, and
+score/feedback/suggestions fields. Their patterns are compiled once.
+
+StreamingJSONParser is the push-based counterpart for token streams. It
+reports each top-level field or array item as soon as it closes.
+"""
+import re
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+NO_JSON = object()
+
+_decoder = json.JSONDecoder(strict=False)
+# Brackets that can open a JSON value, ruling out prose like "{name}" or "[see above]".
+# One pattern per bracket so each starts with a literal, which re searches for in C.
+_OPENERS = (re.compile(r'\{(?=\s*["}])'), re.compile(r'\[(?=\s*[\[\]{"\-\dtfn])'))
+# A whole string literal (unterminated ones run to the end) or a bracket
+_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"?|[{}\[\]]', re.DOTALL)
+_CLOSERS = {'{': '}', '[': ']'}
+
+_QUOTED = re.compile(r'"([^"]+)"')
+_NUMBERED = re.compile(r'\d+\.\s*([^\n]+)')
+_BULLETED = re.compile(r'[-*]\s*([^\n]+)')
+_SCORE = re.compile(r'(?:score|rating)[\s:]*(\d+)', re.IGNORECASE)
+_FEEDBACK = re.compile(r'(?:feedback|evaluation|assessment)[\s:]*([^.]+)', re.IGNORECASE)
+_SUGGESTIONS = re.compile(r'(?:suggestion|improvement|recommendation)[\s:]*([^.]+)', re.IGNORECASE)
+
+QUESTION_KEYWORDS = ('generate', 'questions', 'interview')
+FEEDBACK_KEYWORDS = ('feedback', 'summary', 'evaluate', 'score')
+
+
+def strip_code_fences(text):
+    """Return the body of the first ``` fenced block, or the text unchanged if it has none"""
+    opening = text.find('```')
+    if opening < 0:
+        return text
+    body_start = opening + 3
+    while body_start < len(text) and text[body_start].isalpha():
+        body_start += 1
+    closing = text.find('```', body_start)
+    return text[body_start:closing if closing >= 0 else len(text)].strip()
+
+
+def _candidate_spans(text):
+    """Yield (start, end) spans worth handing to json.loads, in preference order.
+
+    Each top-level balanced value is yielded, followed by the values directly
+    inside it in case the outer one does not parse. When a top-level value is
+    cut off or its brackets do not match, only its complete children are
+    yielded.
+    """
+    # Track the next object and array opener separately and only search again
+    # for the one that was passed, so prose is scanned once per pattern
+    next_at = [-1, -1]
+    pos = 0
+    while True:
+        for i, opener in enumerate(_OPENERS):
+            if next_at[i] < pos:
+                found = opener.search(text, pos)
+                next_at[i] = found.start() if found else len(text)
+        start = min(next_at)
+        if start == len(text):
+            return
+        pos = start + 1
+        expected = [_CLOSERS[text[start]]]
+        children = []
+        child_start = None
+        while expected:
+            token = _TOKEN.search(text, pos)
+            if not token:
+                # Cut off: whatever completed inside is still worth a try
+                yield from children
+                return
+            char, pos = token.group()[0], token.end()
+            if char == '"':
+                continue
+            if char in _CLOSERS:
+                if len(expected) == 1:
+                    child_start = token.start()
+                expected.append(_CLOSERS[char])
+            elif char != expected[-1]:
+                # Mismatched bracket: give up on this value but keep what completed inside it
+                break
+            else:
+                expected.pop()
+                if len(expected) == 1:
+                    children.append((child_start, pos))
+        if not expected:
+            yield start, pos
+        yield from children
+
+
+def extract_json(text):
+    """Return the first JSON value in `text`, or NO_JSON"""
+    stripped = text.strip()
+    for candidate in (stripped, strip_code_fences(stripped)):
+        try:
+            return _decoder.decode(candidate)
+        except (json.JSONDecodeError, RecursionError):
+            pass
+    for start, end in _candidate_spans(text):
+        try:
+            return _decoder.decode(text[start:end])
+        except (json.JSONDecodeError, RecursionError):
+            continue
+    return NO_JSON
+
+
+def extract_questions(text):
+    """Questions from quoted, numbered, bulleted or one-per-line output; None if fewer than 3"""
+    for label, pattern in (('quoted strings', _QUOTED), ('numbered format', _NUMBERED), ('bullet format', _BULLETED)):
+        questions = pattern.findall(text)
+        if len(questions) >= 3:
+            logger.info(f"Extracted {len(questions)} questions from {label}")
+            return questions
+
+    lines = (line.strip() for line in text.split('\n'))
+    questions = [line for line in lines
+                 if len(line) > 20 and '?' in line
+                 and not line.startswith(('[', '{', '```', 'Generate'))]
+    if len(questions) >= 3:
+        logger.info(f"Extracted {len(questions)} questions from line format")
+        return questions
+    return None
+
+
+def extract_feedback(text):
+    """score/feedback/suggestions fields from free-text evaluation; None if none found"""
+    feedback = {}
+    score = _SCORE.search(text)
+    if score:
+        feedback['score'] = int(score.group(1))
+    for key, pattern in (('feedback', _FEEDBACK), ('suggestions', _SUGGESTIONS)):
+        match = pattern.search(text)
+        if match:
+            feedback[key] = match.group(1).strip()
+    if feedback:
+        logger.info(f"Extracted structured feedback data: {feedback}")
+        return feedback
+    return None
+
+
+def parse_llm_json(content, prompt=""):
+    """Parse an LLM response: JSON first, then heuristics chosen by the prompt; None if nothing fits"""
+    if not isinstance(content, str):
+        return content
+
+    content = content.strip()
+    logger.debug(f"Parsing content: {content[:300]}...")
+    result = extract_json(content)
+    if result is not NO_JSON:
+        return result
+
+    prompt = prompt.lower()
+    if any(keyword in prompt for keyword in QUESTION_KEYWORDS):
+        questions = extract_questions(content)
+        if questions:
+            return questions
+    if any(keyword in prompt for keyword in FEEDBACK_KEYWORDS):
+        feedback = extract_feedback(content)
+        if feedback:
+            return feedback
+
+    quoted = _QUOTED.findall(content)
+    if len(quoted) >= 2:
+        logger.info(f"Extracted {len(quoted)} strings from content")
+        return quoted
+
+    logger.warning(f"Could not parse content: {content[:100]}...")
+    return None
+
+
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+_SPECIAL = re.compile(r'[{}\[\]",:]')
+
+
+class StreamingJSONParser:
+    """Push parser for one JSON object or array that arrives in chunks.
+
+    feed() returns the top-level members that completed with that chunk:
+    (field name, value) pairs for an object, (index, value) pairs for an
+    array. Strings complete at their closing quote, nested values at their
+    closing bracket, and numbers and literals at the next comma or bracket.
+    Text before the opening bracket, such as a code fence or preamble, is
+    skipped. Each chunk is scanned once. Incomplete strings are rescanned
+    from their opening quote.
+    """
+
+    def __init__(self):
+        self.buffer = ''
+        self.kind = None
+        self.fields = {}
+        self.items = []
+        self.done = False
+        self.failed = False
+        self._pos = 0
+        self._closers = []
+        self._expect = None
+        self._key = None
+        self._value_start = None
+
+    def _open_root(self):
+        found = [opener.search(self.buffer, self._pos) for opener in _OPENERS]
+        found = [match for match in found if match]
+        if not found:
+            # Openers before the last one were already followed by something else
+            last = max(self.buffer.rfind('{', self._pos), self.buffer.rfind('[', self._pos))
+            self._pos = last if last >= 0 else len(self.buffer)
+            return False
+        start = min(match.start() for match in found)
+        self.kind = 'object' if self.buffer[start] == '{' else 'array'
+        self._closers = [_CLOSERS[self.buffer[start]]]
+        self._expect = 'key' if self.kind == 'object' else 'value'
+        self._value_start = start + 1
+        self._pos = start + 1
+        return True
+
+    def _complete(self, value, completed):
+        if self.kind == 'object':
+            self.fields[self._key] = value
+            completed.append((self._key, value))
+        else:
+            completed.append((len(self.items), value))
+            self.items.append(value)
+        self._expect = 'separator'
+
+    def _complete_scalar(self, end, completed):
+        text = self.buffer[self._value_start:end].strip()
+        if self._expect == 'value' and text:
+            try:
+                self._complete(_decoder.decode(text), completed)
+            except (json.JSONDecodeError, RecursionError):
+                pass
+
+    def feed(self, chunk):
+        """Add generated text; return the top-level members completed by it"""
+        self.buffer += chunk
+        completed = []
+        if self.done or self.failed or (self.kind is None and not self._open_root()):
+            return completed
+
+        buffer = self.buffer
+        while True:
+            match = _SPECIAL.search(buffer, self._pos)
+            if not match:
+                self._pos = len(buffer)
+                return completed
+            char, at = match.group(), match.start()
+            top_level = len(self._closers) == 1
+
+            if char == '"':
+                string = _STRING.match(buffer, at)
+                if not string:
+                    # Still being generated; resume from the opening quote
+                    self._pos = at
+                    return completed
+                self._pos = string.end()
+                if top_level and self._expect in ('key', 'value'):
+                    value = _decoder.decode(string.group())
+                    if self._expect == 'key':
+                        self._key, self._expect = value, 'colon'
+                    else:
+                        self._complete(value, completed)
+                continue
+
+            self._pos = at + 1
+            if char in _CLOSERS:
+                if top_level and self._expect == 'value':
+                    self._value_start = at
+                self._closers.append(_CLOSERS[char])
+            elif char in '}]':
+                if char != self._closers[-1]:
+                    self.failed = True
+                    return completed
+                self._closers.pop()
+                if not self._closers:
+                    self._complete_scalar(at, completed)
+                    self.done = True
+                    return completed
+                if len(self._closers) == 1 and self._expect == 'value':
+                    try:
+                        self._complete(_decoder.decode(buffer[self._value_start:at + 1]), completed)
+                    except (json.JSONDecodeError, RecursionError):
+                        self._expect = 'separator'
+            elif not top_level:
+                continue
+            elif char == ':' and self._expect == 'colon':
+                self._expect, self._value_start = 'value', at + 1
+            elif char == ',':
+                self._complete_scalar(at, completed)
+                self._expect = 'key' if self.kind == 'object' else 'value'
+                self._value_start = at + 1
+
+    def partial_string(self, name):
+        """Decoded text generated so far for a string field (None before it starts)"""
+        if name in self.fields:
+            value = self.fields[name]
+            return value if isinstance(value, str) else None
+        if self._key != name or self._expect != 'value' or self.buffer[self._pos:self._pos + 1] != '"':
+            return None
+        raw = self.buffer[self._pos + 1:]
+        # Don't cut an escape sequence in half
+        i = 0
+        while i < len(raw):
+            width = (6 if raw[i + 1:i + 2] == 'u' else 2) if raw[i] == '\\' else 1
+            if i + width > len(raw):
+                break
+            i += width
+        try:
+            return _decoder.decode(f'"{raw[:i]}"')
+        except json.JSONDecodeError:
+            return None
+
+    def result(self):
+        """The whole value once its closing bracket has arrived, else None"""
+        if not self.done:
+            return None
+        return dict(self.fields) if self.kind == 'object' else list(self.items)
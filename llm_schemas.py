@@ -0,0 +1,249 @@
+"""
+Declared response shapes for the structured prompts, with validation and repair.
+
+Each validate_*() takes whatever get_ai_response returned: parsed JSON, an
+{"error": ...} dict or None. It returns a typed result, or None when the
+shape cannot be repaired and the caller should fall back.
+
+A response that already has the declared shape takes the fast path: it is
+checked and wrapped without being rebuilt. Otherwise common model defects
+are repaired instead of spending another LLM call:
+- scores given as strings ("7", "7/10", "8 out of 10") or floats, clamped to 1-10
+- a list wrapped in an object ({"questions": [...]}), or items given as objects
+- numbered or bulleted items ("1. ...", "- ...") and duplicates
+- synonym keys ("rating", "areas_for_improvement") and extra keys
+- fewer items than asked for (4 questions instead of 5), down to MIN_ITEMS
+"""
+import re
+import threading
+from dataclasses import dataclass, asdict
+
+MIN_ITEMS = 3
+DEFAULT_SCORE = 3
+NO_FEEDBACK = "No feedback provided."
+
+_ITEM_PREFIX = re.compile(r'^(?:(?:Q|Question\s*)?\d+\s*[.):]\s*|[-*•]\s+)', re.IGNORECASE)
+_NUMBER = re.compile(r'\d+(?:\.\d+)?')
+
+_lock = threading.Lock()
+_stats = {}
+
+
+@dataclass(slots=True)
+class QuestionSet:
+    questions: list
+
+    def to_list(self):
+        return list(self.questions)
+
+
+@dataclass(slots=True)
+class AnswerFeedback:
+    feedback: str
+    score: int
+    suggestions: str = ''
+    corrections: str = ''
+    # One-phrase notes for the rolling interview summary, when asked for
+    strength: str = ''
+    improvement: str = ''
+    resource: str = ''
+
+    def to_dict(self):
+        return asdict(self)
+
+
+@dataclass(slots=True)
+class InterviewSummary:
+    strengths: list
+    improvements: list
+    resources: list
+    overall_score: int = None
+
+    def to_dict(self):
+        return asdict(self)
+
+
+@dataclass(slots=True)
+class TipList:
+    tips: list
+
+    def to_list(self):
+        return list(self.tips)
+
+
+def _count(kind, outcome):
+    with _lock:
+        counts = _stats.setdefault(kind, {'valid': 0, 'repaired': 0, 'rejected': 0})
+        counts[outcome] += 1
+
+
+def schema_stats():
+    """Per prompt kind: responses valid as returned, repaired and rejected"""
+    with _lock:
+        return {kind: dict(counts) for kind, counts in _stats.items()}
+
+
+def _is_error(raw):
+    return raw is None or (isinstance(raw, dict) and 'error' in raw)
+
+
+def _score(value):
+    """Integer score 1-10 from an int, float or text like "7/10"; None if there is none"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        number = value
+    elif isinstance(value, str):
+        match = _NUMBER.search(value)
+        if not match:
+            return None
+        number = float(match.group())
+    else:
+        return None
+    return min(10, max(1, int(round(number))))
+
+
+def _text(value):
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, list):
+        return ' '.join(_text(item) for item in value if item).strip()
+    return str(value)
+
+
+def _first(value):
+    items = _items(value)
+    return items[0] if items else ''
+
+
+def _pick(raw, keys):
+    for key in keys:
+        if raw.get(key) not in (None, ''):
+            return raw[key]
+    return None
+
+
+def _items(value, item_keys=()):
+    """Clean list of non-empty strings from a list (or a lone string) of strings or objects"""
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        return []
+    items = []
+    for item in value:
+        if isinstance(item, dict):
+            item = _pick(item, item_keys)
+        if not isinstance(item, str):
+            continue
+        item = _ITEM_PREFIX.sub('', item.strip()).strip().strip('"').strip()
+        if item and item not in items:
+            items.append(item)
+    return items
+
+
+def _unwrap_list(raw, keys):
+    """The list a model meant to return, even when it wrapped it in an object"""
+    if isinstance(raw, dict):
+        wrapped = _pick(raw, keys)
+        if wrapped is None:
+            lists = [value for value in raw.values() if isinstance(value, list)]
+            wrapped = lists[0] if len(lists) == 1 else None
+        return wrapped
+    return raw
+
+
+def _all_strings(raw):
+    return isinstance(raw, list) and all(isinstance(item, str) and item.strip() for item in raw)
+
+
+def _is_clean_list(raw, maximum):
+    return _all_strings(raw) and MIN_ITEMS <= len(raw) <= maximum
+
+
+def validate_questions(raw, expected=5):
+    """QuestionSet of MIN_ITEMS..expected questions, or None"""
+    if _is_error(raw):
+        return None
+    if _is_clean_list(raw, expected):
+        _count('questions', 'valid')
+        return QuestionSet(raw)
+    questions = _items(_unwrap_list(raw, ('questions', 'interview_questions')), ('question', 'text', 'q'))
+    if len(questions) < MIN_ITEMS:
+        _count('questions', 'rejected')
+        return None
+    _count('questions', 'repaired')
+    return QuestionSet(questions[:expected])
+
+
+def validate_tips(raw, expected=5):
+    """TipList of MIN_ITEMS..expected tips, or None"""
+    if _is_error(raw):
+        return None
+    if _is_clean_list(raw, expected):
+        _count('tips', 'valid')
+        return TipList(raw)
+    tips = _items(_unwrap_list(raw, ('tips', 'interview_tips', 'advice')), ('tip', 'text', 'advice'))
+    if len(tips) < MIN_ITEMS:
+        _count('tips', 'rejected')
+        return None
+    _count('tips', 'repaired')
+    return TipList(tips[:expected])
+
+
+_FEEDBACK_FIELDS = {'feedback', 'score', 'suggestions', 'corrections', 'strength', 'improvement', 'resource'}
+_TEXT_FIELDS = ('suggestions', 'corrections', 'strength', 'improvement', 'resource')
+
+
+def validate_feedback(raw):
+    """AnswerFeedback from an evaluation object, or None when it has neither feedback nor score"""
+    if _is_error(raw) or not isinstance(raw, dict):
+        return None
+    score = raw.get('score')
+    if (isinstance(raw.get('feedback'), str) and type(score) is int and 1 <= score <= 10
+            and raw.keys() <= _FEEDBACK_FIELDS and all(isinstance(raw.get(name, ''), str) for name in _TEXT_FIELDS)):
+        _count('feedback', 'valid')
+        return AnswerFeedback(raw['feedback'] or NO_FEEDBACK, score, *(raw.get(name, '') for name in _TEXT_FIELDS))
+
+    feedback = _text(_pick(raw, ('feedback', 'evaluation', 'assessment', 'comments')))
+    score = _score(_pick(raw, ('score', 'rating', 'grade')))
+    if not feedback and score is None:
+        _count('feedback', 'rejected')
+        return None
+    _count('feedback', 'repaired')
+    return AnswerFeedback(
+        feedback or NO_FEEDBACK,
+        DEFAULT_SCORE if score is None else score,
+        _text(_pick(raw, ('suggestions', 'suggestion', 'improvements', 'recommendations'))),
+        _text(_pick(raw, ('corrections', 'correction'))),
+        _first(_pick(raw, ('strength', 'strengths'))),
+        _first(_pick(raw, ('improvement', 'areas_for_improvement', 'weakness'))),
+        _first(_pick(raw, ('resource', 'resources')))
+    )
+
+
+_SUMMARY_LISTS = {
+    'strengths': ('strengths', 'strong_points', 'positives'),
+    'improvements': ('improvements', 'areas_for_improvement', 'weaknesses', 'areas_to_improve'),
+    'resources': ('resources', 'recommended_resources', 'learning_resources')
+}
+
+
+def validate_summary(raw):
+    """InterviewSummary (overall_score may be None), or None when every list is empty"""
+    if _is_error(raw) or not isinstance(raw, dict):
+        return None
+    score = raw.get('overall_score')
+    if (raw.keys() == {'strengths', 'improvements', 'resources', 'overall_score'}
+            and type(score) is int and 1 <= score <= 10
+            and all(_all_strings(raw[name]) for name in _SUMMARY_LISTS)):
+        _count('summary', 'valid')
+        return InterviewSummary(raw['strengths'], raw['improvements'], raw['resources'], score)
+
+    lists = {name: _items(_pick(raw, keys)) for name, keys in _SUMMARY_LISTS.items()}
+    if not any(lists.values()):
+        _count('summary', 'rejected')
+        return None
+    _count('summary', 'repaired')
+    return InterviewSummary(overall_score=_score(_pick(raw, ('overall_score', 'score', 'rating'))), **lists)
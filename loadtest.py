@@ -0,0 +1,322 @@
+"""
+End-to-end interview load test with per-route latency percentiles.
+
+Virtual candidates replay the full flow against a running app:
+
+    /configure -> /current_question -> 5 x /submit_answer -> /summary -> /export_pdf
+
+with optional think time between steps, and the run reports p50/p95/p99
+per route, throughput, error rate and LLM calls per interview (read from
+fake_openrouter's /stats).
+
+Spawn the Flask app against a local fake provider:
+
+    python loadtest.py --concurrency 20 --interviews 100 --think-time exp:1.0 --latency lognormal:0.4:0.4 --json run.json
+
+or drive an app that is already running (point its OPENROUTER_BASE_URL at a
+fake_openrouter instance and pass --fake-url to count LLM calls):
+
+    python loadtest.py --target http://127.0.0.1:5000 --fake-url http://127.0.0.1:8099
+
+--json writes machine-readable results; --compare baseline.json prints the
+change against an earlier run.
+"""
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from fake_openrouter import parse_latency
+
+ROUTES = ['/configure', '/current_question', '/submit_answer', '/summary', '/export_pdf']
+ANSWERS = [
+    "In my last role I led the migration of our billing service to a new database. I planned the rollout in phases and we finished with no downtime.",
+    "I start by reproducing the issue with logs and metrics, narrow it down with bisection, then write a regression test before fixing it.",
+    "We disagreed on an API design, so I wrote up both options with their trade-offs and we agreed on the simpler one after a short review.",
+    "I keep functions small, write tests for behaviour rather than implementation, and leave the code cleaner than I found it.",
+    "A release once broke checkout because we skipped a canary. Since then I insist on staged rollouts and automatic rollback."
+]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url, timeout=30):
+    import httpx
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up")
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def serve_flask(port, threads):
+    """working_app on a fixed pool of `threads` request threads (gunicorn gthread style)"""
+    from werkzeug.serving import BaseWSGIServer
+    from working_app import app
+
+    class PooledWSGIServer(BaseWSGIServer):
+        request_queue_size = 1024
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.pool = ThreadPoolExecutor(max_workers=threads)
+
+        def process_request(self, request, client_address):
+            self.pool.submit(self._handle, request, client_address)
+
+        def _handle(self, request, client_address):
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    PooledWSGIServer('127.0.0.1', port, app).serve_forever()
+
+
+def serve_fake_provider(port, profile):
+    from fake_openrouter import FakeOpenRouter
+    FakeOpenRouter(profile, port=port).server.serve_forever()
+
+
+def start_process(cmd, env):
+    return subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def app_env(fake_port):
+    """Environment for an app under test: real client path against the fake, no quota limits"""
+    return dict(os.environ,
+                FAKE_AI='false', OPENROUTER_API_KEY='loadtest', OPENROUTER_BASE_URL=f"http://127.0.0.1:{fake_port}/api/v1",
+                OPENROUTER_RPM='1000000', OPENROUTER_RPD='100000000', OPENROUTER_READ_TIMEOUT='300')
+
+
+class _Recorder:
+    def __init__(self):
+        self.samples = {route: [] for route in ROUTES}
+        self.errors = {route: 0 for route in ROUTES}
+        self.error_examples = []
+        self.interviews = 0
+        self.failed_interviews = 0
+
+    def record(self, route, seconds, ok, detail=None):
+        self.samples.setdefault(route, []).append(seconds)
+        if not ok:
+            self.errors[route] = self.errors.get(route, 0) + 1
+            if len(self.error_examples) < 10:
+                self.error_examples.append(f"{route}: {detail}")
+
+
+async def _interview(client, recorder, think, rng):
+    async def call(method, route, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, route, **kwargs)
+        except Exception as e:
+            recorder.record(route, time.perf_counter() - started, False, repr(e))
+            raise
+        elapsed = time.perf_counter() - started
+        ok = response.status_code < 400
+        if ok and response.headers.get('content-type', '').startswith('application/json'):
+            ok = response.json().get('status') != 'error'
+        recorder.record(route, elapsed, ok, f"HTTP {response.status_code}")
+        if not ok:
+            raise RuntimeError(f"{route} failed")
+        return response
+
+    async def pause():
+        if think is not None:
+            await asyncio.sleep(think(rng))
+
+    client.cookies.clear()
+    role = rng.choice(['Backend Engineer', 'Frontend Developer', 'Data Scientist'])
+    kind = rng.choice(['Technical', 'Behavioral'])
+    await call('POST', '/configure', json={'job_role': role, 'interview_type': kind, 'domain': 'Web'})
+    await pause()
+    current = (await call('GET', '/current_question')).json()
+    for index in range(current.get('total_questions', 5)):
+        await pause()
+        result = (await call('POST', '/submit_answer', json={'answer': ANSWERS[index % len(ANSWERS)]})).json()
+        if result.get('status') == 'complete':
+            break
+    await pause()
+    await call('GET', '/summary')
+    await call('GET', '/export_pdf')
+
+
+async def run_load(base_url, concurrency=10, interviews=None, think_time=None, seed=None, timeout=300):
+    """Run `interviews` full interviews over `concurrency` virtual candidates; return the raw recorder"""
+    import httpx
+    interviews = interviews or concurrency
+    think = parse_latency(think_time) if think_time else None
+    recorder = _Recorder()
+    remaining = [interviews]
+
+    async def candidate(number):
+        rng = random.Random(None if seed is None else seed + number)
+        async with httpx.AsyncClient(base_url=base_url, timeout=timeout, follow_redirects=False) as client:
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                try:
+                    await _interview(client, recorder, think, rng)
+                    recorder.interviews += 1
+                except Exception:
+                    recorder.failed_interviews += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[candidate(i) for i in range(concurrency)])
+    recorder.duration = time.perf_counter() - started
+    return recorder
+
+
+def _fake_requests(fake_url):
+    if not fake_url:
+        return None
+    import httpx
+    try:
+        return httpx.get(f"{fake_url.rstrip('/')}/stats", timeout=5).json()['requests']
+    except (httpx.HTTPError, ValueError, KeyError):
+        return None
+
+
+def build_report(recorder, llm_calls=None, config=None):
+    routes = {}
+    total_requests = total_errors = 0
+    for route, samples in recorder.samples.items():
+        if not samples:
+            continue
+        errors = recorder.errors.get(route, 0)
+        total_requests += len(samples)
+        total_errors += errors
+        routes[route] = {
+            'count': len(samples),
+            'errors': errors,
+            'mean': round(sum(samples) / len(samples), 4),
+            'p50': round(percentile(samples, 50), 4),
+            'p95': round(percentile(samples, 95), 4),
+            'p99': round(percentile(samples, 99), 4)
+        }
+    finished = recorder.interviews + recorder.failed_interviews
+    return {
+        'config': config or {},
+        'routes': routes,
+        'totals': {
+            'duration_s': round(recorder.duration, 2),
+            'interviews_completed': recorder.interviews,
+            'interviews_failed': recorder.failed_interviews,
+            'requests': total_requests,
+            'requests_per_s': round(total_requests / recorder.duration, 2) if recorder.duration else None,
+            'interviews_per_s': round(recorder.interviews / recorder.duration, 3) if recorder.duration else None,
+            'error_rate': round(total_errors / total_requests, 4) if total_requests else None,
+            'llm_calls': llm_calls,
+            'llm_calls_per_interview': round(llm_calls / finished, 2) if llm_calls is not None and finished else None
+        },
+        'error_examples': recorder.error_examples
+    }
+
+
+def print_report(report, baseline=None):
+    header = f"{'route':<20}{'count':>7}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    if baseline:
+        header += f"{'p95 vs base':>13}"
+    print(header)
+    print('-' * len(header))
+    for route, row in report['routes'].items():
+        line = (f"{route:<20}{row['count']:>7}{row['errors']:>8}{row['p50'] * 1000:>9.0f}"
+                f"{row['p95'] * 1000:>9.0f}{row['p99'] * 1000:>9.0f}")
+        base = (baseline or {}).get('routes', {}).get(route)
+        if base and base['p95']:
+            line += f"{(row['p95'] - base['p95']) / base['p95'] * 100:>+12.1f}%"
+        print(line)
+    totals = report['totals']
+    print('-' * len(header))
+    for key, value in totals.items():
+        base = (baseline or {}).get('totals', {}).get(key)
+        suffix = f"  (baseline {base})" if baseline and base is not None else ''
+        print(f"{key:<24}{value}{suffix}")
+    for example in report['error_examples']:
+        print(f"error: {example}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay full interview flows and report per-route latency")
+    parser.add_argument('--target', help='base URL of a running app; omit to spawn the Flask app against a fake provider')
+    parser.add_argument('--fake-url', help="fake_openrouter URL whose /stats counts LLM calls (with --target)")
+    parser.add_argument('--concurrency', type=int, default=10, help='virtual candidates running at once')
+    parser.add_argument('--interviews', type=int, help='total interviews to run (default: one per candidate)')
+    parser.add_argument('--think-time', help='pause between steps, e.g. 1.5, uniform:0.5:2 or exp:1.0')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=16, help='request threads for the spawned Flask app')
+    parser.add_argument('--latency', default='0.3', help='latency spec of the spawned fake provider')
+    parser.add_argument('--fake-profile', help='fake_openrouter JSON profile for the spawned provider')
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument('--compare', help='earlier --json results to compare against')
+    parser.add_argument('--serve-flask', nargs=2, metavar=('PORT', 'THREADS'), help=argparse.SUPPRESS)
+    parser.add_argument('--serve-fake', nargs=2, metavar=('PORT', 'PROFILE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_flask:
+        return serve_flask(int(args.serve_flask[0]), int(args.serve_flask[1]))
+    if args.serve_fake:
+        return serve_fake_provider(int(args.serve_fake[0]), json.loads(args.serve_fake[1]))
+
+    processes = []
+    try:
+        if args.target:
+            base_url, fake_url = args.target.rstrip('/'), args.fake_url
+        else:
+            profile = {'seed': args.seed, 'default': {'latency': args.latency}}
+            if args.fake_profile:
+                with open(args.fake_profile) as f:
+                    profile = json.load(f)
+            fake_port, app_port = free_port(), free_port()
+            fake_url, base_url = f"http://127.0.0.1:{fake_port}", f"http://127.0.0.1:{app_port}"
+            processes.append(start_process([sys.executable, __file__, '--serve-fake', str(fake_port), json.dumps(profile)], os.environ))
+            wait_for(f"{fake_url}/stats")
+            processes.append(start_process([sys.executable, __file__, '--serve-flask', str(app_port), str(args.threads)], app_env(fake_port)))
+            wait_for(f"{base_url}/health")
+
+        llm_before = _fake_requests(fake_url)
+        recorder = asyncio.run(run_load(base_url, args.concurrency, args.interviews, args.think_time, args.seed))
+        llm_after = _fake_requests(fake_url)
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    llm_calls = llm_after - llm_before if llm_before is not None and llm_after is not None else None
+    config = {key: value for key, value in vars(args).items() if key not in ('serve_flask', 'serve_fake', 'json', 'compare')}
+    report = build_report(recorder, llm_calls, config)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""
+Process-wide health registry and circuit breaker for LLM models.
+
+Every OpenRouter attempt reports its outcome here. Models that keep failing
+(or that are rate limited until a known reset time) get an open circuit and
+are skipped by get_ai_response without a network round-trip; after a
+cooldown a single half-open probe decides whether the circuit closes again.
+
+An authentication error (AUTH_ERRORS) is about the API key, not the model:
+it is recorded for the snapshot but never counts towards opening a circuit,
+so a bad key does not show up as "all models unavailable".
+"""
+import os
+import time
+import threading
+from collections import deque
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Statuses that reject the API key, whichever model is asked
+AUTH_ERRORS = (401, 403)
+
+
+def parse_rate_limit_reset(headers, now=None):
+    """Return the epoch time a rate limit resets, from Retry-After / X-RateLimit-Reset headers"""
+    now = now if now is not None else time.time()
+    headers = headers or {}
+    retry_after = headers.get('Retry-After')
+    if retry_after:
+        try:
+            return now + float(retry_after)
+        except ValueError:
+            pass
+    reset = headers.get('X-RateLimit-Reset')
+    if reset:
+        try:
+            value = float(reset)
+        except ValueError:
+            return None
+        if value > 1e12:  # epoch milliseconds (OpenRouter style)
+            return value / 1000.0
+        if value > 1e9:  # epoch seconds
+            return value
+        return now + value  # seconds from now
+    return None
+
+
+class ModelHealth:
+    """Rolling outcome window, latency samples and circuit state for one model"""
+
+    def __init__(self, window):
+        self.outcomes = deque(maxlen=window)
+        self.latencies = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.open_until = 0.0
+        self.rate_limited_until = None
+        self.probe_started = None
+        self.last_status = None
+        self.last_error = None
+        self.last_checked = None
+
+    @property
+    def success_rate(self):
+        if not self.outcomes:
+            return None
+        return sum(self.outcomes) / len(self.outcomes)
+
+    @property
+    def avg_latency(self):
+        if not self.latencies:
+            return None
+        return sum(self.latencies) / len(self.latencies)
+
+
+class HealthRegistry:
+    """Tracks per-model health and decides which models are worth calling"""
+
+    def __init__(self, failure_threshold=None, cooldown=None, window=20):
+        self.failure_threshold = failure_threshold or int(os.getenv('MODEL_CIRCUIT_FAILURES', '3'))
+        self.cooldown = cooldown if cooldown is not None else float(os.getenv('MODEL_CIRCUIT_COOLDOWN', '60'))
+        self.window = window
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def _health(self, model):
+        health = self._models.get(model)
+        if health is None:
+            health = self._models[model] = ModelHealth(self.window)
+        return health
+
+    def record_success(self, model, latency):
+        with self._lock:
+            health = self._health(model)
+            health.outcomes.append(1)
+            health.latencies.append(latency)
+            health.consecutive_failures = 0
+            health.state = CLOSED
+            health.probe_started = None
+            health.rate_limited_until = None
+            health.last_status = 200
+            health.last_error = None
+            health.last_checked = time.time()
+
+    def record_failure(self, model, status_code, error, latency=None, headers=None):
+        now = time.time()
+        with self._lock:
+            health = self._health(model)
+            if status_code in AUTH_ERRORS:
+                health.probe_started = None
+                health.last_status = status_code
+                health.last_error = (error or '')[:300]
+                health.last_checked = now
+                return
+            health.outcomes.append(0)
+            if latency is not None:
+                health.latencies.append(latency)
+            health.consecutive_failures += 1
+            health.probe_started = None
+            health.last_status = status_code
+            health.last_error = (error or '')[:300]
+            health.last_checked = now
+
+            reset_at = parse_rate_limit_reset(headers, now) if status_code == 429 else None
+            if reset_at:
+                health.rate_limited_until = reset_at
+                health.state = OPEN
+                health.open_until = max(reset_at, now + 1)
+            elif health.state == HALF_OPEN or health.consecutive_failures >= self.failure_threshold:
+                health.state = OPEN
+                health.open_until = now + self.cooldown
+
+    def release_probe(self, model):
+        """Give back a half-open probe slot that was never used (model not attempted or cancelled)"""
+        with self._lock:
+            health = self._models.get(model)
+            if health is not None:
+                health.probe_started = None
+
+    def _available(self, health, now):
+        if health.state == CLOSED:
+            return True
+        if health.state == OPEN and now >= health.open_until:
+            health.state = HALF_OPEN
+        if health.state != HALF_OPEN:
+            return False
+        # Only one probe at a time; a probe that never reported back expires
+        return health.probe_started is None or now - health.probe_started > self.cooldown
+
+    def order(self, models):
+        """Return callable models, healthiest first, dropping ones with an open circuit.
+
+        Preference order is kept between models of similar health; a half-open
+        model is handed out to exactly one caller as its recovery probe.
+        """
+        now = time.time()
+        ranked = []
+        with self._lock:
+            for index, model in enumerate(models):
+                health = self._health(model)
+                if not self._available(health, now):
+                    continue
+                rate = health.success_rate
+                ranked.append((health.state != CLOSED, -round(1.0 if rate is None else rate, 1), index, model))
+            ranked.sort()
+            for is_probe, _, _, model in ranked:
+                if is_probe:
+                    self._models[model].probe_started = now
+        return [model for _, _, _, model in ranked]
+
+    def snapshot(self, models=None):
+        now = time.time()
+        with self._lock:
+            names = models if models is not None else list(self._models)
+            result = {}
+            for model in names:
+                health = self._models.get(model)
+                if health is None:
+                    result[model] = {'state': 'unknown', 'samples': 0}
+                    continue
+                if health.state == OPEN and now >= health.open_until:
+                    state = HALF_OPEN
+                else:
+                    state = health.state
+                result[model] = {
+                    'state': state,
+                    'samples': len(health.outcomes),
+                    'success_rate': health.success_rate,
+                    'avg_latency': round(health.avg_latency, 3) if health.avg_latency is not None else None,
+                    'consecutive_failures': health.consecutive_failures,
+                    'rate_limited_until': health.rate_limited_until,
+                    'retry_in': round(max(health.open_until - now, 0), 1) if state == OPEN else 0,
+                    'last_status': health.last_status,
+                    'last_error': health.last_error,
+                    'last_checked': health.last_checked
+                }
+            return result
+
+
+health_registry = HealthRegistry()
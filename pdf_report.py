@@ -0,0 +1,471 @@
+"""
+Interview report PDFs: layout, rendering off the request thread, and a cache.
+
+/export_pdf used to draw the whole reportlab canvas inside the request on
+every click. Here a report is described by a plain dict (role, type, domain,
+date, summary and the scored turns; see describe_report) and:
+- write_reports lays reports out with a cursor that wraps text to the page
+  width (breaking over-long words), starts a new page when one is full and
+  numbers the pages, so the full question-by-question transcript fits
+  however long it is. render_report_file writes one report to a path; it is
+  a top-level function of plain data, so it can run in a worker process
+- ReportRenderer runs it in a process pool (PDF_RENDER_WORKERS), so layout
+  does not hold the GIL in web workers. With 0 workers, or if the pool
+  breaks, it renders in the calling thread
+- ReportCache keeps rendered PDFs on disk under their content hash
+  (report_key), shared by every worker on the host and bounded by
+  PDF_CACHE_MAX_BYTES, least recently used first out. The key doubles as
+  the response ETag, so a repeat download with If-None-Match is a 304
+- open_report hands back an open file, never the document's bytes, so the
+  web worker streams the PDF in chunks whatever its size
+"""
+import os
+import json
+import time
+import uuid
+import hashlib
+import tempfile
+import threading
+import logging
+import multiprocessing
+from io import BytesIO
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from transcript import Transcript
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout changes so cached PDFs are not served for the old one
+LAYOUT_VERSION = 2
+
+
+class RenderTimeout(Exception):
+    """A render took longer than PDF_RENDER_TIMEOUT; future is the render still running"""
+
+    def __init__(self, message, future):
+        super().__init__(message)
+        self.future = future
+
+
+def report_key(report):
+    """Content hash of a report description"""
+    raw = json.dumps([LAYOUT_VERSION, report], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+# Shown when an interview has no usable summary
+FALLBACK_SUMMARY = {
+    'strengths': ['Clear communication style', 'Good problem-solving approach', 'Structured thinking'],
+    'improvements': ['Provide more specific examples', 'Include metrics and outcomes', 'Expand technical depth'],
+    'resources': ['Practice coding problems on LeetCode', 'Study system design patterns', 'Review industry best practices']
+}
+
+
+def describe_report(sess, summary=None):
+    """The report for an interview session, as plain data; summary=None uses FALLBACK_SUMMARY"""
+    if not summary:
+        summary = dict(FALLBACK_SUMMARY, overall_score=sess.get('overall_score', 7))
+    return {
+        'job_role': sess.get('job_role'),
+        'interview_type': sess.get('interview_type'),
+        'domain': sess.get('domain'),
+        'date': sess.get('interview_date') or datetime.now().strftime("%Y-%m-%d %H:%M"),
+        'summary': summary,
+        'turns': [{key: detail[key] for key in ('question', 'answer', 'score', 'feedback', 'corrections')}
+                  for detail in Transcript(sess).details()]
+    }
+
+
+LEFT = 72
+RIGHT = 72
+TOP = 72
+BOTTOM = 60
+
+
+def _wrap(text, font, size, width):
+    """Lines of text that fit width, breaking words that are too long on their own"""
+    lines = []
+    for line in simpleSplit(str(text or ''), font, size, width):
+        while len(line) > 1 and stringWidth(line, font, size) > width:
+            cut = max(int(len(line) * width / stringWidth(line, font, size)), 1)
+            while cut > 1 and stringWidth(line[:cut], font, size) > width:
+                cut -= 1
+            lines.append(line[:cut])
+            line = line[cut:]
+        lines.append(line)
+    return lines
+
+
+class _Pages:
+    """Writing cursor over a canvas: wraps text and starts a new page when one is full"""
+
+    def __init__(self, c, title):
+        self.c = c
+        self.title = title
+        self.page_width, self.page_height = letter
+        self.width = self.page_width - LEFT - RIGHT
+        self.page = 0
+        self.y = 0
+        self.new_page()
+
+    def _footer(self):
+        self.c.setFont('Helvetica', 9)
+        self.c.drawRightString(self.page_width - RIGHT, BOTTOM / 2, f'Page {self.page}')
+
+    def new_page(self):
+        if self.page:
+            self._footer()
+            self.c.showPage()
+        self.page += 1
+        self.y = self.page_height - TOP
+        if self.page > 1:
+            self.c.setFont('Helvetica', 9)
+            self.c.drawString(LEFT, self.page_height - TOP / 2, self.title)
+
+    def need(self, height):
+        """Start a new page unless height points still fit on this one"""
+        if self.y - height < BOTTOM:
+            self.new_page()
+
+    def text(self, text, font='Helvetica', size=11, indent=0, bullet=None, after=4):
+        leading = size * 1.35
+        lines = _wrap(text, font, size, self.width - indent - (12 if bullet else 0))
+        for i, line in enumerate(lines):
+            self.need(leading)
+            self.y -= leading
+            self.c.setFont(font, size)
+            if bullet and i == 0:
+                self.c.drawString(LEFT + indent, self.y, bullet)
+            self.c.drawString(LEFT + indent + (12 if bullet else 0), self.y, line)
+        self.y -= after
+
+    def finish(self):
+        self._footer()
+        self.c.showPage()
+
+
+def _draw_report(c, report):
+    """Lay out one report from a fresh page onwards"""
+    summary = report['summary']
+    pages = _Pages(c, f'Interview Simulation Report - {report.get("job_role") or "N/A"}')
+
+    pages.text('Interview Simulation Report', 'Helvetica-Bold', 16, after=10)
+    pages.text(f'Job Role: {report.get("job_role") or "N/A"}', size=12)
+    pages.text(f'Interview Type: {report.get("interview_type") or "N/A"}', size=12)
+    if report.get('interview_type') == 'Technical':
+        pages.text(f'Domain: {report.get("domain") or "N/A"}', size=12)
+    pages.text(f'Date: {report["date"]}', size=12, after=16)
+
+    pages.text('Summary', 'Helvetica-Bold', 14, after=6)
+    for title, items in (('Strengths:', summary.get('strengths', [])),
+                         ('Areas for Improvement:', summary.get('improvements', [])),
+                         ('Suggested Resources:', summary.get('resources', []))):
+        pages.need(40)
+        pages.text(title, 'Helvetica-Bold', 12)
+        for item in items:
+            pages.text(item, indent=20, bullet='•', after=2)
+        pages.y -= 6
+    pages.text(f'Overall Score: {summary.get("overall_score", "N/A")}/10', 'Helvetica-Bold', 12, after=16)
+
+    turns = report.get('turns') or []
+    if turns:
+        pages.need(60)
+        pages.text('Question-by-Question Feedback', 'Helvetica-Bold', 14, after=6)
+    for number, turn in enumerate(turns, 1):
+        # Keep a question's heading together with the start of its answer
+        pages.need(80)
+        pages.text(f'Question {number} - Score: {turn.get("score", "N/A")}/10', 'Helvetica-Bold', 12, after=2)
+        pages.text(turn.get('question') or '', 'Helvetica-Oblique', 11, after=6)
+        for label, key in (('Your answer', 'answer'), ('Feedback', 'feedback'), ('Corrections', 'corrections')):
+            if turn.get(key):
+                pages.text(f'{label}:', 'Helvetica-Bold', 10, indent=10, after=0)
+                pages.text(turn[key], size=10, indent=10, after=6)
+        pages.y -= 8
+    pages.finish()
+
+
+def write_reports(reports, out):
+    """Render reports one after another into out (a path or a binary file)"""
+    c = canvas.Canvas(out, pagesize=letter, pageCompression=1)
+    for report in reports:
+        _draw_report(c, report)
+    c.save()
+
+
+def render_report_file(report, path):
+    """Render one report into the file at path; returns its size"""
+    write_reports([report], path)
+    return os.path.getsize(path)
+
+
+def render_report(report):
+    """PDF bytes for a report description"""
+    buffer = BytesIO()
+    write_reports([report], buffer)
+    return buffer.getvalue()
+
+
+class ReportCache:
+    """Rendered PDFs on disk, named by content hash, evicted least recently used first.
+
+    Renders in progress are *.tmp files next to them. They count towards
+    max_bytes but are not evicted; one older than tmp_max_age seconds was
+    abandoned (its process died) and is removed.
+    """
+
+    def __init__(self, directory='pdf_cache', max_bytes=64 * 1024 * 1024, tmp_max_age=600):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.tmp_max_age = tmp_max_age
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def path(self, key):
+        return os.path.join(self.directory, f'{key}.pdf')
+
+    def open(self, key):
+        """The cached PDF for key opened for reading, or None"""
+        path = self.path(key)
+        try:
+            f = open(path, 'rb')
+            # The mtime is the recency used for eviction
+            os.utime(path)
+        except OSError:
+            f = None
+        with self._lock:
+            if f is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return f
+
+    def temp_path(self, key):
+        """Where to write a report for key before add() publishes it"""
+        # Unique per render: one that timed out may still be writing its own
+        return f'{self.path(key)}.{uuid.uuid4().hex}.tmp'
+
+    def add(self, key, tmp):
+        """Publish the finished file at tmp under key"""
+        os.replace(tmp, self.path(key))
+        with self._lock:
+            self.stores += 1
+        self._evict()
+
+    def put(self, key, data):
+        """Store data under key"""
+        tmp = self.temp_path(key)
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        self.add(key, tmp)
+
+    def _entries(self, suffix='.pdf'):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(suffix):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        stale = time.time() - self.tmp_max_age
+        for mtime, size, path in self._entries('.tmp'):
+            if mtime < stale:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                with self._lock:
+                    self.evictions += 1
+            else:
+                total += size
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def stats(self):
+        entries = self._entries() + self._entries('.tmp')
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+                'stores': self.stores,
+                'evictions': self.evictions,
+                'entries': len(entries),
+                'bytes': sum(size for _, size, _ in entries),
+                'max_bytes': self.max_bytes
+            }
+
+
+class ReportRenderer:
+    """Runs render_report_file in a process pool, or inline when there is none"""
+
+    def __init__(self, workers=None, timeout=None):
+        self.workers = int(os.getenv('PDF_RENDER_WORKERS', '2')) if workers is None else workers
+        self.timeout = timeout or float(os.getenv('PDF_RENDER_TIMEOUT', '30'))
+        self.pid = os.getpid()
+        self._executor = None
+        self._lock = threading.Lock()
+        self.rendered = 0
+        self.inline = 0
+        self.timeouts = 0
+        self.seconds = 0.0
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None and self.workers > 0:
+                # Forking a threaded web worker can copy held locks into the
+                # child; forkserver children start from a clean process
+                method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context(method))
+            return self._executor
+
+    def render(self, report, path):
+        """Render report into the file at path; returns its size.
+
+        Raises RenderTimeout when the pool does not finish within timeout;
+        the render goes on writing path in its worker process.
+        """
+        started = time.monotonic()
+        pool = self._pool()
+        size = None
+        if pool is not None:
+            future = pool.submit(render_report_file, report, path)
+            try:
+                size = future.result(timeout=self.timeout)
+            except FutureTimeout:
+                with self._lock:
+                    self.timeouts += 1
+                raise RenderTimeout(f"PDF render took longer than {self.timeout}s", future)
+            except BrokenProcessPool as e:
+                logger.warning(f"PDF render pool broke, rendering inline: {e}")
+                with self._lock:
+                    self._executor = None
+        if size is None:
+            size = render_report_file(report, path)
+            with self._lock:
+                self.inline += 1
+        with self._lock:
+            self.rendered += 1
+            self.seconds += time.monotonic() - started
+        return size
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'rendered': self.rendered,
+                'inline': self.inline,
+                'timeouts': self.timeouts,
+                'avg_render_ms': round(self.seconds / self.rendered * 1000, 1) if self.rendered else None
+            }
+
+
+def open_report(report, key, cache=None, renderer=None):
+    """The rendered report as an open binary file, ready to be streamed.
+
+    Served from the cache when it holds key; otherwise rendered into the
+    cache, or into a temporary file that is unlinked once opened.
+    """
+    source = cache.open(key) if cache is not None else None
+    if source is not None:
+        return source
+    renderer = renderer or get_report_renderer()
+    if cache is not None:
+        tmp = cache.temp_path(key)
+    else:
+        fd, tmp = tempfile.mkstemp(suffix='.pdf')
+        os.close(fd)
+    try:
+        renderer.render(report, tmp)
+        # The open handle stays readable after the file is moved or evicted
+        source = open(tmp, 'rb')
+    except RenderTimeout as e:
+        # The worker is still writing tmp: publish or remove it once it is done
+        e.future.add_done_callback(lambda future: _finish_late_render(future, tmp, key, cache))
+        raise
+    except BaseException:
+        _remove(tmp)
+        raise
+    if cache is not None:
+        cache.add(key, tmp)
+    else:
+        os.remove(tmp)
+    return source
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _finish_late_render(future, tmp, key, cache):
+    """Cache a render that finished after its request gave up, so the retry is a hit"""
+    if future.cancelled() or future.exception() is not None or cache is None:
+        _remove(tmp)
+        return
+    try:
+        cache.add(key, tmp)
+    except OSError as e:
+        logger.warning(f"Could not cache late PDF render: {e}")
+        _remove(tmp)
+
+
+def build_report_cache_from_env():
+    """Build the cache configured by PDF_CACHE (disk or off)"""
+    if os.getenv('PDF_CACHE', 'disk').lower() in ['off', 'none', 'false', '0']:
+        return None
+    return ReportCache(os.getenv('PDF_CACHE_DIR', 'pdf_cache'),
+                       int(os.getenv('PDF_CACHE_MAX_BYTES', str(64 * 1024 * 1024))),
+                       float(os.getenv('PDF_CACHE_TMP_MAX_AGE', '600')))
+
+
+_cache = None
+_cache_built = False
+_renderer = None
+_lock = threading.Lock()
+
+
+def get_report_cache():
+    """Return this process's report cache (None when disabled)"""
+    global _cache, _cache_built
+    with _lock:
+        if not _cache_built:
+            _cache = build_report_cache_from_env()
+            _cache_built = True
+        return _cache
+
+
+def get_report_renderer():
+    """Return this process's renderer; a forked worker gets its own pool"""
+    global _renderer
+    with _lock:
+        if _renderer is None or _renderer.pid != os.getpid():
+            _renderer = ReportRenderer()
+        return _renderer
@@ -0,0 +1,135 @@
+"""
+Per-interview prefetch of LLM content the candidate will ask for next.
+
+/configure knows the role and interview type, which is all the tips prompt
+needs, so it starts the tips call in the background while the candidate reads
+question 1. The result is kept under the interview id, so /interview_tips can
+answer from it at once, or wait for the call already in flight instead of
+starting a second one.
+
+Prefetches run on a small thread pool and are dropped rather than queued once
+max_pending are outstanding. The work itself should use OPTIONAL priority so
+the rate limiter sheds it before any request a candidate is waiting on.
+cancel() (from /clear_session or a new interview) drops unstarted work and
+sets the abandoned event that running work was given. Results live in the
+worker process that fetched them and expire after PREFETCH_TTL seconds.
+"""
+import os
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+logger = logging.getLogger(__name__)
+
+NOT_PREFETCHED = object()
+
+
+class _Entry:
+    def __init__(self):
+        self.created = time.time()
+        self.abandoned = threading.Event()
+        self.futures = {}
+
+
+class Prefetcher:
+    """Background fetches keyed by (interview id, name)"""
+
+    def __init__(self, max_workers=None, max_pending=None, ttl=None):
+        self.max_workers = max_workers or int(os.getenv('PREFETCH_WORKERS', '4'))
+        self.max_pending = max_pending or int(os.getenv('PREFETCH_MAX_PENDING', '50'))
+        self.ttl = ttl or float(os.getenv('PREFETCH_TTL', '900'))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='prefetch')
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.started = 0
+        self.skipped = 0
+        self.hits = 0
+        self.misses = 0
+        self.cancelled = 0
+
+    def _expire(self, now):
+        expired = [key for key, entry in self._entries.items() if now - entry.created > self.ttl]
+        for key in expired:
+            self._drop(key)
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry.abandoned.set()
+            for future in entry.futures.values():
+                future.cancel()
+        return entry
+
+    def _pending(self):
+        return sum(1 for entry in self._entries.values() for future in entry.futures.values() if not future.done())
+
+    def start(self, key, name, fn, *args):
+        """Run fn(*args, abandoned=event) in the background unless the pool is saturated"""
+        if not key:
+            return False
+        with self._lock:
+            self._expire(time.time())
+            if self._pending() >= self.max_pending:
+                self.skipped += 1
+                logger.info(f"Prefetch of {name} skipped, {self.max_pending} already pending")
+                return False
+            entry = self._entries.setdefault(key, _Entry())
+            if name in entry.futures:
+                return False
+            entry.futures[name] = self._executor.submit(fn, *args, abandoned=entry.abandoned)
+            self.started += 1
+        return True
+
+    def future(self, key, name):
+        """The Future for a prefetch (done or still running), or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.futures.get(name) if entry is not None else None
+
+    def take(self, key, name, timeout=None):
+        """The prefetched result, waiting up to timeout for one in flight; NOT_PREFETCHED otherwise"""
+        future = self.future(key, name)
+        if future is not None and not future.cancelled():
+            try:
+                result = future.result(timeout=timeout)
+            except FutureTimeout:
+                logger.info(f"Prefetch of {name} still running after {timeout}s")
+            except Exception as e:
+                logger.warning(f"Prefetch of {name} failed: {e}")
+            else:
+                self.record(True)
+                return result
+        self.record(False)
+        return NOT_PREFETCHED
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def cancel(self, key):
+        """Drop everything prefetched or prefetching for key"""
+        with self._lock:
+            if self._drop(key) is not None:
+                self.cancelled += 1
+
+    def stats(self):
+        with self._lock:
+            self._expire(time.time())
+            lookups = self.hits + self.misses
+            return {
+                'started': self.started,
+                'skipped': self.skipped,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+                'cancelled': self.cancelled,
+                'pending': self._pending(),
+                'interviews': len(self._entries)
+            }
+
+
+prefetcher = Prefetcher()
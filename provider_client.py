@@ -0,0 +1,220 @@
+"""
+Shared, pooled HTTP client for LLM provider calls (OpenRouter).
+
+One keep-alive requests.Session is kept per provider base URL so repeated
+chat completion calls reuse TCP/TLS connections instead of re-handshaking.
+The client is created lazily per process, so every gunicorn worker gets its
+own pool after fork and sockets are never shared between workers.
+
+AsyncProviderClient is the httpx counterpart used by the ASGI app; it reads
+the same OPENROUTER_* pool and timeout settings.
+"""
+import os
+import threading
+import logging
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+try:
+    import httpx
+except ImportError:  # only needed by the ASGI app (asgi_app.py)
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.lower() in ['1', 'true', 'yes']
+
+
+class _ProviderStats:
+    """Request/connection counters for one provider base URL"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+
+    def count_request(self):
+        with self.lock:
+            self.requests += 1
+
+    def count_connection(self):
+        with self.lock:
+            self.connections_opened += 1
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                'requests': self.requests,
+                'connections_opened': self.connections_opened,
+                'connections_reused': max(self.requests - self.connections_opened, 0)
+            }
+
+
+def _counting_adapter(stats, pool_size):
+    """Build an HTTPAdapter whose urllib3 pools report every new connection to stats"""
+
+    class CountingHTTPConnectionPool(HTTPConnectionPool):
+        def _new_conn(self):
+            stats.count_connection()
+            return super()._new_conn()
+
+    class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+        def _new_conn(self):
+            stats.count_connection()
+            return super()._new_conn()
+
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=False)
+    adapter.poolmanager.pool_classes_by_scheme = {
+        'http': CountingHTTPConnectionPool,
+        'https': CountingHTTPSConnectionPool
+    }
+    return adapter
+
+
+class ProviderClient:
+    """Keeps one pooled session per provider base URL and tracks connection reuse"""
+
+    def __init__(self, pool_size=None, keep_alive=None, connect_timeout=None, read_timeout=None):
+        self.pool_size = pool_size if pool_size is not None else _env_int('OPENROUTER_POOL_SIZE', 10)
+        self.keep_alive = keep_alive if keep_alive is not None else _env_bool('OPENROUTER_KEEPALIVE', True)
+        self.connect_timeout = connect_timeout if connect_timeout is not None else _env_float('OPENROUTER_CONNECT_TIMEOUT', 5.0)
+        self.read_timeout = read_timeout if read_timeout is not None else _env_float('OPENROUTER_READ_TIMEOUT', 30.0)
+        self.pid = os.getpid()
+        self._sessions = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def base_url(url):
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def _session_for(self, base_url):
+        with self._lock:
+            session = self._sessions.get(base_url)
+            if session is None:
+                stats = self._stats.setdefault(base_url, _ProviderStats())
+                adapter = _counting_adapter(stats, self.pool_size)
+                session = requests.Session()
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                if not self.keep_alive:
+                    session.headers['Connection'] = 'close'
+                self._sessions[base_url] = session
+                logger.debug(f"Created provider session for {base_url} (pool_size={self.pool_size}, keep_alive={self.keep_alive})")
+            return session, self._stats[base_url]
+
+    def timeout(self, read_timeout=None):
+        """Split (connect, read) timeout; a bare number overrides only the read timeout"""
+        if isinstance(read_timeout, tuple):
+            return read_timeout
+        return (self.connect_timeout, read_timeout if read_timeout is not None else self.read_timeout)
+
+    def request(self, method, url, timeout=None, **kwargs):
+        session, stats = self._session_for(self.base_url(url))
+        stats.count_request()
+        return session.request(method, url, timeout=self.timeout(timeout), **kwargs)
+
+    def post(self, url, timeout=None, **kwargs):
+        return self.request('POST', url, timeout=timeout, **kwargs)
+
+    def stats(self):
+        with self._lock:
+            providers = {base_url: stats.as_dict() for base_url, stats in self._stats.items()}
+        return {
+            'pid': self.pid,
+            'pool_size': self.pool_size,
+            'keep_alive': self.keep_alive,
+            'connect_timeout': self.connect_timeout,
+            'read_timeout': self.read_timeout,
+            'providers': providers
+        }
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+class AsyncProviderClient:
+    """httpx.AsyncClient with ProviderClient's pool and timeout settings.
+
+    httpx pools per origin by itself, so one client serves every provider.
+    Bind one instance to one event loop and close it with aclose().
+    """
+
+    def __init__(self, pool_size=None, keep_alive=None, connect_timeout=None, read_timeout=None):
+        if httpx is None:
+            raise RuntimeError("AsyncProviderClient needs httpx (pip install httpx)")
+        self.pool_size = pool_size if pool_size is not None else _env_int('OPENROUTER_POOL_SIZE', 10)
+        self.keep_alive = keep_alive if keep_alive is not None else _env_bool('OPENROUTER_KEEPALIVE', True)
+        self.connect_timeout = connect_timeout if connect_timeout is not None else _env_float('OPENROUTER_CONNECT_TIMEOUT', 5.0)
+        self.read_timeout = read_timeout if read_timeout is not None else _env_float('OPENROUTER_READ_TIMEOUT', 30.0)
+        # Like the requests pool (pool_block=False): pool_size idle connections
+        # are kept, but concurrent requests are never capped by the pool
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=self.pool_size if self.keep_alive else 0)
+        self._client = httpx.AsyncClient(limits=limits, timeout=self.timeout())
+        self._requests = {}
+
+    def timeout(self, read_timeout=None):
+        if isinstance(read_timeout, tuple):
+            connect, read = read_timeout
+        else:
+            connect, read = self.connect_timeout, read_timeout if read_timeout is not None else self.read_timeout
+        return httpx.Timeout(read, connect=connect)
+
+    async def post(self, url, timeout=None, **kwargs):
+        base_url = ProviderClient.base_url(url)
+        self._requests[base_url] = self._requests.get(base_url, 0) + 1
+        return await self._client.post(url, timeout=self.timeout(timeout), **kwargs)
+
+    def stats(self):
+        return {
+            'pool_size': self.pool_size,
+            'keep_alive': self.keep_alive,
+            'connect_timeout': self.connect_timeout,
+            'read_timeout': self.read_timeout,
+            'providers': {base_url: {'requests': count} for base_url, count in self._requests.items()}
+        }
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_provider_client():
+    """Return this process's shared client, rebuilding it after a fork (gunicorn workers)"""
+    global _client
+    client = _client
+    if client is not None and client.pid == os.getpid():
+        return client
+    with _client_lock:
+        if _client is None or _client.pid != os.getpid():
+            _client = ProviderClient()
+        return _client
@@ -0,0 +1,262 @@
+"""
+Persistent bank of pre-generated interview questions.
+
+Questions are stored in SQLite per (job_role, interview_type, domain) key, so
+/configure can sample a set in milliseconds instead of waiting on an 800-token
+LLM call. A background thread keeps keys topped up: whenever a key runs low on
+questions nobody has been served yet, it is queued for a refill, and popular
+keys are checked periodically. Refills generate questions in batches through a
+callback supplied by the app. Duplicates are dropped on their normalised text.
+
+A sample only draws on questions nobody has been served. A key without enough
+of them (never seen, not stocked yet, or all served) is a miss: the caller
+generates live, hands the result to add(), and the key gets queued for a
+refill.
+"""
+import os
+import re
+import time
+import queue
+import sqlite3
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+_NOT_WORD = re.compile(r'[^\w]+')
+
+
+def bank_key(job_role, interview_type, domain):
+    return '|'.join(str(part or '').strip().lower() for part in (job_role, interview_type, domain))
+
+
+def _normalize(question):
+    return _NOT_WORD.sub(' ', question.lower()).strip()
+
+
+class QuestionBank:
+    """SQLite question store with least-served sampling and a background refiller"""
+
+    def __init__(self, path='question_bank.sqlite3', target_fresh=20, batch_size=10, max_per_key=200,
+                 popular_after=2, refill_interval=300.0):
+        self.path = path
+        self.target_fresh = target_fresh
+        self.batch_size = batch_size
+        self.max_per_key = max_per_key
+        self.popular_after = popular_after
+        self.refill_interval = refill_interval
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS bank_questions ('
+            'id INTEGER PRIMARY KEY, bank_key TEXT NOT NULL, question TEXT NOT NULL, normalized TEXT NOT NULL, '
+            'served INTEGER NOT NULL DEFAULT 0, created REAL NOT NULL, UNIQUE (bank_key, normalized))'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_bank_questions_served ON bank_questions (bank_key, served)')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS bank_keys ('
+            'bank_key TEXT PRIMARY KEY, job_role TEXT, interview_type TEXT, domain TEXT, '
+            'requests INTEGER NOT NULL DEFAULT 0, last_requested REAL)'
+        )
+        self._conn.commit()
+        self._queue = queue.Queue()
+        self._queued = set()
+        self._generate = None
+        self._thread = None
+        self._stopped = threading.Event()
+        self.hits = 0
+        self.misses = 0
+        self.refills = 0
+        self.refill_failures = 0
+        self.added = 0
+        self.duplicates = 0
+
+    def _touch(self, key, job_role, interview_type, domain):
+        self._conn.execute(
+            'INSERT INTO bank_keys (bank_key, job_role, interview_type, domain, requests, last_requested) '
+            'VALUES (?, ?, ?, ?, 1, ?) ON CONFLICT (bank_key) DO UPDATE SET '
+            'requests = requests + 1, last_requested = excluded.last_requested',
+            (key, job_role, interview_type, domain, time.time())
+        )
+
+    def _fresh(self, key):
+        return self._conn.execute(
+            'SELECT COUNT(*) FROM bank_questions WHERE bank_key = ? AND served = 0', (key,)
+        ).fetchone()[0]
+
+    def sample(self, job_role, interview_type, domain, count=5, exclude=()):
+        """count questions for the key that nobody has been served yet; None when there are too few"""
+        key = bank_key(job_role, interview_type, domain)
+        exclude = {_normalize(question) for question in exclude}
+        with self._lock:
+            self._touch(key, job_role, interview_type, domain)
+            # Served questions never count: with only those left, every candidate
+            # would get the same set until a refill landed
+            rows = self._conn.execute(
+                'SELECT id, question, normalized FROM bank_questions WHERE bank_key = ? AND served = 0 '
+                'ORDER BY RANDOM() LIMIT ?', (key, count + len(exclude))
+            ).fetchall()
+            rows = [row for row in rows if row[2] not in exclude][:count]
+            if len(rows) < count:
+                self.misses += 1
+                self._conn.commit()
+                fresh = None
+            else:
+                self.hits += 1
+                self._conn.executemany('UPDATE bank_questions SET served = served + 1 WHERE id = ?',
+                                       [(row[0],) for row in rows])
+                self._conn.commit()
+                fresh = self._fresh(key)
+        if fresh is None or fresh < self.target_fresh // 2:
+            self.request_refill(job_role, interview_type, domain)
+        return [row[1] for row in rows] if fresh is not None else None
+
+    def add(self, job_role, interview_type, domain, questions, served=False):
+        """Store new questions for the key; returns how many were not duplicates"""
+        key = bank_key(job_role, interview_type, domain)
+        now = time.time()
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO bank_questions (bank_key, question, normalized, served, created) '
+                'VALUES (?, ?, ?, ?, ?)',
+                [(key, question.strip(), _normalize(question), int(served), now)
+                 for question in questions if _normalize(question)]
+            )
+            added = self._conn.total_changes - before
+            # Past the cap, forget the most served questions first
+            self._conn.execute(
+                'DELETE FROM bank_questions WHERE id IN (SELECT id FROM bank_questions WHERE bank_key = ? '
+                'ORDER BY served DESC, created LIMIT max((SELECT COUNT(*) FROM bank_questions WHERE bank_key = ?) - ?, 0))',
+                (key, key, self.max_per_key)
+            )
+            self._conn.commit()
+            self.added += added
+            self.duplicates += len(questions) - added
+        return added
+
+    def recent(self, job_role, interview_type, domain, limit=10):
+        """Newest questions for the key, to steer a refill away from repeats"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT question FROM bank_questions WHERE bank_key = ? ORDER BY created DESC LIMIT ?',
+                (bank_key(job_role, interview_type, domain), limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    # --- background refill ------------------------------------------------
+
+    def start_refiller(self, generate):
+        """Start the refill thread once; generate(job_role, interview_type, domain, count, avoid) -> list or None"""
+        with self._lock:
+            self._generate = generate
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped.clear()
+                self._thread = threading.Thread(target=self._run, name='question-bank-refill', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._queue.put(None)
+
+    def request_refill(self, job_role, interview_type, domain):
+        key = bank_key(job_role, interview_type, domain)
+        with self._lock:
+            if key in self._queued:
+                return
+            self._queued.add(key)
+        self._queue.put((job_role, interview_type, domain))
+
+    def _popular_keys(self):
+        with self._lock:
+            return self._conn.execute(
+                'SELECT k.job_role, k.interview_type, k.domain FROM bank_keys k WHERE k.requests >= ? '
+                'AND (SELECT COUNT(*) FROM bank_questions q WHERE q.bank_key = k.bank_key AND q.served = 0) < ? '
+                'ORDER BY k.requests DESC LIMIT 20', (self.popular_after, self.target_fresh)
+            ).fetchall()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                item = self._queue.get(timeout=self.refill_interval)
+            except queue.Empty:
+                for job_role, interview_type, domain in self._popular_keys():
+                    self.request_refill(job_role, interview_type, domain)
+                continue
+            if item is None:
+                continue
+            try:
+                self.refill(*item)
+            except Exception as e:
+                self.refill_failures += 1
+                logger.warning(f"Question bank refill failed for {item}: {e}")
+            finally:
+                with self._lock:
+                    self._queued.discard(bank_key(*item))
+
+    def refill(self, job_role, interview_type, domain, max_batches=3):
+        """Generate batches until the key has target_fresh unserved questions or a batch adds nothing new"""
+        key = bank_key(job_role, interview_type, domain)
+        for _ in range(max_batches):
+            with self._lock:
+                fresh = self._fresh(key)
+            if fresh >= self.target_fresh or self._generate is None:
+                return
+            questions = self._generate(job_role, interview_type, domain, self.batch_size,
+                                       self.recent(job_role, interview_type, domain))
+            if not questions:
+                self.refill_failures += 1
+                return
+            self.refills += 1
+            if not self.add(job_role, interview_type, domain, questions):
+                return
+
+    def stats(self):
+        with self._lock:
+            size, keys = self._conn.execute(
+                'SELECT COUNT(*), COUNT(DISTINCT bank_key) FROM bank_questions').fetchone()
+            fresh = self._conn.execute('SELECT COUNT(*) FROM bank_questions WHERE served = 0').fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+                'refill_backlog': len(self._queued),
+                'refills': self.refills,
+                'refill_failures': self.refill_failures,
+                'added': self.added,
+                'duplicates': self.duplicates,
+                'questions': size,
+                'unserved': fresh,
+                'keys': keys
+            }
+
+
+def build_question_bank_from_env():
+    """Build the bank configured by QUESTION_BANK (sqlite or off)"""
+    if os.getenv('QUESTION_BANK', 'off').lower() in ['off', 'none', 'false', '0']:
+        return None
+    return QuestionBank(
+        os.getenv('QUESTION_BANK_PATH', 'question_bank.sqlite3'),
+        target_fresh=int(os.getenv('QUESTION_BANK_TARGET', '20')),
+        batch_size=int(os.getenv('QUESTION_BANK_BATCH', '10')),
+        max_per_key=int(os.getenv('QUESTION_BANK_MAX_PER_KEY', '200')),
+        refill_interval=float(os.getenv('QUESTION_BANK_REFILL_INTERVAL', '300'))
+    )
+
+
+_bank = None
+_bank_built = False
+_bank_lock = threading.Lock()
+
+
+def get_question_bank():
+    """Return this process's question bank (None when disabled)"""
+    global _bank, _bank_built
+    with _bank_lock:
+        if not _bank_built or (_bank is not None and _bank.pid != os.getpid()):
+            _bank = build_question_bank_from_env()
+            _bank_built = True
+        return _bank
@@ -0,0 +1,314 @@
+"""
+Client-side rate limiting and quota-aware admission control for OpenRouter.
+
+Each API key gets a requests-per-minute token bucket and a requests-per-day
+budget (the free tier allows 50/day, see rate_limit_solutions.py). Upstream
+X-RateLimit-* headers and 429 reset times tighten the local view.
+
+Calls carry a priority:
+- critical: answer scoring; may wait briefly for a token, never shed early
+- normal:   question generation and the end-of-interview summary
+- optional: tips and PDF re-summaries; shed immediately when tokens are
+            short or the daily budget is down to the critical reserve
+Optional prompts are cache-backed, so shedding them usually just means the
+caller gets its fallback content instead of spending quota.
+
+OPENROUTER_RPD is the key's limit, not a worker's: the day's count is kept in
+a SQLite file (RATE_LIMIT_PATH) that every worker on the host and restarts
+share. With RATE_LIMIT_STORE=off the count is per process, and each of the
+WEB_CONCURRENCY workers gets an equal share of the budget.
+"""
+import os
+import time
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+from model_health import parse_rate_limit_reset
+
+CRITICAL = 'critical'
+NORMAL = 'normal'
+OPTIONAL = 'optional'
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at rate tokens/second"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self, now=None):
+        now = now if now is not None else time.monotonic()
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_time(self, now=None):
+        now = now if now is not None else time.monotonic()
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else float('inf')
+
+
+def _next_utc_midnight(now):
+    today = datetime.fromtimestamp(now, tz=timezone.utc).date()
+    midnight = datetime.combine(today + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+    return midnight.timestamp()
+
+
+def _utc_day(now):
+    return datetime.fromtimestamp(now, tz=timezone.utc).strftime('%Y-%m-%d')
+
+
+class DailyBudgetStore:
+    """Requests spent per key and UTC day, in SQLite shared by every worker on the host"""
+
+    def __init__(self, path='rate_limits.sqlite3'):
+        self.path = path
+        self._conn = None
+        self._pid = None
+        self._pruned_day = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        # A connection inherited over fork is not safe to use; each worker opens its own
+        if self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS daily_usage (key TEXT NOT NULL, day TEXT NOT NULL, used INTEGER NOT NULL, '
+                'PRIMARY KEY (key, day))'
+            )
+            self._conn.commit()
+            self._pid = os.getpid()
+        return self._conn
+
+    def take(self, key, day, cap):
+        """Count one request if fewer than cap were spent on day; returns (taken, used including it)"""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                if self._pruned_day != day:
+                    conn.execute('DELETE FROM daily_usage WHERE day < ?', (day,))
+                    self._pruned_day = day
+                taken = False
+                if cap > 0:
+                    # The upsert takes the write lock, so check and increment are one step across workers
+                    cursor = conn.execute(
+                        'INSERT INTO daily_usage (key, day, used) VALUES (?, ?, 1) '
+                        'ON CONFLICT (key, day) DO UPDATE SET used = used + 1 WHERE used < ?',
+                        (key, day, cap)
+                    )
+                    taken = cursor.rowcount == 1
+                row = conn.execute('SELECT used FROM daily_usage WHERE key = ? AND day = ?', (key, day)).fetchone()
+            return taken, row[0] if row else 0
+
+    def used(self, key, day):
+        with self._lock:
+            row = self._connection().execute('SELECT used FROM daily_usage WHERE key = ? AND day = ?', (key, day)).fetchone()
+            return row[0] if row else 0
+
+
+class _KeyQuota:
+    def __init__(self, rpm, rpd, now):
+        self.bucket = TokenBucket(rpm / 60.0, max(rpm, 1))
+        self.daily_limit = rpd
+        self.daily_used = 0
+        self.day_resets_at = _next_utc_midnight(now)
+        self.blocked_until = 0.0
+        self.upstream_limit = None
+        self.upstream_remaining = None
+        self.upstream_reset_at = None
+
+
+class RateLimiter:
+    """Per-key RPM/RPD budgets with priority-aware admission"""
+
+    def __init__(self, rpm=None, rpd=None, critical_reserve=None, max_wait=None, store=None, workers=None):
+        self.rpm = rpm if rpm is not None else int(os.getenv('OPENROUTER_RPM', '20'))
+        self.rpd = rpd if rpd is not None else int(os.getenv('OPENROUTER_RPD', '50'))
+        self.store = store
+        if store is None:
+            # Without the shared count every worker would spend the key's whole budget
+            workers = max(workers if workers is not None else int(os.getenv('WEB_CONCURRENCY', '1')), 1)
+            self.rpd //= workers
+        self.critical_reserve = critical_reserve if critical_reserve is not None else int(os.getenv('OPENROUTER_CRITICAL_RESERVE', '10'))
+        self.max_wait = max_wait if max_wait is not None else float(os.getenv('OPENROUTER_LIMIT_MAX_WAIT', '10'))
+        self._quotas = {}
+        self._lock = threading.Lock()
+        self.admitted = {CRITICAL: 0, NORMAL: 0, OPTIONAL: 0}
+        self.shed = {CRITICAL: 0, NORMAL: 0, OPTIONAL: 0}
+        self.waited = 0
+
+    @staticmethod
+    def key_id(api_key):
+        return hashlib.sha256((api_key or '').encode('utf-8')).hexdigest()[:12]
+
+    def _quota(self, key, now):
+        quota = self._quotas.get(key)
+        if quota is None:
+            quota = self._quotas[key] = _KeyQuota(self.rpm, self.rpd, now)
+        if now >= quota.day_resets_at:
+            quota.daily_used = 0
+            quota.day_resets_at = _next_utc_midnight(now)
+        if quota.upstream_reset_at and now >= quota.upstream_reset_at:
+            quota.upstream_remaining = None
+            quota.upstream_reset_at = None
+        return quota
+
+    def _remaining_today(self, quota):
+        remaining = quota.daily_limit - quota.daily_used
+        if quota.upstream_remaining is not None and quota.upstream_remaining > 0:
+            remaining = min(remaining, quota.upstream_remaining)
+        return remaining
+
+    def _try_admit(self, key, priority, deadline):
+        """One admission attempt. Returns (admitted, reason, delay); delay > 0 means retry after it."""
+        with self._lock:
+            now = time.time()
+            quota = self._quota(key, now)
+            delay = 0.0
+            reason = None
+
+            remaining = self._remaining_today(quota)
+            if remaining <= 0:
+                reason = 'daily budget exhausted'
+            elif priority == OPTIONAL and remaining <= self.critical_reserve:
+                reason = 'daily budget reserved for critical calls'
+            elif quota.upstream_remaining is not None and quota.upstream_remaining <= 0:
+                delay = max((quota.upstream_reset_at or now + 60) - now, 0.01)
+                reason = 'upstream quota exhausted until reset'
+            elif quota.blocked_until > now:
+                delay = quota.blocked_until - now
+                reason = 'rate limited upstream'
+            else:
+                delay = quota.bucket.wait_time()
+                if delay == 0:
+                    reason = self._take_daily(key, quota, priority, now)
+                    if reason is None:
+                        quota.bucket.try_take()
+                        if quota.upstream_remaining is not None:
+                            quota.upstream_remaining -= 1
+                        self.admitted[priority] += 1
+                        return True, None, 0.0
+                else:
+                    reason = 'requests-per-minute limit'
+
+            if delay == 0 or time.monotonic() + delay > deadline:
+                self.shed[priority] += 1
+                return False, reason, 0.0
+            self.waited += 1
+            return False, reason, min(delay, 1.0)
+
+    def _take_daily(self, key, quota, priority, now):
+        """Spend one request of the day's budget; None when admitted, else why not"""
+        if self.store is None:
+            quota.daily_used += 1
+            return None
+        floor = self.critical_reserve if priority == OPTIONAL else 0
+        taken, quota.daily_used = self.store.take(key, _utc_day(now), quota.daily_limit - floor)
+        if taken:
+            return None
+        # Other workers spent it: refuse the same way the local check would have
+        if quota.daily_used >= quota.daily_limit:
+            return 'daily budget exhausted'
+        return 'daily budget reserved for critical calls'
+
+    def _deadline(self, priority):
+        return time.monotonic() + (self.max_wait if priority != OPTIONAL else 0)
+
+    def acquire(self, api_key, priority=NORMAL):
+        """Admit or refuse one upstream request. Returns (admitted, reason)."""
+        key = self.key_id(api_key)
+        deadline = self._deadline(priority)
+        while True:
+            admitted, reason, delay = self._try_admit(key, priority, deadline)
+            if not delay:
+                return admitted, reason
+            time.sleep(delay)
+
+    async def acquire_async(self, api_key, priority=NORMAL):
+        """acquire() for asyncio callers: waits without blocking the event loop"""
+        key = self.key_id(api_key)
+        deadline = self._deadline(priority)
+        while True:
+            if self.store is not None:
+                # The shared count is a SQLite write: keep it off the event loop
+                admitted, reason, delay = await asyncio.to_thread(self._try_admit, key, priority, deadline)
+            else:
+                admitted, reason, delay = self._try_admit(key, priority, deadline)
+            if not delay:
+                return admitted, reason
+            await asyncio.sleep(delay)
+
+    def update_from_response(self, api_key, status_code, headers):
+        """Fold upstream X-RateLimit-* headers and 429 resets into the local budget"""
+        headers = headers or {}
+        now = time.time()
+        with self._lock:
+            quota = self._quota(self.key_id(api_key), now)
+            try:
+                if headers.get('X-RateLimit-Limit'):
+                    quota.upstream_limit = int(float(headers['X-RateLimit-Limit']))
+                if headers.get('X-RateLimit-Remaining'):
+                    quota.upstream_remaining = int(float(headers['X-RateLimit-Remaining']))
+            except ValueError:
+                pass
+            reset_at = parse_rate_limit_reset(headers, now)
+            if reset_at:
+                quota.upstream_reset_at = reset_at
+            # A 429 with reset information is a key-level limit; a bare 429 is
+            # usually one overloaded model and is left to the health registry
+            if status_code == 429 and reset_at:
+                quota.blocked_until = max(quota.blocked_until, reset_at)
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            keys = {}
+            for key in list(self._quotas):
+                quota = self._quota(key, now)
+                if self.store is not None:
+                    quota.daily_used = self.store.used(key, _utc_day(now))
+                keys[key] = {
+                    'daily_used': quota.daily_used,
+                    'daily_limit': quota.daily_limit,
+                    'remaining_today': self._remaining_today(quota),
+                    'tokens': round(quota.bucket.tokens, 2),
+                    'blocked_for': round(max(quota.blocked_until - now, 0), 1),
+                    'upstream_limit': quota.upstream_limit,
+                    'upstream_remaining': quota.upstream_remaining,
+                    'upstream_reset_at': quota.upstream_reset_at
+                }
+            return {
+                'rpm': self.rpm,
+                'rpd': self.rpd,
+                'shared_daily_budget': self.store.path if self.store is not None else None,
+                'critical_reserve': self.critical_reserve,
+                'admitted': dict(self.admitted),
+                'shed': dict(self.shed),
+                'waited': self.waited,
+                'keys': keys
+            }
+
+
+def build_budget_store_from_env():
+    """Build the shared daily-budget store configured by RATE_LIMIT_STORE (sqlite or off)"""
+    if os.getenv('RATE_LIMIT_STORE', 'sqlite').lower() in ['off', 'none', 'false', '0']:
+        return None
+    return DailyBudgetStore(os.getenv('RATE_LIMIT_PATH', 'rate_limits.sqlite3'))
+
+
+rate_limiter = RateLimiter(store=build_budget_store_from_env())
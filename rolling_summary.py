@@ -0,0 +1,78 @@
+"""
+Running interview summary, folded in one answer at a time.
+
+The end-of-interview summary used to be one more LLM call on the last
+answer, over a prompt holding every question and answer. In incremental mode
+each answer's evaluation also names one strength, one improvement and one
+resource (see _feedback_prompt), and those are folded into a small state kept
+in the session as evaluations are stored, including the background ones:
+- the three best-ranked distinct entries per list, each with the score of the
+  answer it came from. Strengths keep the best-scored answers; improvements
+  and resources keep the weakest, where the candidate has most to gain
+- a running score sum and count
+
+Finishing the interview then only turns that state into the summary, with no
+LLM call and without re-reading the transcript. summary() is None while any
+list is still empty, e.g. when the model left the notes out, and the caller
+falls back to the full summary prompt.
+"""
+import re
+
+KEEP = 3
+
+_NOT_WORD = re.compile(r'[^\w]+')
+
+
+def _normalize(text):
+    return _NOT_WORD.sub(' ', text.lower()).strip()
+
+
+class RollingSummary:
+    """Compact summary state: top entries per list and a score aggregate"""
+
+    __slots__ = ('strengths', 'improvements', 'resources', 'score_sum', 'scored')
+
+    def __init__(self, strengths=(), improvements=(), resources=(), score_sum=0, scored=0):
+        self.strengths = [list(entry) for entry in strengths]
+        self.improvements = [list(entry) for entry in improvements]
+        self.resources = [list(entry) for entry in resources]
+        self.score_sum = score_sum
+        self.scored = scored
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data) if data else cls()
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @staticmethod
+    def _fold(entries, text, score, best_first):
+        text = (text or '').strip()
+        if not text:
+            return entries
+        key = _normalize(text)
+        if any(_normalize(existing) == key for existing, _ in entries):
+            return entries
+        # Stable sort: on equal scores the earlier answer's entry stays ahead
+        entries = sorted(entries + [[text, score]], key=lambda entry: -entry[1] if best_first else entry[1])
+        return entries[:KEEP]
+
+    def add(self, score, strength='', improvement='', resource=''):
+        """Fold in one evaluated answer"""
+        self.score_sum += score
+        self.scored += 1
+        self.strengths = self._fold(self.strengths, strength, score, best_first=True)
+        self.improvements = self._fold(self.improvements, improvement, score, best_first=False)
+        self.resources = self._fold(self.resources, resource, score, best_first=False)
+
+    def summary(self):
+        """The final summary dict, or None when the state cannot fill one"""
+        if not (self.scored and self.strengths and self.improvements and self.resources):
+            return None
+        return {
+            'strengths': [text for text, _ in self.strengths],
+            'improvements': [text for text, _ in self.improvements],
+            'resources': [text for text, _ in self.resources],
+            'overall_score': min(max(round(self.score_sum / self.scored), 1), 10)
+        }
@@ -0,0 +1,430 @@
+"""
+Server-side sessions: the cookie carries only a signed session id.
+
+The interview state (questions, every answer with its feedback, the final
+summary) outgrows Flask's 4KB signed cookie, and a cookie session is
+re-serialised and re-signed on every request that touches it. Here each
+session field is stored separately in a backend and a request only pays
+for the fields it uses:
+- fields are loaded lazily, on first access
+- on save, only fields whose JSON changed are written back (in-place edits
+  like session['user_answers'].append(...) included); untouched fields are
+  never re-read or rewritten
+- expiry slides forward whenever the session is used
+
+Backends:
+- MemorySessionBackend: in-process dict, one worker only
+- SQLiteSessionBackend: on-disk, shared by all workers on the host
+- RedisSessionBackend: any Redis-compatible server (one hash per session),
+  needs the optional redis package
+
+ServerSessionInterface plugs into Flask as app.session_interface; asgi_app
+uses load()/persist() to read and write the same sessions.
+"""
+import os
+import json
+import time
+import sqlite3
+import secrets
+import threading
+
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import Signer, BadSignature
+
+try:
+    import redis
+except ImportError:  # optional: only needed for SESSION_BACKEND=redis
+    redis = None
+
+
+def _dumps(value):
+    return json.dumps(value, separators=(',', ':'))
+
+
+class MemorySessionBackend:
+    """Per-process dict of sessions with expiry"""
+
+    name = 'memory'
+
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _fields(self, sid):
+        entry = self._sessions.get(sid)
+        if entry is None:
+            return None
+        if entry[0] < time.time():
+            del self._sessions[sid]
+            return None
+        return entry[1]
+
+    def get_field(self, sid, field):
+        with self._lock:
+            fields = self._fields(sid)
+            return fields.get(field) if fields else None
+
+    def get_all(self, sid):
+        with self._lock:
+            return dict(self._fields(sid) or {})
+
+    def save(self, sid, changed, deleted, ttl, replace=False):
+        with self._lock:
+            fields = None if replace else self._fields(sid)
+            fields = dict(fields or {})
+            for field in deleted:
+                fields.pop(field, None)
+            fields.update(changed)
+            self._sessions[sid] = (time.time() + ttl, fields)
+
+    def touch(self, sid, ttl):
+        with self._lock:
+            fields = self._fields(sid)
+            if fields is not None:
+                self._sessions[sid] = (time.time() + ttl, fields)
+
+    def delete(self, sid):
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+    def purge_expired(self):
+        with self._lock:
+            now = time.time()
+            expired = [sid for sid, (expires_at, _) in self._sessions.items() if expires_at < now]
+            for sid in expired:
+                del self._sessions[sid]
+        return len(expired)
+
+    def size(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def sids(self):
+        with self._lock:
+            now = time.time()
+            return [sid for sid, (expires_at, _) in self._sessions.items() if expires_at >= now]
+
+
+class SQLiteSessionBackend:
+    """One row per session field, so a save writes only the fields that changed"""
+
+    name = 'sqlite'
+
+    def __init__(self, path='sessions.sqlite3'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS sessions (sid TEXT PRIMARY KEY, expires_at REAL NOT NULL)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at)')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS session_fields ('
+            'sid TEXT NOT NULL, field TEXT NOT NULL, value TEXT NOT NULL, PRIMARY KEY (sid, field))'
+        )
+        self._conn.commit()
+
+    def get_field(self, sid, field):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT f.value FROM session_fields f JOIN sessions s ON s.sid = f.sid '
+                'WHERE f.sid = ? AND f.field = ? AND s.expires_at >= ?', (sid, field, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_all(self, sid):
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT f.field, f.value FROM session_fields f JOIN sessions s ON s.sid = f.sid '
+                'WHERE f.sid = ? AND s.expires_at >= ?', (sid, time.time())
+            ).fetchall()
+        return dict(rows)
+
+    def save(self, sid, changed, deleted, ttl, replace=False):
+        now = time.time()
+        with self._lock:
+            expired = self._conn.execute('SELECT 1 FROM sessions WHERE sid = ? AND expires_at < ?', (sid, now)).fetchone()
+            if replace or expired:
+                self._conn.execute('DELETE FROM session_fields WHERE sid = ?', (sid,))
+            self._conn.execute('INSERT OR REPLACE INTO sessions (sid, expires_at) VALUES (?, ?)', (sid, now + ttl))
+            if deleted:
+                self._conn.executemany('DELETE FROM session_fields WHERE sid = ? AND field = ?',
+                                       [(sid, field) for field in deleted])
+            if changed:
+                self._conn.executemany('INSERT OR REPLACE INTO session_fields (sid, field, value) VALUES (?, ?, ?)',
+                                       [(sid, field, value) for field, value in changed.items()])
+            self._conn.commit()
+
+    def touch(self, sid, ttl):
+        with self._lock:
+            self._conn.execute('UPDATE sessions SET expires_at = ? WHERE sid = ?', (time.time() + ttl, sid))
+            self._conn.commit()
+
+    def delete(self, sid):
+        with self._lock:
+            self._conn.execute('DELETE FROM session_fields WHERE sid = ?', (sid,))
+            self._conn.execute('DELETE FROM sessions WHERE sid = ?', (sid,))
+            self._conn.commit()
+
+    def purge_expired(self):
+        with self._lock:
+            now = time.time()
+            self._conn.execute('DELETE FROM session_fields WHERE sid IN (SELECT sid FROM sessions WHERE expires_at < ?)', (now,))
+            purged = self._conn.execute('DELETE FROM sessions WHERE expires_at < ?', (now,)).rowcount
+            self._conn.commit()
+        return purged
+
+    def size(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM sessions WHERE expires_at >= ?', (time.time(),)).fetchone()[0]
+
+    def sids(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute('SELECT sid FROM sessions WHERE expires_at >= ?', (time.time(),))]
+
+
+class RedisSessionBackend:
+    """One Redis hash per session; works with any server speaking the Redis protocol"""
+
+    name = 'redis'
+
+    def __init__(self, url='redis://localhost:6379/0', prefix='session:'):
+        if redis is None:
+            raise RuntimeError("SESSION_BACKEND=redis needs the redis package (pip install redis)")
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+
+    def get_field(self, sid, field):
+        return self._client.hget(self.prefix + sid, field)
+
+    def get_all(self, sid):
+        return self._client.hgetall(self.prefix + sid)
+
+    def save(self, sid, changed, deleted, ttl, replace=False):
+        key = self.prefix + sid
+        pipe = self._client.pipeline()
+        if replace:
+            pipe.delete(key)
+        elif deleted:
+            pipe.hdel(key, *deleted)
+        if changed:
+            pipe.hset(key, mapping=changed)
+        pipe.expire(key, int(ttl))
+        pipe.execute()
+
+    def touch(self, sid, ttl):
+        self._client.expire(self.prefix + sid, int(ttl))
+
+    def purge_expired(self):
+        # Redis expires the hashes itself
+        return 0
+
+    def delete(self, sid):
+        self._client.delete(self.prefix + sid)
+
+    def size(self):
+        return sum(1 for _ in self._client.scan_iter(match=self.prefix + '*', count=500))
+
+    def sids(self):
+        return [key[len(self.prefix):] for key in self._client.scan_iter(match=self.prefix + '*', count=500)]
+
+
+class ServerSession(SessionMixin):
+    """Session dict backed by a store; loads fields on demand and remembers what it loaded"""
+
+    def __init__(self, backend, sid, new=False):
+        self.backend = backend
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.accessed = False
+        self.cleared = False
+        self._values = {}
+        self._loaded_json = {}
+        self._absent = set()
+        self._deleted = set()
+        self._complete = new
+
+    def _load(self, key):
+        self.accessed = True
+        if key in self._values or self._complete or key in self._absent or key in self._deleted:
+            return
+        raw = self.backend.get_field(self.sid, key)
+        if raw is not None:
+            self._values[key] = json.loads(raw)
+            self._loaded_json[key] = raw
+        else:
+            self._absent.add(key)
+
+    def _load_all(self):
+        self.accessed = True
+        if self._complete:
+            return
+        for key, raw in self.backend.get_all(self.sid).items():
+            if key not in self._values and key not in self._deleted:
+                self._values[key] = json.loads(raw)
+                self._loaded_json[key] = raw
+        self._complete = True
+
+    def preload(self):
+        """Read every stored field now, in one call, so later reads never touch the backend"""
+        self._load_all()
+
+    def __getitem__(self, key):
+        self._load(key)
+        return self._values[key]
+
+    def __contains__(self, key):
+        self._load(key)
+        return key in self._values
+
+    def __setitem__(self, key, value):
+        self.accessed = self.modified = True
+        self._absent.discard(key)
+        self._deleted.discard(key)
+        self._values[key] = value
+
+    def __delitem__(self, key):
+        self._load(key)
+        del self._values[key]
+        self._deleted.add(key)
+        self.modified = True
+
+    def __iter__(self):
+        self._load_all()
+        return iter(list(self._values))
+
+    def __len__(self):
+        self._load_all()
+        return len(self._values)
+
+    def clear(self):
+        """Forget every field without loading any of them"""
+        self.accessed = self.modified = self.cleared = True
+        self._values.clear()
+        self._loaded_json.clear()
+        self._absent.clear()
+        self._deleted.clear()
+        self._complete = True
+
+    def changes(self):
+        """(changed fields as JSON, deleted fields): what a save has to write"""
+        changed = {}
+        for key, value in self._values.items():
+            raw = _dumps(value)
+            if raw != self._loaded_json.get(key):
+                changed[key] = raw
+        return changed, set() if self.cleared else set(self._deleted)
+
+    def mark_saved(self, changed):
+        self._loaded_json.update(changed)
+        for key in list(self._loaded_json):
+            if key not in self._values:
+                del self._loaded_json[key]
+        self._deleted.clear()
+        self.cleared = self.modified = False
+
+
+class ServerSessionInterface(SessionInterface):
+    """Flask session interface keeping session data in a backend and only a signed id in the cookie"""
+
+    def __init__(self, backend, ttl=None):
+        self.backend = backend
+        self.ttl = ttl
+        self.writes = 0
+        self.fields_written = 0
+        self.loads = 0
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt='server-session')
+
+    def _ttl(self, app):
+        return self.ttl or app.permanent_session_lifetime.total_seconds()
+
+    def load(self, app, cookie):
+        """The session named by a cookie value, or a new empty one"""
+        self.loads += 1
+        if cookie:
+            try:
+                sid = self._signer(app).unsign(cookie).decode('ascii')
+                return ServerSession(self.backend, sid)
+            except BadSignature:
+                pass
+        return ServerSession(self.backend, secrets.token_urlsafe(32), new=True)
+
+    def persist(self, app, sess):
+        """Write back what changed; returns 'set' or 'delete' when the cookie must change, else None"""
+        changed, deleted = sess.changes()
+        if sess.cleared and not sess._values:
+            if not sess.new:
+                self.backend.delete(sess.sid)
+            sess.mark_saved({})
+            return None if sess.new else 'delete'
+        if changed or deleted or sess.cleared:
+            if sess.new and not changed:
+                return None
+            self.backend.save(sess.sid, changed, deleted, self._ttl(app), replace=sess.cleared)
+            self.writes += 1
+            self.fields_written += len(changed)
+            sess.mark_saved(changed)
+            if sess.new:
+                # New sessions are rare next to requests; a good time to sweep expired ones
+                self.backend.purge_expired()
+                sess.new = False
+                return 'set'
+        elif sess.accessed and not sess.new:
+            self.backend.touch(sess.sid, self._ttl(app))
+        return None
+
+    def cookie_value(self, app, sess):
+        return self._signer(app).sign(sess.sid.encode('ascii')).decode('ascii')
+
+    def open_session(self, app, request):
+        return self.load(app, request.cookies.get(self.get_cookie_name(app)))
+
+    def save_session(self, app, session, response):
+        if session.accessed:
+            response.vary.add('Cookie')
+        action = self.persist(app, session)
+        name = self.get_cookie_name(app)
+        if action == 'delete':
+            response.delete_cookie(name, domain=self.get_cookie_domain(app), path=self.get_cookie_path(app))
+        elif action == 'set':
+            response.set_cookie(
+                name,
+                self.cookie_value(app, session),
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=self.get_cookie_domain(app),
+                path=self.get_cookie_path(app),
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app)
+            )
+
+    def stats(self):
+        try:
+            sessions = self.backend.size()
+        except Exception:
+            sessions = None
+        return {
+            'backend': self.backend.name,
+            'sessions': sessions,
+            'loads': self.loads,
+            'writes': self.writes,
+            'fields_written': self.fields_written
+        }
+
+
+def build_session_interface_from_env():
+    """Session interface for SESSION_BACKEND (sqlite, memory, redis or cookie); None keeps Flask's cookie session"""
+    backend_name = os.getenv('SESSION_BACKEND', 'sqlite').lower()
+    if backend_name == 'cookie':
+        return None
+    if backend_name == 'memory':
+        backend = MemorySessionBackend()
+    elif backend_name == 'redis':
+        backend = RedisSessionBackend(os.getenv('SESSION_REDIS_URL', 'redis://localhost:6379/0'))
+    else:
+        backend = SQLiteSessionBackend(os.getenv('SESSION_PATH', 'sessions.sqlite3'))
+    ttl = os.getenv('SESSION_TTL')
+    return ServerSessionInterface(backend, float(ttl) if ttl else None)
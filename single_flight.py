@@ -0,0 +1,206 @@
+"""
+Request coalescing ("single-flight") for identical concurrent LLM prompts.
+
+When several callers ask for the same prompt key at the same time, only the
+first one (the leader) calls upstream; the others wait for it and share its
+parsed result.
+
+- SingleFlight coalesces threads inside one worker process.
+- FileLockSingleFlight additionally coalesces gunicorn workers on one host:
+  the leader holds an flock on a per-key lock file, and workers that had to
+  wait re-check the shared response cache (use the SQLite backend) before
+  calling upstream themselves.
+"""
+import os
+import copy
+import asyncio
+import time
+import tempfile
+import threading
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process variant is available
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key inside one process"""
+
+    name = 'thread'
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key, fn, lookup=None):
+        """Run fn() once per key among concurrent callers and share its result.
+
+        lookup is unused here; it lets callers treat both variants alike.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = self._lead(key, fn, lookup)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _lead(self, key, fn, lookup):
+        return fn()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'mode': self.name,
+                'leaders': self.leaders,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls)
+            }
+
+
+class FileLockSingleFlight(SingleFlight):
+    """Thread coalescing plus a per-key flock shared by all workers on the host"""
+
+    name = 'file'
+
+    def __init__(self, lock_dir=None, wait_timeout=60.0):
+        super().__init__()
+        self.lock_dir = lock_dir or os.path.join(tempfile.gettempdir(), 'llm-interview-sim-locks')
+        self.wait_timeout = wait_timeout
+        self.cross_process_coalesced = 0
+        os.makedirs(self.lock_dir, exist_ok=True)
+
+    def _lead(self, key, fn, lookup):
+        path = os.path.join(self.lock_dir, f"{key[:40]}.lock")
+        with open(path, 'a') as lock_file:
+            waited = False
+            deadline = time.monotonic() + self.wait_timeout
+            while True:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    waited = True
+                    if time.monotonic() >= deadline:
+                        logger.warning(f"Timed out waiting for in-flight request {key[:12]} in another worker")
+                        return fn()
+                    time.sleep(0.05)
+            try:
+                if waited and lookup is not None:
+                    result = lookup()
+                    if result is not None:
+                        with self._lock:
+                            self.cross_process_coalesced += 1
+                        return result
+                return fn()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def stats(self):
+        stats = super().stats()
+        with self._lock:
+            stats['cross_process_coalesced'] = self.cross_process_coalesced
+        return stats
+
+
+class AsyncSingleFlight:
+    """SingleFlight for asyncio: coalesces concurrent coroutines on one event loop"""
+
+    name = 'asyncio'
+
+    def __init__(self):
+        self._calls = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn):
+        """Await fn() once per key among concurrent callers and share its result.
+
+        fn() runs as a task of its own that no caller owns: a caller cancelled
+        by its own deadline stops waiting, but the call carries on for the
+        others (the leader included) and still finishes.
+        """
+        task = self._calls.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return copy.deepcopy(await asyncio.shield(task))
+
+        task = self._calls[key] = asyncio.ensure_future(fn())
+        task.add_done_callback(lambda done: self._finished(key, done))
+        self.leaders += 1
+        return await asyncio.shield(task)
+
+    def _finished(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark retrieved so a failure nobody waited for is not logged as never retrieved
+            task.exception()
+
+    def stats(self):
+        return {
+            'mode': self.name,
+            'leaders': self.leaders,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._calls)
+        }
+
+
+def build_single_flight_from_env():
+    """Build the coalescer configured by SINGLE_FLIGHT (thread, file or off)"""
+    mode = os.getenv('SINGLE_FLIGHT', 'thread').lower()
+    if mode in ['off', 'none', 'false', '0']:
+        return None
+    if mode == 'file':
+        if fcntl is None:
+            logger.warning("SINGLE_FLIGHT=file needs fcntl; falling back to thread-level coalescing")
+            return SingleFlight()
+        return FileLockSingleFlight(os.getenv('SINGLE_FLIGHT_LOCK_DIR'))
+    return SingleFlight()
+
+
+_single_flight = None
+_single_flight_pid = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight():
+    """Return this process's coalescer (None when disabled); a forked worker builds its own"""
+    global _single_flight, _single_flight_pid
+    with _single_flight_lock:
+        if _single_flight_pid != os.getpid():
+            # A copy inherited over fork may hold calls whose leaders only exist in the parent
+            _single_flight = build_single_flight_from_env()
+            _single_flight_pid = os.getpid()
+        return _single_flight
@@ -11,6 +11,9 @@ from unittest.mock import patch, MagicMock
 # Add the current directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+# Test calls must not spend the host's shared daily OpenRouter budget
+os.environ.setdefault('RATE_LIMIT_STORE', 'off')
+
 def test_imports():
     """Test that all required modules can be imported"""
     try:
@@ -44,6 +47,225 @@ def test_json_parsing():
         print(f"✗ JSON parsing test failed: {e}")
         return False
 
+def test_json_extraction():
+    """Test the single-pass JSON scanner on wrapped, truncated and adversarial output"""
+    try:
+        import time
+        from llm_json import extract_json, NO_JSON
+
+        wrapped = 'Sure, see {the rubric}: {"feedback": "Use } and \\" carefully", "score": 7} Hope this helps [1].'
+        assert extract_json(wrapped) == {"feedback": 'Use } and " carefully', "score": 7}, "Braces in strings broke the scan"
+        assert extract_json('Here:\n```json\n["A?", "B?"]\n```\nMore text') == ["A?", "B?"], "Code fence not stripped"
+        truncated = '{"overall_score": 7, "strengths": ["Clear", "Concise"], "areas_for_improvement": ["Dep'
+        assert extract_json(truncated) == ["Clear", "Concise"], "Complete values inside a cut-off reply were lost"
+        assert extract_json('No JSON {here} at [all]') is NO_JSON, "Prose brackets parsed as JSON"
+
+        started = time.time()
+        for text in ('{' * 200000, '[' * 200000, '{"a": ' * 50000, 'x {' * 100000 + '"}'):
+            extract_json(text)
+        assert time.time() - started < 2, f"Adversarial input took {time.time() - started:.2f}s"
+
+        print("✓ JSON scanner extracts the first balanced value in linear time")
+        return True
+    except Exception as e:
+        print(f"✗ JSON extraction test failed: {e}")
+        return False
+
+def test_response_schemas():
+    """Test schema validation repairs common defects instead of retrying"""
+    try:
+        from llm_schemas import validate_questions, validate_feedback, validate_summary, AnswerFeedback
+        from fake_openrouter import FakeOpenRouter
+        import working_app
+
+        questions = ["What is X?", "Why Y?", "How Z?", "When W?"]
+        assert validate_questions(questions).questions is questions, "Valid list should pass through untouched"
+        repaired = validate_questions({"questions": [{"question": "1. What is X?"}, "2) Why Y?", "- How Z?", "- How Z?"]})
+        assert repaired.questions == ["What is X?", "Why Y?", "How Z?"], f"Questions not repaired: {repaired}"
+        assert validate_questions(["Only one?"]) is None, "Too few questions accepted"
+        feedback = validate_feedback({"feedback": "Solid.", "score": "7/10", "confidence": "high"})
+        assert feedback == AnswerFeedback("Solid.", 7, "", ""), f"Feedback not repaired: {feedback}"
+        assert validate_feedback({"rating": 12.4}).score == 10, "Score not clamped"
+        summary = validate_summary({"strengths": "Clear", "areas_for_improvement": ["1. Depth"], "score": "8 out of 10"})
+        assert summary.improvements == ["Depth"] and summary.overall_score == 8, f"Summary not repaired: {summary}"
+
+        tips = {"tips": ["1. Research the team", "2. Prepare STAR stories", "3. Ask questions", "4. Follow up"]}
+        fake = FakeOpenRouter({'models': {'fake/wrapped-tips': {'latency': '0', 'content': json.dumps(tips)}}})
+        base_url = fake.start()
+        env = {'FAKE_AI': 'false', 'OPENROUTER_API_KEY': 'schema-test-key', 'OPENROUTER_MODEL': 'fake/wrapped-tips',
+               'LLM_CACHE_BACKEND': 'off'}
+        try:
+            with patch.dict(os.environ, env), patch.object(working_app, 'OPENROUTER_CHAT_URL', f"{base_url}/chat/completions"):
+                result = working_app.app.test_client().get('/interview_tips').get_json()
+            requests_made = fake.stats()['requests']
+        finally:
+            fake.stop()
+        assert result['tips'] == ["Research the team", "Prepare STAR stories", "Ask questions", "Follow up"], f"Tips: {result}"
+        assert requests_made == 1, f"Wrapped tips triggered {requests_made - 1} retries"
+
+        print("✓ Response schemas repair malformed shapes without extra LLM calls")
+        return True
+    except Exception as e:
+        print(f"✗ Response schema test failed: {e}")
+        return False
+
+def test_parallel_fallbacks():
+    """Test fallback prompts run concurrently and question generation stops at its deadline"""
+    try:
+        import time
+        from fake_openrouter import FakeOpenRouter
+        import working_app
+
+        # One tip is never enough, so the primary prompt and all three fallbacks are spent
+        fake = FakeOpenRouter({'models': {'fake/one-tip': {'latency': '0.4', 'content': '["Only one tip"]'},
+                                          'fake/slow-questions': {'latency': '1.5'}}})
+        base_url = fake.start()
+        env = {'FAKE_AI': 'false', 'OPENROUTER_API_KEY': 'fallback-test-key', 'LLM_CACHE_BACKEND': 'off'}
+        try:
+            with patch.dict(os.environ, env), patch.object(working_app, 'OPENROUTER_CHAT_URL', f"{base_url}/chat/completions"):
+                with patch.dict(os.environ, {'OPENROUTER_MODEL': 'fake/one-tip'}):
+                    started = time.monotonic()
+                    tips = working_app.app.test_client().get('/interview_tips')
+                    tips_elapsed = time.monotonic() - started
+                    tips_requests = fake.stats()['requests']
+
+                with patch.dict(os.environ, {'OPENROUTER_MODEL': 'fake/slow-questions'}), \
+                        patch.object(working_app, 'QUESTIONS_DEADLINE', 0.5):
+                    started = time.monotonic()
+                    configure = working_app.app.test_client().post('/configure', json={'job_role': 'Engineer', 'interview_type': 'Technical'})
+                    configure_elapsed = time.monotonic() - started
+        finally:
+            fake.stop()
+        assert tips.status_code == 500 and tips_requests == 4, f"Tips: {tips.status_code}, {tips_requests} requests"
+        # Serial fallbacks would take 4 x 0.4s
+        assert tips_elapsed < 1.2, f"Fallback prompts ran serially ({tips_elapsed:.2f}s)"
+        assert configure.status_code == 500, f"Configure should fail past its deadline: {configure.status_code}"
+        assert configure_elapsed < 1.0, f"Deadline not enforced ({configure_elapsed:.2f}s)"
+
+        print(f"✓ Fallback prompts race ({tips_elapsed:.2f}s for 4 prompts) and question generation stops at its deadline")
+        return True
+    except Exception as e:
+        print(f"✗ Parallel fallback test failed: {e}")
+        return False
+
+def test_question_bank():
+    """Test the question bank dedupes, samples unserved questions and serves /configure without the LLM"""
+    try:
+        import time
+        import tempfile
+        from question_bank import QuestionBank
+        from fake_openrouter import FakeOpenRouter
+        import working_app
+
+        with tempfile.TemporaryDirectory() as tmp:
+            bank = QuestionBank(os.path.join(tmp, 'bank.sqlite3'), target_fresh=4)
+            added = bank.add('Engineer', 'Technical', 'Web', ["What is X?", "what is X", "Why Y?", "How Z?", "When W?"])
+            assert added == 4, f"Duplicate not dropped: {added} added"
+            first = bank.sample('Engineer', 'Technical', 'Web', count=2)
+            second = bank.sample('engineer ', 'Technical', 'Web', count=2)
+            assert not set(first) & set(second), "Served questions were sampled again"
+            assert bank.sample('Engineer', 'Technical', 'Web', count=1) is None, "Only served questions left, yet not a miss"
+            bank.add('Engineer', 'Technical', 'Web', ["Where V?", "Who U?"], served=True)
+            assert bank.sample('Engineer', 'Technical', 'Web', count=1) is None, "Live-generated (served) questions reused"
+            bank.add('Engineer', 'Technical', 'Web', ["Which T?", "Whose S?", "Whom R?"])
+            assert bank.sample('Engineer', 'Technical', 'Web', count=3, exclude=["Which T?"]) is None, "Excluded questions served"
+            assert bank.sample('Astronaut', 'Technical', 'Web') is None, "Unknown role should miss"
+            assert bank.stats()['refill_backlog'] == 2, f"Low keys not queued: {bank.stats()}"
+            bank._conn.close()
+
+            bank = QuestionBank(os.path.join(tmp, 'app-bank.sqlite3'), target_fresh=10, batch_size=10)
+            batches = []
+
+            def generate(job_role, interview_type, domain, count, avoid):
+                batches.append(count)
+                return [f"Refill {len(batches)}.{i}: how would you handle incident {i} as a {job_role}?" for i in range(count)]
+
+            fake = FakeOpenRouter({'models': {'fake/bank-questions': {'latency': '0.3'}}})
+            base_url = fake.start()
+            env = {'FAKE_AI': 'false', 'OPENROUTER_API_KEY': 'question-bank-key', 'OPENROUTER_MODEL': 'fake/bank-questions',
+                   'LLM_CACHE_BACKEND': 'off'}
+            config = {'job_role': 'Bank Engineer', 'interview_type': 'Behavioral', 'domain': 'Payments'}
+            try:
+                with patch.dict(os.environ, env), patch.object(working_app, 'OPENROUTER_CHAT_URL', f"{base_url}/chat/completions"), \
+                        patch.object(working_app, 'get_question_bank', lambda: bank), \
+                        patch.object(working_app, '_generate_bank_questions', generate):
+                    working_app.app.test_client().post('/configure', json=config)
+                    deadline = time.monotonic() + 5
+                    while bank.stats()['refill_backlog'] and time.monotonic() < deadline:
+                        time.sleep(0.05)
+                    requests_before = fake.stats()['requests']
+                    started = time.monotonic()
+                    client = working_app.app.test_client()
+                    result = client.post('/configure', json=config).get_json()
+                    elapsed = time.monotonic() - started
+                    requests_made = fake.stats()['requests'] - requests_before
+                    metrics = client.get('/ai_metrics').get_json()['question_bank']
+            finally:
+                bank.stop()
+                fake.stop()
+                bank._conn.close()
+        assert result['status'] == 'success' and result['question'].startswith('Refill 1.'), f"Configure not from fresh bank questions: {result}"
+        assert requests_made == 0 and elapsed < 0.3, f"Banked configure made {requests_made} requests in {elapsed:.2f}s"
+        assert metrics['hits'] == 1 and metrics['misses'] == 1 and metrics['questions'] == 15, f"Metrics: {metrics}"
+
+        print(f"✓ Question bank serves /configure in {elapsed * 1000:.0f}ms and refills in the background")
+        return True
+    except Exception as e:
+        print(f"✗ Question bank test failed: {e}")
+        return False
+
+def test_tips_prefetch():
+    """Test /configure prefetches tips for /interview_tips and /clear_session cancels the prefetch"""
+    try:
+        import time
+        from fake_openrouter import FakeOpenRouter, TIPS
+        from prefetch import prefetcher
+        import working_app
+
+        fake = FakeOpenRouter({'models': {'fake/prefetch': {'latency': '0.4'}, 'fake/stalled': {'latency': '3'}}})
+        base_url = fake.start()
+        env = {'FAKE_AI': 'false', 'OPENROUTER_API_KEY': 'prefetch-test-key', 'OPENROUTER_MODEL': 'fake/prefetch',
+               'LLM_CACHE_BACKEND': 'off'}
+        config = {'job_role': 'Prefetch Engineer', 'interview_type': 'Technical', 'domain': 'Web'}
+        try:
+            with patch.dict(os.environ, env), patch.object(working_app, 'OPENROUTER_CHAT_URL', f"{base_url}/chat/completions"):
+                client = working_app.app.test_client()
+                client.post('/configure', json=config)
+                started = time.monotonic()
+                tips = client.get('/interview_tips').get_json()
+                tips_elapsed = time.monotonic() - started
+                requests_made = fake.stats()['requests']
+
+                cancelled_before = prefetcher.stats()['cancelled']
+                client.post('/configure', json=config)
+                with client.session_transaction() as sess:
+                    interview_id = sess['interview_id']
+                client.post('/clear_session')
+                cancelled = prefetcher.stats()['cancelled'] - cancelled_before
+
+                # Waiting for a stalled prefetch and the live retry share one TIPS_DEADLINE
+                with patch.dict(os.environ, {'OPENROUTER_MODEL': 'fake/stalled'}), \
+                        patch.object(working_app, 'TIPS_DEADLINE', 0.6), patch.object(working_app, 'QUESTIONS_DEADLINE', 0.1):
+                    client.post('/configure', json=config)
+                    started = time.monotonic()
+                    stalled = client.get('/interview_tips')
+                    stalled_elapsed = time.monotonic() - started
+                client.post('/clear_session')
+        finally:
+            fake.stop()
+        assert tips['tips'] == TIPS, f"Tips: {tips}"
+        assert tips_elapsed < 0.2 and requests_made == 2, f"Tips not prefetched: {tips_elapsed:.2f}s, {requests_made} requests"
+        # One for the first interview (replaced by the second), one for /clear_session
+        assert cancelled == 2, f"{cancelled} prefetches cancelled"
+        assert prefetcher.future(interview_id, 'tips') is None, "Cleared session's prefetch still registered"
+        assert stalled.status_code != 200 and stalled_elapsed < 0.8, f"Tips took {stalled_elapsed:.2f}s past a 0.6s deadline"
+
+        print(f"✓ Tips prefetched at /configure and served in {tips_elapsed * 1000:.0f}ms; /clear_session cancels")
+        return True
+    except Exception as e:
+        print(f"✗ Tips prefetch test failed: {e}")
+        return False
+
 def test_ai_response_mock():
     """Test AI response function with mocked responses"""
     try:
@@ -122,6 +344,1196 @@ def test_static_files():
         print(f"✗ Static files test failed: {e}")
         return False
 
+def _start_local_server(handler_class):
+    """Start a threaded HTTP/1.1 server on a free localhost port"""
+    import threading
+    from http.server import ThreadingHTTPServer
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler_class)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def test_provider_client_reuse():
+    """Test that the pooled provider client reuses keep-alive connections"""
+    try:
+        from http.server import BaseHTTPRequestHandler
+        from provider_client import ProviderClient
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                body = b'{"ok": true}'
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server, base_url = _start_local_server(Handler)
+        try:
+            client = ProviderClient(pool_size=2, keep_alive=True, connect_timeout=2, read_timeout=5)
+            for _ in range(3):
+                response = client.post(f"{base_url}/api/v1/chat/completions", json={"model": "x"})
+                assert response.status_code == 200, "Local request failed"
+            stats = client.stats()['providers'][base_url]
+            assert stats['requests'] == 3, f"Unexpected request count: {stats}"
+            assert stats['connections_opened'] == 1, f"Connection was not reused: {stats}"
+            assert stats['connections_reused'] == 2, f"Unexpected reuse count: {stats}"
+            client.close()
+        finally:
+            server.shutdown()
+
+        print("✓ Provider client reuses pooled connections")
+        return True
+    except Exception as e:
+        print(f"✗ Provider client test failed: {e}")
+        return False
+
+def _chat_handler(behaviors):
+    """Handler speaking a minimal chat completions protocol.
+
+    behaviors maps model name -> (delay_seconds, status_code, content)
+    """
+    import time
+    from http.server import BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            delay, status, content = behaviors.get(request.get('model'), (0, 404, 'unknown model'))
+            time.sleep(delay)
+            if status == 200:
+                body = json.dumps({"choices": [{"message": {"content": content}}]}).encode()
+            else:
+                body = json.dumps({"error": {"message": content}}).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+def test_hedged_model_chain():
+    """Test that hedged fallback answers at the speed of the fastest healthy model"""
+    try:
+        import time
+        from working_app import _hedged_model_chain
+
+        behaviors = {
+            'slow-model': (3, 200, 'slow'),
+            'broken-model': (0, 429, 'rate limited'),
+            'fast-model': (0, 200, 'fast')
+        }
+        server, base_url = _start_local_server(_chat_handler(behaviors))
+        try:
+            url = f"{base_url}/api/v1/chat/completions"
+            started = time.time()
+            content, failure = _hedged_model_chain(url, {}, ['slow-model', 'broken-model', 'fast-model'], 'hi', 10, 0.2)
+            elapsed = time.time() - started
+            assert failure is None and content == 'fast', f"Unexpected hedge result: {content} {failure}"
+            assert elapsed < 2, f"Hedging did not bypass the slow model ({elapsed:.2f}s)"
+
+            content, failure = _hedged_model_chain(url, {}, ['broken-model'], 'hi', 10, 0.2)
+            assert content is None and failure[0] == 429, f"Expected 429 failure, got {failure}"
+        finally:
+            server.shutdown()
+
+        print("✓ Hedged model fallback returns the fastest valid answer")
+        return True
+    except Exception as e:
+        print(f"✗ Hedged model fallback test failed: {e}")
+        return False
+
+def test_model_health_registry():
+    """Test that the circuit breaker skips failing models and probes them after cooldown"""
+    try:
+        import time
+        from model_health import HealthRegistry
+
+        registry = HealthRegistry(failure_threshold=2, cooldown=0.2)
+        models = ['primary', 'backup']
+        registry.record_success('backup', 0.5)
+        registry.record_failure('primary', 500, 'boom')
+        assert registry.order(models) == ['backup', 'primary'], "Failing model should be ranked last"
+
+        registry.record_failure('primary', 500, 'boom')
+        assert registry.order(models) == ['backup'], "Open circuit should be skipped"
+
+        registry.record_failure('backup', 429, 'rate limited', headers={'X-RateLimit-Reset': str(int((time.time() + 60) * 1000))})
+        assert registry.order(models) == [], "Rate-limited model should stay skipped until reset"
+        assert registry.snapshot(['backup'])['backup']['rate_limited_until'] is not None, "Reset time not recorded"
+
+        time.sleep(0.25)
+        assert registry.order(models) == ['primary'], "Half-open probe should be offered after cooldown"
+        assert registry.order(models) == [], "Only one half-open probe at a time"
+        registry.record_success('primary', 0.1)
+        assert registry.order(models) == ['primary'], "Successful probe should close the circuit"
+
+        print("✓ Model health registry opens and recovers circuits")
+        return True
+    except Exception as e:
+        print(f"✗ Model health registry test failed: {e}")
+        return False
+
+def test_auth_errors_and_probes():
+    """Test that a refused API key leaves circuits closed and unused half-open probes are given back"""
+    try:
+        import time
+        import requests
+        import working_app
+        from model_health import HealthRegistry
+        from fake_openrouter import FakeOpenRouter
+
+        registry = HealthRegistry(failure_threshold=1, cooldown=0.2)
+        for _ in range(3):
+            registry.record_failure('keyed-model', 401, 'No auth credentials found')
+        health = registry.snapshot(['keyed-model'])['keyed-model']
+        assert health['state'] == 'closed' and health['last_status'] == 401, f"401 opened the circuit: {health}"
+
+        fallbacks = working_app._models_to_try()[1:]
+        for model in ['probe-a', 'probe-b'] + fallbacks:
+            registry.record_failure(model, 500, 'boom')
+        time.sleep(0.25)
+
+        def probes_out():
+            return [m for m, h in registry._models.items() if h.probe_started is not None]
+
+        with patch.object(working_app, 'health_registry', registry), \
+                patch.object(working_app, '_try_model', side_effect=requests.exceptions.ConnectionError('down')):
+            models = registry.order(['probe-a', 'probe-b'])
+            try:
+                working_app._sequential_model_chain('http://unused', {}, models, 'hi', 10)
+                assert False, "Connection error should propagate"
+            except requests.exceptions.ConnectionError:
+                pass
+        assert not probes_out(), f"Probes kept after a raising attempt: {probes_out()}"
+
+        fake = FakeOpenRouter({'seed': 1, 'models': {'fake/keyless-model': {'status': 401}}})
+        base_url = fake.start()
+        env = {'FAKE_AI': 'false', 'OPENROUTER_API_KEY': 'fake-openrouter-test'}
+        try:
+            with patch.object(working_app, 'health_registry', registry), \
+                    patch.object(working_app, 'OPENROUTER_CHAT_URL', f"{base_url}/chat/completions"):
+                with patch.dict(os.environ, dict(env, OPENROUTER_MODEL='fake/good-model')):
+                    streamed = ''.join(working_app.stream_ai_response("Evaluate this answer and give a score"))
+                    assert streamed, "Stream returned nothing"
+                assert not probes_out(), f"Probes kept after a successful stream: {probes_out()}"
+
+                with patch.dict(os.environ, dict(env, OPENROUTER_MODEL='fake/keyless-model')):
+                    try:
+                        ''.join(working_app.stream_ai_response("Evaluate this answer and give a score"))
+                        assert False, "401 should end the stream"
+                    except working_app.AIStreamError:
+                        pass
+                assert fake.stats()['requests'] == 2, f"Other models tried with a refused key: {fake.stats()}"
+                assert not probes_out(), f"Probes kept after a refused key: {probes_out()}"
+        finally:
+            fake.stop()
+
+        print("✓ Auth errors leave circuits closed and unused probes are released")
+        return True
+    except Exception as e:
+        print(f"✗ Auth errors and probes test failed: {e}")
+        return False
+
+def test_response_cache():
+    """Test the LLM response cache backends (TTL, LRU eviction, counters)"""
+    try:
+        import time
+        import tempfile
+        from llm_cache import ResponseCache, MemoryLRUBackend, SQLiteBackend, cache_key, MISS
+
+        key = cache_key('model', 'Generate 5 questions', 800, 0.7)
+        assert key == cache_key('model', 'Generate 5 questions', 800, 0.7), "Cache key is not stable"
+        assert key != cache_key('model', 'Generate 5 questions', 400, 0.7), "max_tokens must be part of the key"
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for backend in [MemoryLRUBackend(max_entries=2), SQLiteBackend(os.path.join(tmp, 'cache.sqlite3'), max_entries=2)]:
+                cache = ResponseCache(backend, default_ttl=60)
+                assert cache.get('a') is MISS, f"{backend.name}: empty cache should miss"
+                cache.set('a', ["q1", "q2"])
+                assert cache.get('a') == ["q1", "q2"], f"{backend.name}: stored value not returned"
+                cache.set('b', {"x": 1})
+                cache.set('c', {"y": 2})
+                assert cache.get('b') == {"x": 1}, f"{backend.name}: recent entry evicted"
+                assert backend.size() == 2, f"{backend.name}: size bound not enforced"
+                cache.set('short', "value", ttl=0.05)
+                time.sleep(0.1)
+                assert cache.get('short') is MISS, f"{backend.name}: expired entry returned"
+                stats = cache.stats()
+                assert stats['hits'] == 2 and stats['misses'] == 2, f"{backend.name}: wrong counters {stats}"
+
+        # A malformed question set is not cached; the next call asks again
+        import working_app
+        from llm_schemas import validate_questions
+        cache = ResponseCache(MemoryLRUBackend(), default_ttl=60)
+        answers = [["Only one?", "And two?"], [f"Question {n}?" for n in range(5)]]
+        with patch.dict(os.environ, {'FAKE_AI': 'false', 'OPENROUTER_API_KEY': 'cache-test-key'}), \
+                patch.object(working_app, 'get_response_cache', return_value=cache), \
+                patch.object(working_app, '_openrouter_response', side_effect=answers) as upstream:
+            for expected in answers + answers[1:]:
+                result = working_app.get_ai_response('Generate 5 questions', expect_json=True, cache_ttl=60,
+                                                     validate=validate_questions)
+                assert result == expected, f"Unexpected response {result}"
+        assert upstream.call_count == 2, f"Valid answer not served from cache ({upstream.call_count} upstream calls)"
+
+        print("✓ Response cache backends work")
+        return True
+    except Exception as e:
+        print(f"✗ Response cache test failed: {e}")
+        return False
+
+def test_single_flight():
+    """Test that identical concurrent prompts share one upstream call"""
+    try:
+        import time
+        import tempfile
+        import threading
+        from single_flight import SingleFlight, FileLockSingleFlight, fcntl
+
+        calls = []
+
+        def slow_fetch():
+            calls.append(1)
+            time.sleep(0.3)
+            return ["q1", "q2", "q3"]
+
+        flight = SingleFlight()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do('same-key', slow_fetch))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(calls) == 1, f"Expected one upstream call, got {len(calls)}"
+        assert results == [["q1", "q2", "q3"]] * 5, "Callers did not share the result"
+        assert flight.stats()['coalesced'] == 4, f"Wrong coalesced count: {flight.stats()}"
+
+        if fcntl is not None:
+            # Two coalescers with their own lock file handles behave like two workers
+            shared_cache = {}
+            calls.clear()
+
+            def fetch_and_store():
+                result = slow_fetch()
+                shared_cache['key'] = result
+                return result
+
+            with tempfile.TemporaryDirectory() as lock_dir:
+                worker_a = FileLockSingleFlight(lock_dir)
+                worker_b = FileLockSingleFlight(lock_dir)
+                leader = threading.Thread(target=lambda: worker_a.do('abc', fetch_and_store, lambda: shared_cache.get('key')))
+                leader.start()
+                time.sleep(0.05)
+                result = worker_b.do('abc', fetch_and_store, lambda: shared_cache.get('key'))
+                leader.join()
+            assert len(calls) == 1, f"Cross-worker call was not coalesced ({len(calls)} calls)"
+            assert result == ["q1", "q2", "q3"], "Waiting worker did not get the shared result"
+            assert worker_b.stats()['cross_process_coalesced'] == 1, "Cross-worker coalescing not counted"
+
+        # A leader giving up at its own deadline leaves the shared call running for a follower
+        import asyncio
+        from single_flight import AsyncSingleFlight
+        async_flight = AsyncSingleFlight()
+
+        async def slow_fetch():
+            await asyncio.sleep(0.3)
+            return ["q1", "q2", "q3"]
+
+        async def leader_and_follower():
+            leader = asyncio.ensure_future(asyncio.wait_for(async_flight.do('abc', slow_fetch), 0.1))
+            await asyncio.sleep(0)
+            follower = await asyncio.wait_for(async_flight.do('abc', slow_fetch), 5)
+            return await asyncio.gather(leader, return_exceptions=True), follower
+
+        (leader_result,), follower_result = asyncio.run(leader_and_follower())
+        assert isinstance(leader_result, asyncio.TimeoutError), f"Leader did not time out: {leader_result!r}"
+        assert follower_result == ["q1", "q2", "q3"], f"Follower lost the shared call: {follower_result!r}"
+
+        # Callers only share a flight at the same priority, and an abandoned leader does not fail its followers
+        import working_app
+        import single_flight
+        from rate_limiter import NORMAL, OPTIONAL
+        assert working_app._response_cache_slot('p', 400, True, None, OPTIONAL)[2] != \
+            working_app._response_cache_slot('p', 400, True, None, NORMAL)[2], "Priorities share a flight key"
+
+        def openrouter(prompt, max_tokens, expect_json, key, priority, abandoned):
+            if abandoned.is_set():
+                time.sleep(0.2)
+                return {'error': 'AI request abandoned: gone', 'abandoned': True}
+            return ["fresh"]
+
+        gone = threading.Event()
+        gone.set()
+        with patch.dict(os.environ, {'FAKE_AI': 'false', 'OPENROUTER_API_KEY': 'flight-key', 'SINGLE_FLIGHT': 'thread'}), \
+                patch.object(working_app, '_openrouter_response', side_effect=openrouter):
+            leader = threading.Thread(target=working_app.get_ai_response, args=('Same prompt',), kwargs={'abandoned': gone})
+            leader.start()
+            time.sleep(0.05)
+            follower_result = working_app.get_ai_response('Same prompt', abandoned=threading.Event())
+            leader.join()
+        assert follower_result == ["fresh"], f"Follower inherited the abandoned result: {follower_result}"
+
+        parent_flight = single_flight.get_single_flight()
+        with patch.object(single_flight.os, 'getpid', return_value=os.getpid() + 1):
+            assert single_flight.get_single_flight() is not parent_flight, "Forked worker reused the parent's coalescer"
+        single_flight.get_single_flight()
+
+        print("✓ Single-flight coalesces identical concurrent prompts")
+        return True
+    except Exception as e:
+        print(f"✗ Single-flight test failed: {e}")
+        return False
+
+def test_rate_limiter_priorities():
+    """Test that optional calls are shed before critical calls are throttled"""
+    try:
+        import time
+        from rate_limiter import RateLimiter, CRITICAL, OPTIONAL
+
+        limiter = RateLimiter(rpm=60, rpd=5, critical_reserve=2, max_wait=0.5)
+        assert limiter.acquire('key', OPTIONAL)[0], "Optional call should pass with budget left"
+        assert limiter.acquire('key', OPTIONAL)[0], "Optional call should pass with budget left"
+        assert limiter.acquire('key', OPTIONAL)[0], "Optional call should pass with budget left"
+        admitted, reason = limiter.acquire('key', OPTIONAL)
+        assert not admitted and 'reserved' in reason, f"Optional call should be shed at the reserve ({reason})"
+        assert limiter.acquire('key', CRITICAL)[0], "Critical call should use the reserve"
+        assert limiter.acquire('key', CRITICAL)[0], "Critical call should use the reserve"
+        admitted, reason = limiter.acquire('key', CRITICAL)
+        assert not admitted and 'exhausted' in reason, f"Daily budget should be exhausted ({reason})"
+
+        limiter = RateLimiter(rpm=60, rpd=100, critical_reserve=0, max_wait=2)
+        limiter.update_from_response('key', 429, {'Retry-After': '0.3'})
+        assert not limiter.acquire('key', OPTIONAL)[0], "Optional call should be shed while rate limited"
+        started = time.time()
+        assert limiter.acquire('key', CRITICAL)[0], "Critical call should wait out a short 429"
+        assert time.time() - started >= 0.2, "Critical call did not wait for the reset"
+
+        limiter.update_from_response('key', 200, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(int((time.time() + 3600) * 1000))})
+        assert not limiter.acquire('key', CRITICAL)[0], "Upstream remaining=0 should stop all calls"
+
+        import asyncio
+        import tempfile
+        from rate_limiter import DailyBudgetStore
+        with tempfile.TemporaryDirectory() as tmp:
+            # Two workers on one host share the key's daily budget through the store
+            path = os.path.join(tmp, 'rate_limits.sqlite3')
+            first = RateLimiter(rpm=60, rpd=4, critical_reserve=1, max_wait=0.5, store=DailyBudgetStore(path))
+            second = RateLimiter(rpm=60, rpd=4, critical_reserve=1, max_wait=0.5, store=DailyBudgetStore(path))
+            assert first.acquire('key', OPTIONAL)[0] and second.acquire('key', OPTIONAL)[0], "Shared budget should admit"
+            assert asyncio.run(first.acquire_async('key', OPTIONAL))[0], "Shared budget should admit async calls"
+            admitted, reason = second.acquire('key', OPTIONAL)
+            assert not admitted and 'reserved' in reason, f"Other worker's calls should count toward the reserve ({reason})"
+            assert second.acquire('key', CRITICAL)[0], "Critical call should use the reserve"
+            admitted, reason = first.acquire('key', CRITICAL)
+            assert not admitted and 'exhausted' in reason, f"Workers together should stop at the key's rpd ({reason})"
+            assert first.stats()['keys'][first.key_id('key')]['daily_used'] == 4, "Stats should show the shared count"
+
+        assert RateLimiter(rpd=50, workers=4).rpd == 12, "Without a shared store each worker should get its share"
+
+        print("✓ Rate limiter sheds optional calls before critical ones")
+        return True
+    except Exception as e:
+        print(f"✗ Rate limiter test failed: {e}")
+        return False
+
+def test_streamed_feedback():
+    """Test incremental feedback fields and the commit-once streaming flow"""
+    try:
+        from working_app import app
+        from llm_json import StreamingJSONParser
+
+        content = json.dumps({"feedback": "Clear \"STAR\" answer.", "score": 8, "suggestions": "Add metrics.", "corrections": ""})
+        parser = StreamingJSONParser()
+        seen = []
+        partials = []
+        for char in content:
+            seen.extend(name for name, value in parser.feed(char))
+            partials.append(parser.partial_string('feedback'))
+        assert seen == ['feedback', 'score', 'suggestions', 'corrections'], f"Fields completed out of order: {seen}"
+        assert 'Clear "ST' in partials, "Feedback text was not available incrementally"
+        assert parser.result()['score'] == 8, "Score not parsed"
+
+        with patch.dict(os.environ, {'FAKE_AI': 'true'}):
+            client = app.test_client()
+            client.post('/configure', json={'job_role': 'Software Engineer', 'interview_type': 'Behavioral'})
+            body = client.post('/submit_answer_stream', json={'answer': 'I led the migration project.'}).get_data(as_text=True)
+            events = [json.loads(line[6:]) for line in body.splitlines() if line.startswith('data: ')]
+            token = events[-1]['commit_token']
+            first = client.post('/submit_answer_commit', json={'commit_token': token})
+            second = client.post('/submit_answer_commit', json={'commit_token': token})
+            assert first.get_json()['status'] == 'next_question', f"Commit failed: {first.get_json()}"
+            assert second.status_code == 409, "Streamed answer was recorded twice"
+            with client.session_transaction() as sess:
+                assert sess['turn_count'] == 1, "Session should hold exactly one answer"
+
+        print("✓ Streamed feedback parses fields incrementally and commits once")
+        return True
+    except Exception as e:
+        print(f"✗ Streamed feedback test failed: {e}")
+        return False
+
+def test_streamed_questions():
+    """Test that /configure_stream sends the first question before generation finishes"""
+    try:
+        import time
+        from fake_openrouter import FakeOpenRouter
+        import working_app
+
+        fake = FakeOpenRouter({'default': {'latency': '0', 'chunk_delay': 0.05, 'chunk_chars': 16}})
+        base_url = fake.start()
+        env = {'FAKE_AI': 'false', 'OPENROUTER_API_KEY': 'configure-stream-key', 'OPENROUTER_MODEL': 'fake/streamed-questions',
+               'LLM_CACHE_BACKEND': 'off'}
+        try:
+            with patch.dict(os.environ, env), patch.object(working_app, 'OPENROUTER_CHAT_URL', f"{base_url}/chat/completions"):
+                client = working_app.app.test_client()
+                started = time.time()
+                response = client.post('/configure_stream', json={'job_role': 'Backend Engineer', 'interview_type': 'Behavioral'},
+                                       buffered=False)
+                arrivals = []
+                for chunk in response.response:
+                    chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+                    for line in chunk.splitlines():
+                        if line.startswith('data: '):
+                            arrivals.append((time.time() - started, json.loads(line[6:])))
+                response.close()
+        finally:
+            fake.stop()
+
+        questions = [data['question'] for _, data in arrivals if 'question' in data]
+        first_question_at, done_at, done = arrivals[0][0], arrivals[-1][0], arrivals[-1][1]
+        assert len(questions) == 5 and done['questions'] == questions, f"Unexpected events: {arrivals}"
+        assert first_question_at < done_at / 3, f"First question at {first_question_at:.2f}s of {done_at:.2f}s"
+
+        committed = client.post('/configure_commit', json={'commit_token': done['commit_token']}).get_json()
+        assert committed['status'] == 'success' and committed['question'] == questions[0], f"Commit failed: {committed}"
+        again = client.post('/configure_commit', json={'commit_token': done['commit_token']})
+        assert again.status_code == 409, "Questions were committed twice"
+        assert client.get('/current_question').get_json()['question'] == questions[0], "Session not configured"
+
+        # A wrapped set cached by /configure is streamed as the repaired list
+        wrapped = [f"Cached question {n}?" for n in range(5)]
+
+        class WrappedCache:
+            def get(self, key):
+                return {'questions': wrapped}
+
+        with patch.dict(os.environ, env), patch.object(working_app, 'get_response_cache', return_value=WrappedCache()), \
+                patch.object(working_app, '_question_bank', return_value=None):
+            body = client.post('/configure_stream', json={'job_role': 'Backend Engineer', 'interview_type': 'Behavioral'}).get_data(as_text=True)
+        events = [json.loads(line[6:]) for line in body.splitlines() if line.startswith('data: ')]
+        assert [event['question'] for event in events[:-1]] == wrapped, f"Cached set streamed as {events}"
+        committed = client.post('/configure_commit', json={'commit_token': events[-1]['commit_token']}).get_json()
+        assert committed['question'] == wrapped[0] and committed['total_questions'] == 5, f"Commit failed: {committed}"
+
+        print(f"✓ Streamed questions: first after {first_question_at:.2f}s, all after {done_at:.2f}s")
+        return True
+    except Exception as e:
+        print(f"✗ Streamed questions test failed: {e}")
+        return False
+
+def test_async_answer_scoring():
+    """Test background answer scoring with the job queue and the feedback poll endpoint"""
+    try:
+        import threading
+        from job_queue import JobQueue, QueueFull, DONE
+        from transcript import Transcript
+        from working_app import app
+
+        queue = JobQueue(max_workers=1, max_pending=1, result_ttl=60)
+        release = threading.Event()
+        job = queue.submit('test', lambda: release.wait(5) and 'scored')
+        try:
+            queue.submit('test', lambda: None)
+            raise AssertionError("Queue accepted more than max_pending jobs")
+        except QueueFull:
+            pass
+        release.set()
+        assert job.wait(5) and job.status == DONE and job.result == 'scored', f"Job did not finish: {job.to_dict()}"
+
+        with patch.dict(os.environ, {'FAKE_AI': 'true'}):
+            client = app.test_client()
+            client.post('/configure', json={'job_role': 'Software Engineer', 'interview_type': 'Behavioral'})
+            first = client.post('/submit_answer', json={'answer': 'I led the migration project.', 'async': True}).get_json()
+            assert first['status'] == 'next_question' and first['job_id'], f"Async submit failed: {first}"
+            status = client.get(f"/feedback_status/{first['job_id']}?wait=5").get_json()
+            assert status['status'] == 'done' and status['question_index'] == 1, f"Feedback not delivered: {status}"
+            again = client.get(f"/feedback_status/{first['job_id']}").get_json()
+            assert again['status'] == 'done', "Collected feedback should stay available"
+            with client.session_transaction() as sess:
+                total = len(sess['questions'])
+                assert len(Transcript(sess).details()) == 1 and not sess.get('pending_feedback'), "Feedback not folded into session"
+            last = None
+            for i in range(1, total):
+                last = client.post('/submit_answer', json={'answer': f'Answer {i}', 'async': True}).get_json()
+            assert last['status'] == 'complete', f"Interview did not complete: {last}"
+            with client.session_transaction() as sess:
+                assert len(Transcript(sess).scores()) == total, "Summary built before every answer was scored"
+
+        print("✓ Async answer scoring queues, polls and completes the interview")
+        return True
+    except Exception as e:
+        print(f"✗ Async answer scoring test failed: {e}")
+        return False
+
+def test_cross_worker_scoring():
+    """Test a background evaluation is collected by a worker other than the one that ran it"""
+    try:
+        import tempfile
+        import threading
+        from job_queue import JobQueue, JobResultStore
+        import working_app
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'job_results.sqlite3')
+            # Two gunicorn workers: separate queues, one shared result store
+            worker_a = JobQueue(max_workers=1, result_ttl=60, result_store=JobResultStore(path, 60))
+            worker_b = JobQueue(max_workers=1, result_ttl=60, result_store=JobResultStore(path, 60))
+            release = threading.Event()
+            scored = {'feedback': 'Clear, with a concrete outcome.', 'score': 8, 'suggestions': 'Add a metric.'}
+
+            with patch.dict(os.environ, {'FAKE_AI': 'true'}), \
+                    patch.object(working_app, '_score_answer', lambda prompt: release.wait(10) and scored):
+                client = working_app.app.test_client()
+                client.post('/configure', json={'job_role': 'Software Engineer', 'interview_type': 'Behavioral'})
+                with patch.object(working_app, 'scoring_queue', worker_a):
+                    job_id = client.post('/submit_answer', json={'answer': 'I led the migration.', 'async': True}).get_json()['job_id']
+
+                with patch.object(working_app, 'scoring_queue', worker_b):
+                    status = client.get(f"/feedback_status/{job_id}").get_json()
+                    assert status['status'] == 'pending', f"Job on another worker not treated as pending: {status}"
+                    release.set()
+                    status = client.get(f"/feedback_status/{job_id}?wait=5").get_json()
+                    assert status['status'] == 'done' and status['score'] == 8, f"Result from the other worker not used: {status}"
+                    assert worker_b.remote_hits >= 1, "Result not read from the shared store"
+
+                with client.session_transaction() as sess:
+                    # An entry no worker knows, submitted long ago, is finally given up on
+                    sess['pending_feedback'] = [{'job_id': 'lost', 'index': 1, 'turn': 0, 'submitted': 0}]
+                    working_app._collect_scoring_jobs(sess, 0)
+                    assert not sess['pending_feedback'], "Lost job kept pending forever"
+
+        print("✓ Background evaluations are collected across workers through the shared result store")
+        return True
+    except Exception as e:
+        print(f"✗ Cross-worker scoring test failed: {e}")
+        return False
+
+def test_server_sessions():
+    """Test server-side sessions load fields lazily and write back only what changed"""
+    try:
+        import tempfile
+        from session_store import ServerSessionInterface, SQLiteSessionBackend, MemorySessionBackend
+        from working_app import app
+
+        with tempfile.TemporaryDirectory() as tmp:
+            backend = SQLiteSessionBackend(os.path.join(tmp, 'sessions.sqlite3'))
+            interface = ServerSessionInterface(backend, ttl=60)
+            sess = interface.load(app, None)
+            sess.update({'questions': ["Q1?", "Q2?"], 'user_answers': [], 'job_role': 'Engineer'})
+            assert interface.persist(app, sess) == 'set', "New session should set the cookie"
+            cookie = interface.cookie_value(app, sess)
+
+            reads = []
+            get_field = backend.get_field
+            backend.get_field = lambda sid, field: reads.append(field) or get_field(sid, field)
+            sess = interface.load(app, cookie)
+            sess['user_answers'].append('A long answer. ' * 500)
+            changed, deleted = sess.changes()
+            assert reads == ['user_answers'], f"Fields loaded eagerly: {reads}"
+            assert list(changed) == ['user_answers'] and not deleted, f"Unchanged fields written back: {list(changed)}"
+            assert interface.persist(app, sess) is None, "Existing session should keep its cookie"
+
+            sess = interface.load(app, cookie)
+            assert sess['job_role'] == 'Engineer' and len(sess['user_answers'][0]) == 7500, "Session not persisted"
+            assert interface.load(app, cookie[:-2] + 'xx').new, "Tampered cookie accepted"
+            sess.clear()
+            assert interface.persist(app, sess) == 'delete' and backend.size() == 0, "Cleared session not deleted"
+            backend._conn.close()
+
+        interface = ServerSessionInterface(MemorySessionBackend())
+        with patch.dict(os.environ, {'FAKE_AI': 'true'}), patch.object(app, 'session_interface', interface):
+            client = app.test_client()
+            client.post('/configure', json={'job_role': 'Software Engineer', 'interview_type': 'Technical'})
+            for i in range(5):
+                result = client.post('/submit_answer', json={'answer': f'Answer {i}: ' + 'detail ' * 400}).get_json()
+            cookie = client.get_cookie('session').value
+            summary = client.get('/summary')
+        assert result['status'] == 'complete', f"Interview did not complete: {result}"
+        assert summary.status_code == 200, f"Summary page failed: {summary.status_code}"
+        assert len(cookie) < 100, f"Cookie carries session data ({len(cookie)} bytes)"
+
+        print(f"✓ Server-side sessions: {len(cookie)}-byte cookie, lazy loads, only changed fields written")
+        return True
+    except Exception as e:
+        print(f"✗ Server-side session test failed: {e}")
+        return False
+
+def test_compact_transcript():
+    """Test that answers are appended as compact turns instead of rewriting parallel lists"""
+    try:
+        from transcript import Transcript, Turn
+        from session_store import ServerSessionInterface, MemorySessionBackend
+        from working_app import app, _interview_summary_prompt
+
+        assert not hasattr(Turn(0, 'answer'), '__dict__'), "Turn should use __slots__"
+        long_turn = Turn(1, 'I profiled the service and cached the hot path. ' * 100, 8, 'Good depth.', '')
+        stored = {}
+        Transcript(stored, compress_min=1024).append(long_turn)
+        Transcript(stored, compress_min=1024).append(Turn(2, 'Short answer.'))
+        row = stored['turn_0']
+        assert isinstance(row, str) and len(row) < 1024, "Long turn not stored compressed"
+        assert stored['turn_1'] == [2, 'Short answer.'], f"Short turn stored as {stored['turn_1']}"
+        restored = Transcript(stored)[0]
+        assert (restored.answer, restored.score, restored.job_id) == (long_turn.answer, 8, None), "Compressed turn did not round-trip"
+
+        backend = MemorySessionBackend()
+        writes = []
+        save = backend.save
+        # The rolling summary is bounded (KEEP entries per list) and tested on its own
+        backend.save = lambda sid, changed, deleted, ttl, replace=False: (
+            writes.append(len(json.dumps({k: v for k, v in changed.items() if k != 'rolling_summary'})))
+            or save(sid, changed, deleted, ttl, replace))
+        interface = ServerSessionInterface(backend)
+        with patch.dict(os.environ, {'FAKE_AI': 'true'}), patch.object(app, 'session_interface', interface):
+            client = app.test_client()
+            client.post('/configure', json={'job_role': 'Software Engineer', 'interview_type': 'Behavioral'})
+            answer_writes = []
+            for i in range(4):
+                del writes[:]
+                client.post('/submit_answer', json={'answer': f'Answer {i}: ' + 'detail ' * 100})
+                answer_writes.append(sum(writes))
+            with client.session_transaction() as sess:
+                transcript = Transcript(sess)
+                details = transcript.details()
+                assert [turn.question_id for turn in transcript] == [0, 1, 2, 3], "Turns not appended in order"
+                assert details[2]['question'] == sess['questions'][2], "Question not resolved from its id"
+                assert _interview_summary_prompt(sess).count('detail') == 400, "Summary prompt misses answers"
+            summary = client.get('/summary').get_data(as_text=True)
+        assert details[3]['answer'] in summary, "Summary page does not show the transcript"
+
+        # The old layout rewrote three lists, each repeating every answer so far
+        old_layout = len(json.dumps({
+            'user_answers': [d['answer'] for d in details],
+            'feedback_scores': [d['score'] for d in details],
+            'feedback_details': details
+        }))
+        assert max(answer_writes) - min(answer_writes) < 200, f"Write size grows with the interview: {answer_writes}"
+        assert answer_writes[-1] * 3 < old_layout, f"Turn write {answer_writes[-1]}B vs old lists {old_layout}B"
+
+        print(f"✓ Compact transcript: {answer_writes[-1]}B written for answer 4 (old lists: {old_layout}B)")
+        return True
+    except Exception as e:
+        print(f"✗ Compact transcript test failed: {e}")
+        return False
+
+def test_rolling_summary():
+    """Test the incremental summary finishes the interview without a summary call"""
+    try:
+        import time
+        from rolling_summary import RollingSummary
+        from fake_openrouter import FakeOpenRouter
+        import working_app
+
+        rolling = RollingSummary()
+        for score, strength, improvement in [(6, 'Structure', 'Metrics'), (9, 'Depth', 'Pacing'), (3, 'Honesty', 'Basics'),
+                                             (8, 'Clarity', 'metrics.'), (7, 'Examples', 'Focus')]:
+            rolling.add(score, strength, improvement, f'Resource {score}')
+        rolling = RollingSummary.from_dict(json.loads(json.dumps(rolling.to_dict())))
+        summary = rolling.summary()
+        assert summary['strengths'] == ['Depth', 'Clarity', 'Examples'], f"Strengths: {summary['strengths']}"
+        assert summary['improvements'] == ['Basics', 'Metrics', 'Focus'], f"Improvements: {summary['improvements']}"
+        assert summary['overall_score'] == 7 and RollingSummary().summary() is None, f"Summary: {summary}"
+
+        fake = FakeOpenRouter({'models': {'fake/rolling-summary': {'latency': '0.3'}}})
+        base_url = fake.start()
+        env = {'FAKE_AI': 'false', 'OPENROUTER_API_KEY': 'rolling-summary-key', 'OPENROUTER_MODEL': 'fake/rolling-summary',
+               'LLM_CACHE_BACKEND': 'off'}
+        runs = {}
+        try:
+            with patch.dict(os.environ, env), patch.object(working_app, 'OPENROUTER_CHAT_URL', f"{base_url}/chat/completions"):
+                for mode in ('full', 'incremental'):
+                    with patch.object(working_app, 'SUMMARY_MODE', mode):
+                        client = working_app.app.test_client()
+                        client.post('/configure', json={'job_role': 'Backend Engineer', 'interview_type': 'Behavioral'})
+                        before = fake.stats()
+                        for i in range(4):
+                            client.post('/submit_answer', json={'answer': f'Answer {i}: I owned the rollout. ' * 20})
+                        started = time.monotonic()
+                        last = client.post('/submit_answer', json={'answer': 'I owned the final rollout. ' * 20}).get_json()
+                        elapsed = time.monotonic() - started
+                        after = fake.stats()
+                    tokens = sum(after[name] - before[name] for name in ('prompt_tokens', 'completion_tokens'))
+                    runs[mode] = (last, elapsed, after['requests'] - before['requests'], tokens)
+        finally:
+            fake.stop()
+
+        (full, full_elapsed, full_calls, full_tokens), (incremental, elapsed, calls, tokens) = runs['full'], runs['incremental']
+        assert full['status'] == incremental['status'] == 'complete', f"Interviews did not complete: {runs}"
+        notes = {'Quantify outcomes', 'Reflect on lessons learned', 'Answer the question directly'}
+        assert set(incremental['summary']['improvements']) <= notes, f"Summary not built from the notes: {incremental['summary']}"
+        assert calls == full_calls - 1, f"Incremental mode made {calls} calls, full mode {full_calls}"
+        assert tokens < full_tokens, f"Incremental mode used {tokens} tokens, full mode {full_tokens}"
+        assert elapsed < full_elapsed - 0.15, f"Last answer took {elapsed:.2f}s vs {full_elapsed:.2f}s"
+
+        # FAKE_AI's canned feedback carries the notes too, so the summary is built from them
+        with patch.dict(os.environ, {'FAKE_AI': 'true'}), patch.object(working_app, 'SUMMARY_MODE', 'incremental'):
+            client = working_app.app.test_client()
+            client.post('/configure', json={'job_role': 'Backend Engineer', 'interview_type': 'Technical', 'domain': 'APIs'})
+            for i in range(4):
+                client.post('/submit_answer', json={'answer': f'Answer {i}: I would add an index and cache the hot path. ' * 5})
+            with client.session_transaction() as sess:
+                fake_rolling = RollingSummary.from_dict(sess.get('rolling_summary'))
+        assert fake_rolling.scored == 4 and fake_rolling.summary() is not None, f"FAKE_AI notes not folded in: {fake_rolling.to_dict()}"
+
+        print(f"✓ Rolling summary: last answer {elapsed:.2f}s vs {full_elapsed:.2f}s, {tokens} vs {full_tokens} tokens")
+        return True
+    except Exception as e:
+        print(f"✗ Rolling summary test failed: {e}")
+        return False
+
+def test_summary_artifact():
+    """Test /summary and /export_pdf share one summary per transcript version"""
+    try:
+        from fake_openrouter import FakeOpenRouter
+        import working_app
+
+        fake = FakeOpenRouter({'models': {'fake/summary-artifact': {'latency': '0'}}})
+        base_url = fake.start()
+        env = {'FAKE_AI': 'false', 'OPENROUTER_API_KEY': 'summary-artifact-key', 'OPENROUTER_MODEL': 'fake/summary-artifact',
+               'LLM_CACHE_BACKEND': 'off'}
+        calls = []
+        try:
+            with patch.dict(os.environ, env), patch.object(working_app, 'OPENROUTER_CHAT_URL', f"{base_url}/chat/completions"), \
+                    patch.object(working_app, 'SUMMARY_MODE', 'full'):
+                client = working_app.app.test_client()
+                client.post('/configure', json={'job_role': 'Backend Engineer', 'interview_type': 'Behavioral'})
+
+                def exports():
+                    before = fake.stats()['requests']
+                    pages = [client.get('/summary'), client.get('/summary'), client.get('/export_pdf'), client.get('/export_pdf')]
+                    assert all(page.status_code == 200 for page in pages), [page.status_code for page in pages]
+                    calls.append(fake.stats()['requests'] - before)
+
+                for answers in (2, 1, 2):
+                    for _ in range(answers):
+                        result = client.post('/submit_answer', json={'answer': 'I owned the rollout and measured the impact.'}).get_json()
+                    exports()
+        finally:
+            fake.stop()
+
+        assert result['status'] == 'complete', f"Interview did not complete: {result}"
+        # One generation per transcript version, none once the final summary exists
+        assert calls == [1, 1, 0], f"Summary LLM calls per round of page views and downloads: {calls}"
+
+        print("✓ Summary generated once per transcript version and shared by /summary and /export_pdf")
+        return True
+    except Exception as e:
+        print(f"✗ Summary artifact test failed: {e}")
+        return False
+
+def test_pdf_report_cache():
+    """Test rendered PDFs are cached by content hash and revalidated with ETags"""
+    try:
+        import tempfile
+        from pdf_report import ReportCache, ReportRenderer, render_report
+        import working_app
+
+        with tempfile.TemporaryDirectory() as tmp:
+            small = ReportCache(os.path.join(tmp, 'small'), max_bytes=10)
+            for key in ('a', 'b', 'c'):
+                small.put(key, b'%PDF-fake')
+            assert small.stats()['entries'] == 1 and small.evictions == 2, f"Cache not bounded: {small.stats()}"
+
+            cache = ReportCache(os.path.join(tmp, 'reports'))
+            renderer = ReportRenderer(workers=1)
+            with patch.dict(os.environ, {'FAKE_AI': 'true'}), patch.object(working_app, 'get_report_cache', lambda: cache), \
+                    patch.object(working_app, 'get_report_renderer', lambda: renderer):
+                client = working_app.app.test_client()
+                client.post('/configure', json={'job_role': 'Software Engineer', 'interview_type': 'Technical'})
+                client.post('/submit_answer', json={'answer': 'I profiled the service and cached the hot path.'})
+                first = client.get('/export_pdf')
+                second = client.get('/export_pdf')
+                revalidated = client.get('/export_pdf', headers={'If-None-Match': first.headers['ETag']})
+                with client.session_transaction() as sess:
+                    report = working_app._report_description(sess)
+
+        assert first.status_code == 200 and first.data.startswith(b'%PDF'), f"Export failed: {first.status_code}"
+        assert second.data == first.data and second.headers['ETag'] == first.headers['ETag'], "Repeat download differs"
+        assert revalidated.status_code == 304 and not revalidated.data, f"ETag not honoured: {revalidated.status_code}"
+        assert renderer.rendered == 1 and renderer.inline == 0, f"Not rendered once in the pool: {renderer.stats()}"
+        assert cache.hits == 1 and cache.misses == 1, f"Unexpected cache use: {cache.stats()}"
+        assert render_report(report)[:4] == b'%PDF', "Inline rendering failed"
+
+        print(f"✓ PDF reports rendered once in a worker process ({renderer.stats()['avg_render_ms']}ms), then cached and ETagged")
+        return True
+    except Exception as e:
+        print(f"✗ PDF report cache test failed: {e}")
+        return False
+
+def test_pdf_render_timeout():
+    """Test a slow render is a clean 503 whose late result is cached, and abandoned tmp files are swept"""
+    try:
+        import time
+        import tempfile
+        from pdf_report import ReportCache, ReportRenderer
+        import working_app
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ReportCache(os.path.join(tmp, 'reports'), max_bytes=10 * 1024 * 1024, tmp_max_age=60)
+            abandoned = os.path.join(cache.directory, 'dead.pdf.0.tmp')
+            with open(abandoned, 'wb') as f:
+                f.write(b'x' * 1000)
+            os.utime(abandoned, (time.time() - 120, time.time() - 120))
+
+            # Starting the pool alone takes longer than this
+            renderer = ReportRenderer(workers=1, timeout=0.001)
+            with patch.dict(os.environ, {'FAKE_AI': 'true'}), patch.object(working_app, 'get_report_cache', lambda: cache), \
+                    patch.object(working_app, 'get_report_renderer', lambda: renderer):
+                client = working_app.app.test_client()
+                client.post('/configure', json={'job_role': 'Software Engineer', 'interview_type': 'Technical'})
+                client.post('/submit_answer', json={'answer': 'I profiled the service and cached the hot path.'})
+                slow = client.get('/export_pdf')
+                assert slow.status_code == 503 and slow.headers.get('Retry-After'), f"Timeout not a clean 503: {slow.status_code}"
+                deadline = time.time() + 30
+                while not cache.stores and time.time() < deadline:
+                    time.sleep(0.05)
+                retry = client.get('/export_pdf')
+            assert retry.status_code == 200 and retry.data.startswith(b'%PDF') and cache.hits == 1, "Late render not cached"
+            assert renderer.timeouts == 1, f"Timeout not counted: {renderer.stats()}"
+            assert not os.path.exists(abandoned), "Abandoned tmp file not swept"
+            assert not [name for name in os.listdir(cache.directory) if name.endswith('.tmp')], "Render left a tmp file"
+
+        print("✓ Slow PDF renders return 503, finish into the cache, and abandoned tmp files are swept")
+        return True
+    except Exception as e:
+        print(f"✗ PDF render timeout test failed: {e}")
+        return False
+
+def test_pdf_full_transcript():
+    """Test the PDF report paginates the full transcript and is streamed from a file"""
+    try:
+        import re
+        import tempfile
+        from pdf_report import ReportRenderer, open_report, report_key
+        import working_app
+
+        long_word = 'x' * 400
+        report = {
+            'job_role': 'Software Engineer', 'interview_type': 'Technical', 'domain': 'Backend', 'date': '2026-01-01 10:00',
+            'summary': {'strengths': ['Structured'], 'improvements': ['Depth'], 'resources': ['Docs'], 'overall_score': 6},
+            'turns': [{'question': f'Question {i}?', 'answer': f'{long_word} answer {i} ' * 3, 'score': i % 10 + 1,
+                       'feedback': 'Good. ' * 60, 'corrections': None} for i in range(300)]
+        }
+        renderer = ReportRenderer(workers=0)
+        leftovers = set(os.listdir(tempfile.gettempdir()))
+        with open_report(report, report_key(report), cache=None, renderer=renderer) as f:
+            data = f.read()
+        pages = len(re.findall(rb'/Type /Page\b', data))
+        assert data.startswith(b'%PDF') and pages > 100, f"Transcript not paginated: {pages} pages"
+        assert set(os.listdir(tempfile.gettempdir())) <= leftovers, "Uncached render left a temp file behind"
+
+        with patch.dict(os.environ, {'FAKE_AI': 'true'}), patch.object(working_app, 'get_report_cache', lambda: None), \
+                patch.object(working_app, 'get_report_renderer', lambda: renderer):
+            client = working_app.app.test_client()
+            client.post('/configure', json={'job_role': 'Software Engineer', 'interview_type': 'Technical'})
+            client.post('/submit_answer', json={'answer': 'I profiled the service and cached the hot path.'})
+            response = client.get('/export_pdf')
+            assert response.status_code == 200 and response.is_streamed, "Report not streamed"
+            body = b''.join(response.response)
+            response.close()
+        assert body.startswith(b'%PDF') and body.rstrip().endswith(b'%%EOF'), "Streamed report is not a complete PDF"
+
+        print(f"✓ Full transcript of 300 answers laid out over {pages} pages ({len(data) // 1024}KB) and streamed")
+        return True
+    except Exception as e:
+        print(f"✗ PDF full transcript test failed: {e}")
+        return False
+
+def test_batch_reports():
+    """Test the batch CLI renders every stored interview with the /export_pdf layout"""
+    try:
+        import zipfile
+        import tempfile
+        from session_store import ServerSessionInterface, SQLiteSessionBackend
+        from pdf_report import describe_report, report_key
+        from batch_reports import load_interviews, render_batch, stored_summary
+        import working_app
+
+        with tempfile.TemporaryDirectory() as tmp:
+            backend = SQLiteSessionBackend(os.path.join(tmp, 'sessions.sqlite3'))
+            etags = {}
+            with patch.dict(os.environ, {'FAKE_AI': 'true'}), \
+                    patch.object(working_app.app, 'session_interface', ServerSessionInterface(backend)), \
+                    patch.object(working_app, 'get_report_cache', lambda: None):
+                for role, answers in (('Software Engineer', 2), ('Software Engineer', 1), ('Data Scientist', 1), ('Designer', 0)):
+                    client = working_app.app.test_client()
+                    client.post('/configure', json={'job_role': role, 'interview_type': 'Behavioral'})
+                    for _ in range(answers):
+                        client.post('/submit_answer', json={'answer': 'I measured first, then cached the slow query.'})
+                    if answers:
+                        with client.session_transaction() as sess:
+                            sid = sess.sid
+                        etags[sid] = client.get('/export_pdf').headers['ETag'].strip('"')
+
+            interviews = dict(load_interviews(backend))
+            assert set(interviews) == set(etags), "Unanswered interview exported, or an answered one missed"
+            for sid, sess in interviews.items():
+                assert report_key(describe_report(sess, stored_summary(sess))) == etags[sid], "Batch report differs from /export_pdf"
+
+            updates = []
+            stats = render_batch(load_interviews(backend), os.path.join(tmp, 'reports'), workers=2,
+                                 progress=lambda stats, elapsed: updates.append(stats['reports']))
+            files = os.listdir(os.path.join(tmp, 'reports'))
+            assert stats['reports'] == len(files) == 3 and not stats['failed'], f"Directory export failed: {stats}"
+            assert updates == [1, 2, 3], f"Progress not reported per report: {updates}"
+
+            zipped = render_batch(load_interviews(backend, role='software engineer'), os.path.join(tmp, 'cohort.zip'), workers=2)
+            with zipfile.ZipFile(os.path.join(tmp, 'cohort.zip')) as archive:
+                names = archive.namelist()
+                assert len(names) == 2 and all(archive.read(name).startswith(b'%PDF') for name in names), f"Zip export failed: {names}"
+            leftovers = [name for name in os.listdir(tmp) if not name.startswith('sessions.sqlite3')]
+            assert sorted(leftovers) == ['cohort.zip', 'reports'], f"Zip export left files behind: {leftovers}"
+            backend._conn.close()
+
+        print(f"✓ Batch export renders stored interviews like /export_pdf ({stats['reports_per_s']} reports/s, dir and zip)")
+        return True
+    except Exception as e:
+        print(f"✗ Batch reports test failed: {e}")
+        return False
+
+def test_history_store():
+    """Test /history pages through the caller's own interviews in a pooled, indexed store"""
+    try:
+        import tempfile
+        from concurrent.futures import ThreadPoolExecutor
+        from history_store import SQLiteHistoryStore
+        import working_app
+
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SQLiteHistoryStore(os.path.join(tmp, 'history.sqlite3'), pool_size=2)
+            for i in range(25):
+                # Pairs of rows share a date, so the id has to break ties
+                date = f'2026-01-{i // 2 + 1:02d} 10:00:00'
+                store.record('candidate-a', 'Data Scientist' if i % 5 == 0 else 'Software Engineer', 'Technical', 'Backend', i % 10, date=date)
+                store.record('candidate-b', '<img src=x onerror=alert(1)>', 'Technical', 'Backend', 5, date=date)
+            with store.pool.connection() as conn:
+                plan = ' '.join(str(row) for row in conn.execute(
+                    'EXPLAIN QUERY PLAN SELECT id FROM interview_history WHERE candidate_id = ? AND date < ? '
+                    'ORDER BY date DESC, id DESC LIMIT 11', ('candidate-a', '2026-02-01')))
+            assert 'idx_interview_history_candidate_date' in plan, f"Candidate/date index not used: {plan}"
+
+            with patch.object(working_app, 'get_history_store', lambda: store), patch.dict(os.environ, {'FAKE_AI': 'true'}):
+                stranger = working_app.app.test_client()
+                assert stranger.get('/history').get_json()['items'] == [], "History shown to a caller with no interviews"
+                client = working_app.app.test_client()
+                with client.session_transaction() as sess:
+                    sess['candidate_id'] = 'candidate-a'
+                seen, before = [], None
+                while True:
+                    page = client.get('/history', query_string={'limit': 10, **({'before': before} if before else {})}).get_json()
+                    seen.extend(item['id'] for item in page['items'])
+                    before = page['next_before']
+                    if not before:
+                        break
+                assert seen == list(range(49, 0, -2)), f"Pages skipped, repeated or leaked rows: {seen}"
+                filtered = client.get('/history', query_string={'role': 'Data Scientist', 'limit': 3}).get_json()
+                assert [item['id'] for item in filtered['items']] == [41, 31, 21] and filtered['next_before'], f"Filter failed: {filtered}"
+                assert client.get('/history', query_string={'before': 'yesterday'}).status_code == 400, "Bad cursor accepted"
+
+                with ThreadPoolExecutor(8) as pool:
+                    list(pool.map(lambda _: store.page('candidate-a', limit=5), range(40)))
+                assert store.pool.opened <= 2, f"Pool opened {store.pool.opened} connections"
+
+                client.post('/configure', json={'job_role': 'Platform Engineer', 'interview_type': 'Behavioral'})
+                for _ in range(10):
+                    if client.post('/submit_answer', json={'answer': 'I automated the rollback.'}).get_json().get('status') == 'complete':
+                        break
+                newest = client.get('/history', query_string={'limit': 1}).get_json()['items'][0]
+                assert newest['role'] == 'Platform Engineer' and newest['domain'] == 'N/A', f"Finished interview not recorded: {newest}"
+                assert store.page('candidate-b', limit=1)['items'][0]['role'].startswith('<img'), "Other candidate's history changed"
+
+                client.post('/clear_session')
+                cleared = client.get('/history', query_string={'limit': 1}).get_json()['items']
+                assert cleared and cleared[0]['id'] == newest['id'], "History lost after clearing the session"
+            store.close()
+
+        print(f"✓ History pages by keyset cursor over the date index ({store.stats()['avg_page_ms']}ms/page, {store.pool.opened} pooled connections)")
+        return True
+    except Exception as e:
+        print(f"✗ History store test failed: {e}")
+        return False
+
+def test_asgi_app():
+    """Test the asyncio serving path: concurrent upstream calls and Flask-compatible sessions"""
+    try:
+        import time
+        import asyncio
+        from starlette.testclient import TestClient
+        import asgi_app
+        import working_app
+
+        model = 'mistralai/mistral-7b-instruct:free'
+        questions = ["Question one?", "Question two?", "Question three?"]
+        server, base_url = _start_local_server(_chat_handler({model: (0.3, 200, json.dumps(questions))}))
+        env = {'FAKE_AI': 'false', 'OPENROUTER_API_KEY': 'asgi-test-key', 'OPENROUTER_MODEL': model, 'LLM_CACHE_BACKEND': 'off'}
+        try:
+            with patch.dict(os.environ, env), patch.object(working_app, 'OPENROUTER_CHAT_URL', f"{base_url}/api/v1/chat/completions"):
+                async def fan_out():
+                    return await asyncio.gather(*[asgi_app.get_ai_response(f"Generate questions {i}", expect_json=True) for i in range(10)])
+                started = time.time()
+                results = asyncio.run(fan_out())
+                elapsed = time.time() - started
+                assert all(result == questions for result in results), f"Unexpected results: {results[:2]}"
+                assert elapsed < 2, f"Upstream calls were not concurrent ({elapsed:.2f}s for 10 x 0.3s)"
+
+                on_loop = []
+
+                def banked_questions(sess, previous_questions):
+                    try:
+                        asyncio.get_running_loop()
+                        on_loop.append(True)
+                    except RuntimeError:
+                        on_loop.append(False)
+                    return None
+
+                with TestClient(asgi_app.app) as client, patch.object(working_app, '_banked_questions', side_effect=banked_questions):
+                    response = client.post('/configure', json={'job_role': 'Software Engineer', 'interview_type': 'Behavioral'})
+                    assert response.json()['question'] == questions[0], f"Configure failed: {response.json()}"
+                    cookie = client.cookies.get('session')
+                    tips = client.get('/interview_tips')
+                    assert tips.status_code == 200 and tips.json()['tips'] == questions, f"Tips failed: {tips.json()}"
+                assert on_loop == [False], f"Question bank queried on the event loop: {on_loop}"
+
+                # Session fields are read before the handler runs, never lazily on the loop
+                interface = working_app.app.session_interface
+                if hasattr(interface, 'backend'):
+                    del on_loop[:]
+                    reads = {name: getattr(interface.backend, name) for name in ('get_field', 'get_all')}
+
+                    def reading(name):
+                        def read(*args):
+                            banked_questions(None, None)
+                            return reads[name](*args)
+                        return read
+
+                    with TestClient(asgi_app.app) as client, patch.object(interface.backend, 'get_field', reading('get_field')), \
+                            patch.object(interface.backend, 'get_all', reading('get_all')):
+                        client.post('/configure', json={'job_role': 'Software Engineer', 'interview_type': 'Behavioral'})
+                        answered = client.post('/submit_answer', json={'answer': 'I would profile it first.'})
+                    assert answered.status_code == 200, f"Submit failed: {answered.status_code}"
+                    assert on_loop and not any(on_loop), f"{sum(on_loop)} of {len(on_loop)} session reads ran on the event loop"
+
+            flask_client = working_app.app.test_client()
+            flask_client.set_cookie('session', cookie)
+            current = flask_client.get('/current_question').get_json()
+            assert current['question'] == questions[0], f"Flask app could not read the ASGI session: {current}"
+        finally:
+            server.shutdown()
+
+        print("✓ ASGI app serves LLM routes concurrently with a shared session format")
+        return True
+    except Exception as e:
+        print(f"✗ ASGI app test failed: {e}")
+        return False
+
+def test_fake_openrouter():
+    """Test the real OpenRouter client path against the local fake provider"""
+    try:
+        from fake_openrouter import FakeOpenRouter, parse_latency
+        import working_app
+
+        assert 0.2 <= parse_latency('uniform:0.2:0.3')(__import__('random').Random(1)) <= 0.3, "Bad uniform latency"
+        profile = {
+            'seed': 3,
+            'models': {
+                'fake/down-model': {'status': 503},
+                'mistralai/mistral-7b-instruct:free': {'latency': '0.01'},
+                'fake/limited-model': {'rate_limit_rate': 1.0, 'retry_after': 30},
+                'fake/sloppy-model': {'malformed_rate': 1.0, 'content': '["A?", "B?", "C?"]'}
+            }
+        }
+        fake = FakeOpenRouter(profile)
+        base_url = fake.start()
+        env = {'FAKE_AI': 'false', 'OPENROUTER_API_KEY': 'fake-openrouter-test', 'LLM_CACHE_BACKEND': 'off'}
+        try:
+            with patch.dict(os.environ, dict(env, OPENROUTER_MODEL='fake/down-model')), \
+                    patch.object(working_app, 'OPENROUTER_CHAT_URL', f"{base_url}/chat/completions"):
+                questions = working_app.get_ai_response("Generate exactly 5 technical interview questions", expect_json=True)
+                assert isinstance(questions, list) and len(questions) == 5, f"Fallback chain failed: {questions}"
+                streamed = ''.join(working_app.stream_ai_response("Evaluate this answer and give a score"))
+                assert json.loads(streamed)['score'] in (4, 6, 8), f"Unexpected streamed content: {streamed}"
+
+            with patch.dict(os.environ, dict(env, OPENROUTER_MODEL='fake/sloppy-model')), \
+                    patch.object(working_app, 'OPENROUTER_CHAT_URL', f"{base_url}/chat/completions"):
+                parsed = working_app.get_ai_response("Generate 5 questions", expect_json=True)
+                assert parsed == ["A?", "B?", "C?"] or isinstance(parsed, dict), f"Unexpected parse result: {parsed}"
+
+
+            # Last: a 429 with Retry-After also pauses the whole key in the rate limiter
+            with patch.dict(os.environ, dict(env, OPENROUTER_MODEL='fake/limited-model')), \
+                    patch.object(working_app, 'OPENROUTER_CHAT_URL', f"{base_url}/chat/completions"):
+                working_app.get_ai_response("Say hello")
+                health = working_app.health_registry.snapshot(['fake/limited-model'])['fake/limited-model']
+                assert health['state'] == 'open' and health['rate_limited_until'], f"429 not honoured: {health}"
+
+            stats = fake.stats()
+            assert stats['by_status'].get('503') and stats['by_status'].get('429'), f"Failures not injected: {stats}"
+            assert stats['streams'] == 1 and stats['malformed'] == 1, f"Unexpected stats: {stats}"
+        finally:
+            fake.stop()
+
+        print("✓ Fake OpenRouter drives fallbacks, 429 handling and streaming")
+        return True
+    except Exception as e:
+        print(f"✗ Fake OpenRouter test failed: {e}")
+        return False
+
+def test_load_harness():
+    """Test the load-test harness replaying full interviews against the fake provider"""
+    try:
+        import asyncio
+        import threading
+        from werkzeug.serving import make_server
+        from fake_openrouter import FakeOpenRouter
+        from loadtest import run_load, build_report, ROUTES
+        import working_app
+
+        fake = FakeOpenRouter({'default': {'latency': '0.01'}})
+        fake_url = fake.start()
+        server = make_server('127.0.0.1', 0, working_app.app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        env = {'FAKE_AI': 'false', 'OPENROUTER_API_KEY': 'loadtest-test-key', 'LLM_CACHE_BACKEND': 'off'}
+        try:
+            with patch.dict(os.environ, env), patch.object(working_app, 'OPENROUTER_CHAT_URL', f"{fake_url}/chat/completions"):
+                before = fake.stats()['requests']
+                recorder = asyncio.run(run_load(f"http://127.0.0.1:{server.server_port}", concurrency=2, interviews=3, seed=1))
+                report = build_report(recorder, fake.stats()['requests'] - before)
+        finally:
+            server.shutdown()
+            fake.stop()
+
+        totals = report['totals']
+        assert totals['interviews_completed'] == 3 and totals['error_rate'] == 0, f"Load run failed: {report}"
+        assert set(report['routes']) == set(ROUTES), f"Missing routes: {list(report['routes'])}"
+        assert report['routes']['/submit_answer']['count'] >= 9, "Answers were not replayed"
+        assert totals['llm_calls_per_interview'] >= 3, f"LLM calls not counted: {totals}"
+        print("✓ Load-test harness reports per-route percentiles and LLM calls per interview")
+        return True
+    except Exception as e:
+        print(f"✗ Load-test harness test failed: {e}")
+        return False
+
 def main():
     """Run all tests"""
     print("Testing AI Interview Simulator...")
@@ -130,10 +1542,38 @@ def main():
     tests = [
         test_imports,
         test_json_parsing,
+        test_json_extraction,
+        test_response_schemas,
+        test_parallel_fallbacks,
+        test_question_bank,
+        test_tips_prefetch,
         test_ai_response_mock,
         test_flask_routes,
         test_template_files,
-        test_static_files
+        test_static_files,
+        test_provider_client_reuse,
+        test_hedged_model_chain,
+        test_model_health_registry,
+        test_auth_errors_and_probes,
+        test_response_cache,
+        test_single_flight,
+        test_rate_limiter_priorities,
+        test_streamed_feedback,
+        test_streamed_questions,
+        test_async_answer_scoring,
+        test_cross_worker_scoring,
+        test_server_sessions,
+        test_compact_transcript,
+        test_rolling_summary,
+        test_summary_artifact,
+        test_pdf_report_cache,
+        test_pdf_render_timeout,
+        test_pdf_full_transcript,
+        test_batch_reports,
+        test_history_store,
+        test_asgi_app,
+        test_fake_openrouter,
+        test_load_harness
     ]
     
     passed = 0
@@ -0,0 +1,146 @@
+"""
+Compact, append-only interview transcript kept in the session.
+
+The session used to carry three parallel lists (user_answers, feedback_scores
+and feedback_details), and every feedback_details entry repeated its question
+and answer. Each answer re-serialised all three lists in full. Here an
+interview is a sequence of turns, one per answered question:
+- a Turn is a __slots__ record that refers to its question by index into
+  session['questions'] instead of copying the text
+- each turn is stored in its own session field (turn_0, turn_1, ...) as a
+  positional list, so an answer writes one small field plus turn_count, and a
+  server-side session never re-reads or rewrites the earlier turns
+- a turn whose JSON is over TRANSCRIPT_COMPRESS_MIN bytes is stored as a zlib
+  blob (base64 text, so any session backend can hold it)
+- every write also advances transcript_hash, a hash chained over the turns
+  written so far. Anything derived from the transcript (the summary) records
+  the version it was made from and is reused until the version moves on
+
+A turn is appended when the answer arrives. With background scoring its score
+stays None until the evaluation is folded in. details() rebuilds the old
+feedback_details dicts for the summary page and the PDF.
+"""
+import os
+import json
+import zlib
+import base64
+import hashlib
+
+COUNT_FIELD = 'turn_count'
+VERSION_FIELD = 'transcript_hash'
+_BLOB_PREFIX = 'z:'
+
+
+def _field(index):
+    return f'turn_{index}'
+
+
+def _encode(row):
+    return json.dumps(row, separators=(',', ':')).encode('utf-8')
+
+
+def _compress(encoded):
+    return _BLOB_PREFIX + base64.b64encode(zlib.compress(encoded, 6)).decode('ascii')
+
+
+class Turn:
+    """One answered question and its evaluation"""
+
+    __slots__ = ('question_id', 'answer', 'score', 'feedback', 'corrections', 'job_id')
+
+    def __init__(self, question_id, answer, score=None, feedback=None, corrections=None, job_id=None):
+        self.question_id = question_id
+        self.answer = answer
+        self.score = score
+        self.feedback = feedback
+        self.corrections = corrections
+        self.job_id = job_id
+
+    @property
+    def scored(self):
+        return self.score is not None
+
+    def to_row(self):
+        """Positional list, trailing Nones dropped (Transcript.update decides whether to compress it)"""
+        row = [self.question_id, self.answer, self.score, self.feedback, self.corrections, self.job_id]
+        while row[-1] is None:
+            row.pop()
+        return row
+
+    @classmethod
+    def from_row(cls, row):
+        """Turn from a stored field: a to_row list or its compressed blob"""
+        if isinstance(row, str) and row.startswith(_BLOB_PREFIX):
+            row = json.loads(zlib.decompress(base64.b64decode(row[len(_BLOB_PREFIX):])))
+        return cls(*row)
+
+
+class Transcript:
+    """The turns stored in a session, read lazily and appended in place"""
+
+    def __init__(self, sess, compress_min=None):
+        self._sess = sess
+        self._turns = {}
+        self.compress_min = compress_min if compress_min is not None else int(os.getenv('TRANSCRIPT_COMPRESS_MIN', '1024'))
+
+    def __len__(self):
+        return self._sess.get(COUNT_FIELD, 0)
+
+    @property
+    def version(self):
+        """Changes whenever a turn is appended or rewritten; '' for an empty transcript"""
+        return self._sess.get(VERSION_FIELD, '')
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self):
+            raise IndexError(f"No turn {index}")
+        if index not in self._turns:
+            self._turns[index] = Turn.from_row(self._sess[_field(index)])
+        return self._turns[index]
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def append(self, turn):
+        """Store turn after the last one; returns its index"""
+        index = len(self)
+        self.update(index, turn)
+        self._sess[COUNT_FIELD] = index + 1
+        return index
+
+    def update(self, index, turn):
+        """Write back a turn that was changed (e.g. once it has been scored)"""
+        row = turn.to_row()
+        encoded = _encode(row)
+        self._sess[_field(index)] = _compress(encoded) if len(encoded) > self.compress_min else row
+        self._sess[VERSION_FIELD] = hashlib.sha256(f'{self.version}|{index}|'.encode('ascii') + encoded).hexdigest()[:20]
+        self._turns[index] = turn
+
+    def question(self, turn):
+        questions = self._sess.get('questions') or []
+        return questions[turn.question_id] if 0 <= turn.question_id < len(questions) else ''
+
+    def answers(self):
+        return [turn.answer for turn in self]
+
+    def scores(self):
+        return [turn.score for turn in self if turn.scored]
+
+    def details(self):
+        """The scored turns as question/answer/feedback/score/corrections dicts"""
+        details = []
+        for turn in self:
+            if not turn.scored:
+                continue
+            detail = {
+                'question': self.question(turn),
+                'answer': turn.answer,
+                'feedback': turn.feedback,
+                'score': turn.score,
+                'corrections': turn.corrections
+            }
+            if turn.job_id:
+                detail['job_id'] = turn.job_id
+            details.append(detail)
+        return details
@@ -1,16 +1,31 @@
-from flask import Flask, render_template, request, jsonify, session, send_file, send_from_directory, redirect
+from flask import Flask, render_template, request, jsonify, session, send_file, send_from_directory, redirect, Response
+from itsdangerous import URLSafeTimedSerializer, BadSignature
 from flask_cors import CORS
 import json
 import os
 from datetime import datetime
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from io import BytesIO
 import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError as FutureTimeout
 from dotenv import load_dotenv
 import logging
-import mysql.connector
 import requests
+from provider_client import get_provider_client
+from model_health import health_registry, AUTH_ERRORS
+from llm_cache import get_response_cache, cache_key, MISS
+from single_flight import get_single_flight
+from rate_limiter import rate_limiter, CRITICAL, NORMAL, OPTIONAL
+from job_queue import scoring_queue, QueueFull, DONE
+from llm_json import parse_llm_json, StreamingJSONParser
+from llm_schemas import validate_questions, validate_feedback, validate_summary, validate_tips, schema_stats, AnswerFeedback
+from question_bank import get_question_bank
+from prefetch import prefetcher, NOT_PREFETCHED
+from session_store import build_session_interface_from_env
+from transcript import Transcript, Turn
+from rolling_summary import RollingSummary
+from pdf_report import describe_report, report_key, open_report, RenderTimeout, get_report_cache, get_report_renderer
+from history_store import get_history_store
 
 # Load environment variables
 if os.path.exists('env.txt'):
@@ -22,334 +37,540 @@ app = Flask(__name__, static_folder='static', template_folder='templates')
 app.secret_key = os.getenv('SECRET_KEY', 'dev-secret-key')
 CORS(app, origins=["http://localhost:3000", "http://127.0.0.1:3000", "http://localhost:5000"])
 
+# Interview state lives server-side (SESSION_BACKEND); the cookie only carries a signed session id
+_session_interface = build_session_interface_from_env()
+if _session_interface is not None:
+    app.session_interface = _session_interface
+
 # Add logging
 logging.basicConfig(level=logging.DEBUG)
 
+# Point OPENROUTER_BASE_URL at fake_openrouter.py to run the real client path offline
+OPENROUTER_BASE_URL = os.getenv('OPENROUTER_BASE_URL', "https://openrouter.ai/api/v1").rstrip('/')
+OPENROUTER_CHAT_URL = f"{OPENROUTER_BASE_URL}/chat/completions"
+AI_TEMPERATURE = 0.7
+
+# Cache lifetimes (seconds) for prompts that only depend on role/type/domain
+QUESTIONS_CACHE_TTL = int(os.getenv('QUESTIONS_CACHE_TTL', '3600'))
+TIPS_CACHE_TTL = int(os.getenv('TIPS_CACHE_TTL', '86400'))
+SUMMARY_CACHE_TTL = int(os.getenv('SUMMARY_CACHE_TTL', '86400'))
+
+# 'incremental': each evaluation also returns summary notes that are folded into
+# a running summary, so finishing needs no extra call. 'full': one summary call
+# over the whole transcript after the last answer
+SUMMARY_MODE = os.getenv('SUMMARY_MODE', 'incremental').lower()
+
+# /history page size when the request gives none, and the most one request may ask for
+HISTORY_PAGE_SIZE = int(os.getenv('HISTORY_PAGE_SIZE', '10'))
+HISTORY_PAGE_MAX = int(os.getenv('HISTORY_PAGE_MAX', '50'))
+
+# Wall-clock budget (seconds) for generating questions / tips, fallback prompts
+# included, and how many fallback prompts may be in flight at once
+QUESTIONS_DEADLINE = float(os.getenv('QUESTIONS_DEADLINE', '45'))
+TIPS_DEADLINE = float(os.getenv('TIPS_DEADLINE', '20'))
+FALLBACK_FANOUT = max(int(os.getenv('FALLBACK_FANOUT', '3')), 1)
+
+# How the question, tips and summary prompts are sent (the main prompt, then the
+# fallback race), so the Flask and ASGI routes make the same calls
+QUESTIONS_REQUEST = {'expect_json': True, 'max_tokens': 800, 'cache_ttl': QUESTIONS_CACHE_TTL, 'priority': NORMAL,
+                     'validate': validate_questions}
+QUESTIONS_FALLBACK = {'max_tokens': 600, 'cache_ttl': QUESTIONS_CACHE_TTL, 'priority': NORMAL}
+TIPS_REQUEST = {'expect_json': True, 'max_tokens': 400, 'cache_ttl': TIPS_CACHE_TTL, 'priority': OPTIONAL,
+                'validate': validate_tips}
+TIPS_FALLBACK = {'max_tokens': 300, 'cache_ttl': TIPS_CACHE_TTL, 'priority': OPTIONAL}
+SUMMARY_REQUEST = {'expect_json': True, 'max_tokens': 400, 'cache_ttl': SUMMARY_CACHE_TTL, 'priority': OPTIONAL,
+                   'validate': validate_summary}
+
+QUESTIONS_FAILED = 'Failed to generate questions. Please try again.'
+
+def _openrouter_headers(api_key):
+    return {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        "HTTP-Referer": "http://localhost:5000",
+        "X-Title": "LLM Interview Sim"
+    }
+
 def _parse_json_like(content, prompt=""):
-    """Enhanced JSON parsing for AI responses - more aggressive parsing"""
-    import re
-    
-    if not isinstance(content, str):
-        return content
-    
-    # Clean up the content - remove extra whitespace and newlines
-    content = content.strip()
-    app.logger.debug(f"Parsing content: {content[:300]}...")
-    
-    # Try standard JSON parsing first
+    """Parse an AI response: the first JSON value, else question/feedback heuristics (see llm_json)"""
+    return parse_llm_json(content, prompt)
+
+def _models_to_try():
+    """List of models to try in order (working model first), without duplicates"""
+    return list(dict.fromkeys([
+        os.getenv('OPENROUTER_MODEL', 'google/gemma-7b-it:free'),
+        'mistralai/mistral-7b-instruct:free',  # This one works!
+        'google/gemma-7b-it:free',
+        'gryphe/mythomax-l2-13b:free'
+    ]))
+
+def _hedge_delay():
+    """Seconds before hedging to the next model; None keeps the sequential fallback"""
+    value = os.getenv('OPENROUTER_HEDGE_DELAY')
+    if value is None or value.strip() == '':
+        return None
     try:
-        result = json.loads(content)
-        app.logger.debug("Standard JSON parsing successful")
-        return result
-    except json.JSONDecodeError:
-        pass
+        return max(float(value), 0.0)
+    except ValueError:
+        app.logger.warning(f"Invalid OPENROUTER_HEDGE_DELAY: {value}")
+        return None
+
+_hedge_executor = None
+_hedge_executor_lock = threading.Lock()
+
+def _get_hedge_executor():
+    global _hedge_executor
+    with _hedge_executor_lock:
+        if _hedge_executor is None:
+            workers = int(os.getenv('OPENROUTER_HEDGE_WORKERS', '8'))
+            _hedge_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ai-hedge')
+        return _hedge_executor
+
+# Separate from the hedge pool: a fallback prompt's model chain may hedge
+# itself, and must never wait for a worker its caller is holding
+_fallback_executor = None
+_fallback_executor_lock = threading.Lock()
+
+def _get_fallback_executor():
+    global _fallback_executor
+    with _fallback_executor_lock:
+        if _fallback_executor is None:
+            workers = int(os.getenv('OPENROUTER_FALLBACK_WORKERS', '16'))
+            _fallback_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ai-fallback')
+        return _fallback_executor
+
+def _is_abandoned(abandoned):
+    return abandoned is not None and abandoned.is_set()
+
+def _chat_payload(model, prompt, max_tokens, stream=False):
+    payload = {
+        "model": model,
+        "messages": [{"role": "user", "content": prompt}],
+        "max_tokens": max_tokens,
+        "temperature": AI_TEMPERATURE
+    }
+    if stream:
+        payload["stream"] = True
+    return payload
+
+def _try_model(url, headers, model, prompt, max_tokens, cancelled=None, priority=NORMAL):
+    """Single chat completion attempt.
+
+    Returns (content, None) on success or (None, (status_code, error_text)) on failure.
+    When a cancel event is given the body is only read if no other model has won yet.
+    The attempt is only sent if the rate limiter admits it at the given priority.
+    """
+    payload = _chat_payload(model, prompt, max_tokens)
     
-    # Remove markdown code blocks if present
-    if content.startswith('```') and content.endswith('```'):
-        content = re.sub(r'^```(?:json)?\s*', '', content, flags=re.IGNORECASE)
-        content = re.sub(r'\s*```$', '', content)
-        content = content.strip()
+    limiter_key = headers.get("Authorization")
+    admitted, reason = rate_limiter.acquire(limiter_key, priority)
+    if not admitted:
+        app.logger.warning(f"Not sending {priority} request to {model}: {reason}")
+        health_registry.release_probe(model)
+        return None, ('rate_limited', reason)
     
-    # Try JSON parsing again after cleaning
+    app.logger.debug(f"Trying OpenRouter with model: {model}")
+    started = time.monotonic()
     try:
-        result = json.loads(content)
-        app.logger.debug("JSON parsing successful after cleaning")
-        return result
-    except json.JSONDecodeError:
-        pass
+        response = get_provider_client().post(url, headers=headers, json=payload, stream=cancelled is not None)
+    except requests.exceptions.RequestException as e:
+        health_registry.record_failure(model, 'error', str(e), latency=time.monotonic() - started)
+        raise
+    try:
+        rate_limiter.update_from_response(limiter_key, response.status_code, response.headers)
+        if cancelled is not None and cancelled.is_set():
+            app.logger.debug(f"Discarding response from {model}, another model already answered")
+            health_registry.release_probe(model)
+            return None, ('cancelled', 'Another model answered first')
+        
+        return _completion_content(model, response, started)
+    finally:
+        response.close()
+
+def _completion_content(model, response, started):
+    """Extract the answer from a chat completion response and record the model's health.
+
+    Works with both requests and httpx responses. Returns (content, None) or
+    (None, (status_code, error_text)).
+    """
+    if response.status_code != 200:
+        app.logger.warning(f"Model {model} failed: {response.status_code} - {response.text}")
+        health_registry.record_failure(model, response.status_code, response.text,
+                                       latency=time.monotonic() - started, headers=response.headers)
+        return None, (response.status_code, response.text)
     
-    # Try to find JSON objects with more flexible matching
-    json_patterns = [
-        r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}',  # Nested objects
-        r'\{.*?\}',  # Simple objects
-    ]
+    data = response.json()
+    try:
+        content = data["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError):
+        app.logger.error(f"Unexpected OpenRouter response format: {data}")
+        health_registry.record_failure(model, response.status_code, "Unexpected response format",
+                                       latency=time.monotonic() - started)
+        return None, (response.status_code, "Unexpected response format from AI")
     
-    for pattern in json_patterns:
-        json_match = re.search(pattern, content, re.DOTALL)
-        if json_match:
-            try:
-                result = json.loads(json_match.group())
-                app.logger.debug("JSON object extraction successful")
-                return result
-            except json.JSONDecodeError:
-                continue
+    health_registry.record_success(model, time.monotonic() - started)
+    app.logger.debug(f"Success with model: {model}")
+    return content, None
+
+def _ends_chain(failure):
+    """Whether a model attempt's outcome settles the chain: an answer, or a refusal no other model would avoid"""
+    return failure is None or failure[0] == 'rate_limited' or failure[0] in AUTH_ERRORS
+
+def _sequential_model_chain(url, headers, models, prompt, max_tokens, priority=NORMAL, abandoned=None):
+    """Try each model in turn until one answers, the rate limiter or the API
+    key is refused, or the caller sets the abandoned event (checked before
+    each further model)"""
+    failure = None
+    current = 0
+    try:
+        for index, model in enumerate(models):
+            if index and _is_abandoned(abandoned):
+                return None, ('abandoned', 'No longer needed by the caller')
+            current = index
+            content, failure = _try_model(url, headers, model, prompt, max_tokens, priority=priority)
+            if _ends_chain(failure):
+                return content, failure
+        return None, failure
+    finally:
+        # Models from the last one tried on give back their probes: that one has
+        # reported back unless its attempt raised, the rest were never tried
+        for unused in models[current:]:
+            health_registry.release_probe(unused)
+
+def _hedged_model_chain(url, headers, models, prompt, max_tokens, hedge_delay, priority=NORMAL, abandoned=None):
+    """Race the fallback chain: the next model starts after hedge_delay seconds
+    or as soon as a running attempt fails, and the first valid answer wins.
+
+    Attempts that have not started yet are cancelled; ones already in flight
+    have their responses closed unread once a winner is known. No further
+    model is started once the caller sets the abandoned event.
+    """
+    executor = _get_hedge_executor()
+    cancelled = threading.Event()
+    remaining = list(models)
+    pending = {}
+    failure = None
     
-    # Try to find JSON arrays with more flexible matching
-    array_patterns = [
-        r'\[[^\[\]]*(?:\[[^\[\]]*\][^\[\]]*)*\]',  # Nested arrays
-        r'\[.*?\]',  # Simple arrays
-    ]
+    def launch_next():
+        model = remaining.pop(0)
+        future = executor.submit(_try_model, url, headers, model, prompt, max_tokens, cancelled, priority)
+        pending[future] = model
     
-    for pattern in array_patterns:
-        array_match = re.search(pattern, content, re.DOTALL)
-        if array_match:
-            try:
-                result = json.loads(array_match.group())
-                app.logger.debug("JSON array extraction successful")
-                return result
-            except json.JSONDecodeError:
+    launch_next()
+    try:
+        while pending:
+            done, _ = wait(pending, timeout=hedge_delay if remaining else None, return_when=FIRST_COMPLETED)
+            if not done:
+                if _is_abandoned(abandoned):
+                    for model in remaining:
+                        health_registry.release_probe(model)
+                    remaining.clear()
+                    continue
+                app.logger.debug(f"No answer after {hedge_delay}s, hedging with {remaining[0]}")
+                launch_next()
                 continue
-    
-    # For question generation, try to extract questions from various formats
-    if any(keyword in prompt.lower() for keyword in ['generate', 'questions', 'interview']):
-        app.logger.info(f"Attempting to extract questions from content: {content[:200]}...")
-        
-        # Try to extract questions from malformed JSON-like format
-        questions = re.findall(r'"([^"]+)"', content)
-        if len(questions) >= 3:  # At least 3 questions found
-            app.logger.info(f"Extracted {len(questions)} questions from quoted strings")
-            return questions
-        
-        # Try to extract questions from numbered format
-        numbered_questions = re.findall(r'\d+\.\s*([^\n]+)', content)
-        if len(numbered_questions) >= 3:
-            app.logger.info(f"Extracted {len(numbered_questions)} questions from numbered format")
-            return numbered_questions
-        
-        # Try to extract questions from bullet format
-        bullet_questions = re.findall(r'[-*]\s*([^\n]+)', content)
-        if len(bullet_questions) >= 3:
-            app.logger.info(f"Extracted {len(bullet_questions)} questions from bullet format")
-            return bullet_questions
-        
-        # Try to extract questions from line-by-line format
-        lines = [line.strip() for line in content.split('\n') if line.strip()]
-        valid_questions = []
-        for line in lines:
-            # Skip lines that look like metadata or formatting
-            if (not line.startswith('[') and not line.startswith('{') and 
-                not line.startswith('```') and not line.startswith('Generate') and
-                len(line) > 20 and '?' in line):
-                valid_questions.append(line)
-        
-        if len(valid_questions) >= 3:
-            app.logger.info(f"Extracted {len(valid_questions)} questions from line format")
-            return valid_questions
-    
-    # For feedback/summary generation, try to extract structured data
-    if any(keyword in prompt.lower() for keyword in ['feedback', 'summary', 'evaluate', 'score']):
-        app.logger.info(f"Attempting to extract structured data from content: {content[:200]}...")
-        
-        # Try to extract key-value pairs
-        feedback_data = {}
-        
-        # Look for score
-        score_match = re.search(r'(?:score|rating)[\s:]*(\d+)', content, re.IGNORECASE)
-        if score_match:
-            feedback_data['score'] = int(score_match.group(1))
-        
-        # Look for feedback text
-        feedback_match = re.search(r'(?:feedback|evaluation|assessment)[\s:]*([^.]+)', content, re.IGNORECASE)
-        if feedback_match:
-            feedback_data['feedback'] = feedback_match.group(1).strip()
-        
-        # Look for suggestions
-        suggestions_match = re.search(r'(?:suggestion|improvement|recommendation)[\s:]*([^.]+)', content, re.IGNORECASE)
-        if suggestions_match:
-            feedback_data['suggestions'] = suggestions_match.group(1).strip()
-        
-        if feedback_data:
-            app.logger.info(f"Extracted structured feedback data: {feedback_data}")
-            return feedback_data
-    
-    # Try to extract any quoted strings as final fallback
-    quoted_strings = re.findall(r'"([^"]+)"', content)
-    if len(quoted_strings) >= 2:
-        app.logger.info(f"Extracted {len(quoted_strings)} strings from content")
-        return quoted_strings
-    
-    app.logger.warning(f"Could not parse content: {content[:100]}...")
-    return None
+            
+            for future in done:
+                model = pending.pop(future)
+                try:
+                    content, attempt_failure = future.result()
+                except requests.exceptions.RequestException as e:
+                    app.logger.warning(f"Model {model} request error: {str(e)}")
+                    content, attempt_failure = None, ('error', str(e))
+                
+                if attempt_failure is None:
+                    return content, None
+                failure = attempt_failure
+                if _ends_chain(attempt_failure):
+                    # Another model would be refused too; let running attempts finish but start none
+                    for model in remaining:
+                        health_registry.release_probe(model)
+                    remaining.clear()
+                elif remaining and not _is_abandoned(abandoned):
+                    launch_next()
+        return None, failure
+    finally:
+        cancelled.set()
+        for future, model in pending.items():
+            if future.cancel():
+                health_registry.release_probe(model)
+        for model in remaining:
+            health_registry.release_probe(model)
 
-def get_ai_response(prompt, max_tokens=500, expect_json=False):
-    """AI response function with OpenRouter support"""
-    fake_ai = os.getenv('FAKE_AI', 'false').lower() in ['1', 'true', 'yes']
-    
-    if fake_ai:
-        app.logger.debug("Using FAKE_AI mode")
-        if expect_json:
-            if ('Generate 5' in prompt and 'questions' in prompt) or ('Generate exactly 5' in prompt):
-                # Generate role-specific questions based on the prompt
-                if 'Frontend Developer' in prompt or 'React' in prompt:
-                    return [
-                        "Explain the difference between React hooks and class components, and when you would use each.",
-                        "How would you optimize a React application that's experiencing performance issues?",
-                        "Describe your approach to state management in a large React application.",
-                        "How do you handle cross-browser compatibility issues in modern web development?",
-                        "Walk me through how you would implement a responsive design system."
-                    ]
-                elif 'Full Stack' in prompt or 'Node.js' in prompt:
-                    return [
-                        "Explain the difference between REST and GraphQL APIs, and when you'd choose each.",
-                        "How would you design a scalable microservices architecture?",
-                        "Describe your approach to database optimization and query performance.",
-                        "How do you handle authentication and authorization in a web application?",
-                        "Walk me through your process for deploying and monitoring a production application."
-                    ]
-                elif 'Data Scientist' in prompt or 'Machine Learning' in prompt:
-                    return [
-                        "Explain the bias-variance tradeoff and how it affects model performance.",
-                        "How would you handle missing data in a dataset before training a model?",
-                        "Describe your approach to feature engineering and selection.",
-                        "How do you evaluate model performance beyond just accuracy?",
-                        "Walk me through your process for deploying a machine learning model to production."
-                    ]
-                else:
-                    return [
-                        "Tell me about a challenging project you worked on and your role.",
-                        "How do you approach debugging complex, intermittent issues?",
-                        "Describe a time you collaborated across teams to deliver a feature.",
-                        "Explain a technical concept to a non-technical stakeholder.",
-                        "What would you improve about your last project and why?"
-                    ]
-            if 'Provide feedback' in prompt or 'Evaluate this answer' in prompt:
-                # Intelligent mock feedback based on answer content
-                if 'wrong' in prompt.lower() or 'incorrect' in prompt.lower() or 'error' in prompt.lower():
-                    return {
-                        "feedback": "This answer contains several technical misconceptions that need correction. The fundamental understanding appears to be incorrect.",
-                        "score": 2,
-                        "suggestions": "Study the basics of this topic and understand the correct concepts before attempting to answer.",
-                        "corrections": "The main issues are: [Technical errors would be identified here]. The correct approach is: [Correct information would be provided here]."
-                    }
-                elif 'good' in prompt.lower() or 'excellent' in prompt.lower():
-                    return {
-                        "feedback": "Excellent technical depth and clear examples. This demonstrates strong understanding of the concepts.",
-                        "score": 9,
-                        "suggestions": "Continue building on this solid foundation with more advanced topics.",
-                        "corrections": ""
-                    }
-                else:
-                    # Generate varied, realistic feedback based on answer length and content
-                    import random
-                    feedbacks = [
-                        {
-                            "feedback": "Good technical understanding with clear communication. You demonstrated solid knowledge of the core concepts.",
-                            "score": 8,
-                            "suggestions": "Consider adding specific examples from your experience to make your answer more compelling.",
-                            "corrections": ""
-                        },
-                        {
-                            "feedback": "Strong answer with good structure. You covered the main points well and showed practical understanding.",
-                            "score": 7,
-                            "suggestions": "Try to include metrics or quantifiable results to strengthen your examples.",
-                            "corrections": ""
-                        },
-                        {
-                            "feedback": "Well-articulated response that shows good problem-solving approach. Your explanation was clear and logical.",
-                            "score": 8,
-                            "suggestions": "Consider discussing alternative approaches or edge cases to demonstrate deeper thinking.",
-                            "corrections": ""
-                        },
-                        {
-                            "feedback": "Solid technical knowledge demonstrated. You provided a comprehensive answer with good examples.",
-                            "score": 7,
-                            "suggestions": "Focus on explaining the 'why' behind your decisions to show strategic thinking.",
-                            "corrections": ""
-                        }
-                    ]
-                    return random.choice(feedbacks)
-            if 'Generate a summary' in prompt:
+def _fake_ai_enabled():
+    return os.getenv('FAKE_AI', 'false').lower() in ['1', 'true', 'yes']
+
+def _fake_ai_response(prompt, expect_json):
+    """Canned answers used when FAKE_AI is set"""
+    if expect_json:
+        if ('Generate 5' in prompt and 'questions' in prompt) or ('Generate exactly 5' in prompt):
+            # Generate role-specific questions based on the prompt
+            if 'Frontend Developer' in prompt or 'React' in prompt:
+                return [
+                    "Explain the difference between React hooks and class components, and when you would use each.",
+                    "How would you optimize a React application that's experiencing performance issues?",
+                    "Describe your approach to state management in a large React application.",
+                    "How do you handle cross-browser compatibility issues in modern web development?",
+                    "Walk me through how you would implement a responsive design system."
+                ]
+            elif 'Full Stack' in prompt or 'Node.js' in prompt:
+                return [
+                    "Explain the difference between REST and GraphQL APIs, and when you'd choose each.",
+                    "How would you design a scalable microservices architecture?",
+                    "Describe your approach to database optimization and query performance.",
+                    "How do you handle authentication and authorization in a web application?",
+                    "Walk me through your process for deploying and monitoring a production application."
+                ]
+            elif 'Data Scientist' in prompt or 'Machine Learning' in prompt:
+                return [
+                    "Explain the bias-variance tradeoff and how it affects model performance.",
+                    "How would you handle missing data in a dataset before training a model?",
+                    "Describe your approach to feature engineering and selection.",
+                    "How do you evaluate model performance beyond just accuracy?",
+                    "Walk me through your process for deploying a machine learning model to production."
+                ]
+            else:
+                return [
+                    "Tell me about a challenging project you worked on and your role.",
+                    "How do you approach debugging complex, intermittent issues?",
+                    "Describe a time you collaborated across teams to deliver a feature.",
+                    "Explain a technical concept to a non-technical stakeholder.",
+                    "What would you improve about your last project and why?"
+                ]
+        if 'evaluating a' in prompt or 'Provide feedback' in prompt or 'Evaluate this answer' in prompt:
+            # Intelligent mock feedback based on answer content; the scoring
+            # prompt's own criteria mention "wrong" and "good", so only the answer counts
+            answer = prompt.split('\nAnswer:', 1)[1].split('\n\n', 1)[0] if '\nAnswer:' in prompt else prompt
+            if 'wrong' in answer.lower() or 'incorrect' in answer.lower() or 'error' in answer.lower():
+                return {
+                    "feedback": "This answer contains several technical misconceptions that need correction. The fundamental understanding appears to be incorrect.",
+                    "score": 2,
+                    "suggestions": "Study the basics of this topic and understand the correct concepts before attempting to answer.",
+                    "corrections": "The main issues are: [Technical errors would be identified here]. The correct approach is: [Correct information would be provided here].",
+                    "strength": "Willingness to attempt the problem",
+                    "improvement": "Core technical concepts",
+                    "resource": "Review the fundamentals of this topic"
+                }
+            elif 'good' in answer.lower() or 'excellent' in answer.lower():
+                return {
+                    "feedback": "Excellent technical depth and clear examples. This demonstrates strong understanding of the concepts.",
+                    "score": 9,
+                    "suggestions": "Continue building on this solid foundation with more advanced topics.",
+                    "corrections": "",
+                    "strength": "Excellent technical depth",
+                    "improvement": "Explore more advanced topics",
+                    "resource": "Read 'Designing Data-Intensive Applications'"
+                }
+            else:
+                # Generate varied, realistic feedback based on answer length and content
                 import random
-                summaries = [
+                feedbacks = [
+                    {
+                        "feedback": "Good technical understanding with clear communication. You demonstrated solid knowledge of the core concepts.",
+                        "score": 8,
+                        "suggestions": "Consider adding specific examples from your experience to make your answer more compelling.",
+                        "corrections": "",
+                        "strength": "Clear communication",
+                        "improvement": "Add specific examples",
+                        "resource": "Practice STAR-format stories"
+                    },
                     {
-                        "strengths": ["Clear communication style", "Strong technical foundation", "Good problem-solving approach"],
-                        "improvements": ["Provide more specific examples", "Include metrics and outcomes", "Expand technical depth"],
-                        "resources": ["Practice coding problems on LeetCode", "Study system design patterns", "Review industry best practices"],
-                        "overall_score": 7
+                        "feedback": "Strong answer with good structure. You covered the main points well and showed practical understanding.",
+                        "score": 7,
+                        "suggestions": "Try to include metrics or quantifiable results to strengthen your examples.",
+                        "corrections": "",
+                        "strength": "Well-structured answers",
+                        "improvement": "Include metrics and outcomes",
+                        "resource": "Review industry best practices"
                     },
                     {
-                        "strengths": ["Excellent technical knowledge", "Structured thinking", "Practical experience"],
-                        "improvements": ["Add more detail to examples", "Discuss scalability considerations", "Include performance metrics"],
-                        "resources": ["Read 'Designing Data-Intensive Applications'", "Practice system design interviews", "Study cloud architecture patterns"],
-                        "overall_score": 8
+                        "feedback": "Well-articulated response that shows good problem-solving approach. Your explanation was clear and logical.",
+                        "score": 8,
+                        "suggestions": "Consider discussing alternative approaches or edge cases to demonstrate deeper thinking.",
+                        "corrections": "",
+                        "strength": "Logical problem-solving approach",
+                        "improvement": "Discuss trade-offs and edge cases",
+                        "resource": "Study system design patterns"
                     },
                     {
-                        "strengths": ["Strong analytical skills", "Clear explanations", "Good understanding of fundamentals"],
-                        "improvements": ["Provide more real-world examples", "Discuss trade-offs and alternatives", "Include specific technologies"],
-                        "resources": ["Practice on HackerRank", "Study microservices architecture", "Learn about DevOps practices"],
-                        "overall_score": 7
+                        "feedback": "Solid technical knowledge demonstrated. You provided a comprehensive answer with good examples.",
+                        "score": 7,
+                        "suggestions": "Focus on explaining the 'why' behind your decisions to show strategic thinking.",
+                        "corrections": "",
+                        "strength": "Solid technical knowledge",
+                        "improvement": "Explain the reasoning behind decisions",
+                        "resource": "Practice mock interviews"
                     }
                 ]
-                return random.choice(summaries)
-            if 'interview tips' in prompt.lower() or 'tips' in prompt.lower():
-                return [
-                    "Research the company and role thoroughly before the interview",
-                    "Prepare specific examples using the STAR method (Situation, Task, Action, Result)",
-                    "Practice explaining technical concepts in simple terms",
-                    "Ask thoughtful questions about the team, projects, and company culture",
-                    "Follow up with a thank you email within 24 hours"
-                ]
-            return {"message": "OK"}
-        return "OK"
+                return random.choice(feedbacks)
+        if 'Generate a summary' in prompt:
+            import random
+            summaries = [
+                {
+                    "strengths": ["Clear communication style", "Strong technical foundation", "Good problem-solving approach"],
+                    "improvements": ["Provide more specific examples", "Include metrics and outcomes", "Expand technical depth"],
+                    "resources": ["Practice coding problems on LeetCode", "Study system design patterns", "Review industry best practices"],
+                    "overall_score": 7
+                },
+                {
+                    "strengths": ["Excellent technical knowledge", "Structured thinking", "Practical experience"],
+                    "improvements": ["Add more detail to examples", "Discuss scalability considerations", "Include performance metrics"],
+                    "resources": ["Read 'Designing Data-Intensive Applications'", "Practice system design interviews", "Study cloud architecture patterns"],
+                    "overall_score": 8
+                },
+                {
+                    "strengths": ["Strong analytical skills", "Clear explanations", "Good understanding of fundamentals"],
+                    "improvements": ["Provide more real-world examples", "Discuss trade-offs and alternatives", "Include specific technologies"],
+                    "resources": ["Practice on HackerRank", "Study microservices architecture", "Learn about DevOps practices"],
+                    "overall_score": 7
+                }
+            ]
+            return random.choice(summaries)
+        if 'interview tips' in prompt.lower() or 'tips' in prompt.lower():
+            return [
+                "Research the company and role thoroughly before the interview",
+                "Prepare specific examples using the STAR method (Situation, Task, Action, Result)",
+                "Practice explaining technical concepts in simple terms",
+                "Ask thoughtful questions about the team, projects, and company culture",
+                "Follow up with a thank you email within 24 hours"
+            ]
+        return {"message": "OK"}
+    return "OK"
+
+def _cacheable(result, validate):
+    """Whether a response may be cached or served from the cache: no error, and accepted by validate when given"""
+    if isinstance(result, dict) and result.get('error'):
+        return False
+    return validate is None or validate(result) is not None
+
+# get_ai_response's decisions, shared with asgi_app's async version
+
+def _response_without_model(prompt, expect_json):
+    """The answer when no model is called (FAKE_AI's canned one, or the missing-key error); None otherwise"""
+    if _fake_ai_enabled():
+        app.logger.debug("Using FAKE_AI mode")
+        return _fake_ai_response(prompt, expect_json)
+    if not os.getenv('OPENROUTER_API_KEY'):
+        app.logger.error("No OpenRouter API key found")
+        return {"error": "No OpenRouter API key configured"}
+    return None
+
+def _response_cache_slot(prompt, max_tokens, expect_json, cache_ttl, priority):
+    """(response cache, or None when this call is not cached; cache key; single-flight key).
+
+    Calls only coalesce at the same priority: an optional call shed by the
+    rate limiter must not hand its error to a normal or critical one.
+    """
+    model = os.getenv('OPENROUTER_MODEL', 'google/gemma-7b-it:free')
+    response_key = cache_key(model, prompt, max_tokens, AI_TEMPERATURE)
+    response_cache = get_response_cache() if cache_ttl and expect_json else None
+    return response_cache, response_key, f"{response_key}-{priority}{'-json' if expect_json else '-text'}"
+
+def _cached_response(response_cache, response_key, validate):
+    """The cached answer if there is one validate accepts, else None"""
+    cached = response_cache.get(response_key)
+    return cached if cached is not MISS and _cacheable(cached, validate) else None
+
+def _cache_response(response_cache, response_key, result, cache_ttl, validate):
+    if _cacheable(result, validate):
+        response_cache.set(response_key, result, cache_ttl)
+
+def get_ai_response(prompt, max_tokens=500, expect_json=False, cache_ttl=None, priority=NORMAL, abandoned=None, validate=None):
+    """AI response function with OpenRouter support.
+
+    With cache_ttl set, parsed JSON responses are cached for that many seconds
+    and identical prompts are answered from the response cache. Only results
+    the validate function accepts (not None) are cached or served from it, so
+    a malformed answer is retried by the next call instead of being pinned.
+    priority (critical/normal/optional) decides how the rate limiter treats the
+    call once the request budget runs low; cache hits never touch the budget.
+    Once the abandoned event is set the model chain does not move on to
+    another model; a request already sent still completes and is cached.
+    """
+    result = _response_without_model(prompt, expect_json)
+    if result is not None:
+        return result
     
     # Real AI implementation using OpenRouter
     openrouter_api_key = os.getenv('OPENROUTER_API_KEY')
-    if not openrouter_api_key:
-        app.logger.error("No OpenRouter API key found")
-        return {"error": "No OpenRouter API key configured"}
+    response_cache, response_key, flight_key = _response_cache_slot(prompt, max_tokens, expect_json, cache_ttl, priority)
+    if response_cache is not None:
+        cached_result = _cached_response(response_cache, response_key, validate)
+        if cached_result is not None:
+            app.logger.debug("AI response served from cache")
+            return cached_result
+    
+    def fetch():
+        result = _openrouter_response(prompt, max_tokens, expect_json, openrouter_api_key, priority, abandoned)
+        if response_cache is not None:
+            _cache_response(response_cache, response_key, result, cache_ttl, validate)
+        return result
+    
+    def lookup():
+        return _cached_response(response_cache, response_key, validate)
+    
+    # Identical prompts already in flight share one upstream request
+    single_flight = get_single_flight()
+    if single_flight is None:
+        return fetch()
+    result = single_flight.do(flight_key, fetch, lookup if response_cache is not None else None)
+    if isinstance(result, dict) and result.get('abandoned') and not _is_abandoned(abandoned):
+        # The shared call was abandoned by its leader's caller, not by this one
+        app.logger.debug("Coalesced AI request was abandoned by another caller, asking again")
+        return fetch()
+    return result
+
+def _available_models():
+    """Models worth calling, healthiest first; empty when every circuit is open"""
+    models_to_try = _models_to_try()
+    # Skip models whose circuit is open and try the healthiest ones first
+    available_models = health_registry.order(models_to_try)
+    if not available_models:
+        app.logger.error(f"No healthy OpenRouter models available: {health_registry.snapshot(models_to_try)}")
+    return available_models
+
+NO_HEALTHY_MODELS = {"error": "All models are temporarily unavailable (circuit open). Please try again shortly."}
+
+def _chain_result(content, failure, prompt, expect_json):
+    """Turn the outcome of a model chain into get_ai_response's return value"""
+    if failure is not None:
+        status_code, error_text = failure
+        if status_code == 'rate_limited':
+            return {"error": f"AI request not sent: {error_text}", "rate_limited": True}
+        if status_code == 'abandoned':
+            return {"error": f"AI request abandoned: {error_text}", "abandoned": True}
+        app.logger.error(f"All OpenRouter models failed. Last error: {status_code} - {error_text}")
+        # If it's a 401 error, suggest checking API key
+        if status_code == 401:
+            app.logger.error("401 Unauthorized - Check your OpenRouter API key")
+        return {"error": f"All models failed. Last error: {status_code} - {error_text}"}
+    
+    if expect_json:
+        parsed_result = _parse_json_like(content, prompt)
+        if parsed_result is not None:
+            return parsed_result
+        else:
+            # If all else fails, return the content as is
+            return {"error": "Could not parse JSON from AI response", "raw": content}
     
+    return content
+
+def _openrouter_response(prompt, max_tokens, expect_json, openrouter_api_key, priority=NORMAL, abandoned=None):
+    """Run the OpenRouter model chain for one prompt and parse the answer"""
     try:
-        url = "https://openrouter.ai/api/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {openrouter_api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "http://localhost:5000",
-            "X-Title": "LLM Interview Sim"
-        }
-        model = os.getenv('OPENROUTER_MODEL', 'google/gemma-7b-it:free')
+        url = OPENROUTER_CHAT_URL
+        headers = _openrouter_headers(openrouter_api_key)
+        models_to_try = _available_models()
+        if not models_to_try:
+            return dict(NO_HEALTHY_MODELS)
         
-        # List of models to try in order (working model first)
-        models_to_try = [
-            model,
-            'mistralai/mistral-7b-instruct:free',  # This one works!
-            'google/gemma-7b-it:free',
-            'gryphe/mythomax-l2-13b:free'
-        ]
-        
-        for current_model in models_to_try:
-            payload = {
-                "model": current_model,
-                "messages": [{"role": "user", "content": prompt}],
-                "max_tokens": max_tokens,
-                "temperature": 0.7
-            }
-            
-            app.logger.debug(f"Trying OpenRouter with model: {current_model}")
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
-            
-            if response.status_code == 200:
-                app.logger.debug(f"Success with model: {current_model}")
-                break
-            else:
-                app.logger.warning(f"Model {current_model} failed: {response.status_code} - {response.text}")
-                if current_model == models_to_try[-1]:  # Last model failed
-                    app.logger.error(f"All OpenRouter models failed. Last error: {response.status_code} - {response.text}")
-                    # If it's a 401 error, suggest checking API key
-                    if response.status_code == 401:
-                        app.logger.error("401 Unauthorized - Check your OpenRouter API key")
-                    return {"error": f"All models failed. Last error: {response.status_code} - {response.text}"}
-                continue
-        
-        if response.status_code != 200:
-            app.logger.error(f"OpenRouter API error: {response.status_code} - {response.text}")
-            return {"error": f"API request failed with {response.status_code}"}
-        
-        data = response.json()
-        try:
-            content = data["choices"][0]["message"]["content"]
-        except (KeyError, IndexError) as e:
-            app.logger.error(f"Unexpected OpenRouter response format: {data}")
-            return {"error": "Unexpected response format from AI"}
-        
-        if expect_json:
-            parsed_result = _parse_json_like(content, prompt)
-            if parsed_result is not None:
-                return parsed_result
-            else:
-                # If all else fails, return the content as is
-                return {"error": "Could not parse JSON from AI response", "raw": content}
+        hedge_delay = _hedge_delay()
+        if hedge_delay is not None:
+            content, failure = _hedged_model_chain(url, headers, models_to_try, prompt, max_tokens, hedge_delay, priority, abandoned)
+        else:
+            content, failure = _sequential_model_chain(url, headers, models_to_try, prompt, max_tokens, priority, abandoned)
         
-        return content
+        return _chain_result(content, failure, prompt, expect_json)
         
     except requests.exceptions.Timeout:
         app.logger.error("OpenRouter API timeout")
@@ -361,6 +582,161 @@ def get_ai_response(prompt, max_tokens=500, expect_json=False):
         app.logger.error(f"Unexpected error in AI call: {str(e)}")
         return {"error": f"Unexpected error: {str(e)}"}
 
+DEADLINE_EXCEEDED = {"error": "AI request did not finish before the deadline", "deadline_exceeded": True}
+
+def _ai_response_before(deadline, prompt, abandoned=None, **kwargs):
+    """get_ai_response that gives up at deadline (a time.monotonic() value).
+
+    A call still running then is abandoned: it finishes its current model in
+    the background, where its answer still fills the response cache. Pass an
+    abandoned event to also be able to abandon it earlier.
+    """
+    if abandoned is None:
+        abandoned = threading.Event()
+    future = _get_fallback_executor().submit(get_ai_response, prompt, abandoned=abandoned, **kwargs)
+    try:
+        return future.result(timeout=max(deadline - time.monotonic(), 0))
+    except FutureTimeout:
+        abandoned.set()
+        app.logger.warning("AI request still running at the deadline, abandoning it")
+        return dict(DEADLINE_EXCEEDED)
+
+def _fallback_result(attempt, response, validate, remaining):
+    """validate's result for a finished fallback prompt, or None; once one is rate-limited the prompts not started are dropped"""
+    result = validate(response)
+    if result is not None:
+        app.logger.info(f"AI fallback attempt {attempt} successful")
+        return result
+    if isinstance(response, dict) and response.get('rate_limited'):
+        remaining.clear()
+    return None
+
+def _first_valid_response(prompts, validate, deadline, max_tokens, cache_ttl, priority):
+    """Race alternative prompts for the same answer.
+
+    Up to FALLBACK_FANOUT prompts are in flight at once and the next one
+    starts as soon as one fails. Returns the first validate() result that is
+    not None, or None when every prompt failed, the rate limiter started
+    refusing, or the deadline (a time.monotonic() value) passed. Prompts not
+    yet started are then dropped and running ones abandoned.
+    """
+    if time.monotonic() >= deadline:
+        app.logger.warning("Deadline passed before the fallback prompts could start")
+        return None
+    executor = _get_fallback_executor()
+    abandoned = threading.Event()
+    remaining = list(enumerate(prompts, 1))
+    pending = {}
+    
+    def launch_next():
+        attempt, prompt = remaining.pop(0)
+        app.logger.info(f"Trying AI fallback attempt {attempt}")
+        future = executor.submit(get_ai_response, prompt, max_tokens, True, cache_ttl, priority, abandoned, validate)
+        pending[future] = attempt
+    
+    while remaining and len(pending) < FALLBACK_FANOUT:
+        launch_next()
+    try:
+        while pending:
+            done, _ = wait(pending, timeout=max(deadline - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+            if not done:
+                app.logger.warning(f"Deadline passed with {len(pending)} fallback attempts in flight")
+                return None
+            for future in done:
+                result = _fallback_result(pending.pop(future), future.result(), validate, remaining)
+                if result is not None:
+                    return result
+                if remaining:
+                    launch_next()
+        return None
+    finally:
+        abandoned.set()
+        for future in pending:
+            future.cancel()
+
+class AIStreamError(Exception):
+    """Raised when no model could be streamed from"""
+
+FEEDBACK_FIELDS = ('feedback', 'score', 'suggestions', 'corrections')
+
+def _fake_stream(prompt, max_tokens):
+    """FAKE_AI stand-in for streaming: the mock JSON answer in small chunks"""
+    content = json.dumps(get_ai_response(prompt, max_tokens=max_tokens, expect_json=True))
+    for i in range(0, len(content), 12):
+        yield content[i:i + 12]
+
+def stream_ai_response(prompt, max_tokens=500, priority=NORMAL):
+    """Yield generated text chunks from the first healthy model that accepts a streaming request"""
+    if os.getenv('FAKE_AI', 'false').lower() in ['1', 'true', 'yes']:
+        yield from _fake_stream(prompt, max_tokens)
+        return
+
+    openrouter_api_key = os.getenv('OPENROUTER_API_KEY')
+    if not openrouter_api_key:
+        raise AIStreamError("No OpenRouter API key configured")
+
+    headers = _openrouter_headers(openrouter_api_key)
+    last_error = "All models are temporarily unavailable (circuit open)"
+    models = health_registry.order(_models_to_try())
+    current = 0
+    try:
+        for index, model in enumerate(models):
+            current = index
+            admitted, reason = rate_limiter.acquire(headers["Authorization"], priority)
+            if not admitted:
+                health_registry.release_probe(model)
+                raise AIStreamError(f"AI request not sent: {reason}")
+
+            payload = _chat_payload(model, prompt, max_tokens, stream=True)
+            started = time.monotonic()
+            try:
+                response = get_provider_client().post(OPENROUTER_CHAT_URL, headers=headers, json=payload, stream=True)
+            except requests.exceptions.RequestException as e:
+                health_registry.record_failure(model, 'error', str(e), latency=time.monotonic() - started)
+                last_error = str(e)
+                continue
+            try:
+                rate_limiter.update_from_response(headers["Authorization"], response.status_code, response.headers)
+                if response.status_code != 200:
+                    app.logger.warning(f"Streaming with {model} failed: {response.status_code} - {response.text}")
+                    health_registry.record_failure(model, response.status_code, response.text,
+                                                   latency=time.monotonic() - started, headers=response.headers)
+                    last_error = f"{response.status_code} - {response.text}"
+                    if response.status_code in AUTH_ERRORS:
+                        raise AIStreamError(f"AI request refused: {last_error}")
+                    continue
+
+                for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                    # Blank lines separate events; ':' lines are keep-alive comments
+                    if not line or line.startswith(':') or not line.startswith('data:'):
+                        continue
+                    data = line[5:].strip()
+                    if data == '[DONE]':
+                        break
+                    try:
+                        delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                    except (ValueError, KeyError, IndexError, TypeError):
+                        continue
+                    if delta:
+                        yield delta
+                health_registry.record_success(model, time.monotonic() - started)
+                return
+            finally:
+                response.close()
+        raise AIStreamError(f"All models failed. Last error: {last_error}")
+    finally:
+        # Models after the one that answered, was refused or raised give back their probes
+        for unused in models[current:]:
+            health_registry.release_probe(unused)
+
+STREAM_COMMIT_MAX_AGE = 600
+# Seconds to wait for outstanding background evaluations before the summary
+SCORING_WAIT_TIMEOUT = float(os.getenv('SCORING_WAIT_TIMEOUT', '30'))
+ASYNC_SCORING = os.getenv('ASYNC_SCORING', 'false').lower() == 'true'
+
+def _stream_commit_serializer():
+    return URLSafeTimedSerializer(app.secret_key, salt='submit-answer-stream')
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -404,7 +780,7 @@ def demo_data():
 
 @app.route('/interview')
 def interview_page():
-    return render_template('interview.html')
+    return render_template('interview.html', async_scoring=ASYNC_SCORING)
 
 
 @app.route('/favicon.ico')
@@ -415,6 +791,31 @@ def favicon():
 def health():
     return jsonify({'status': 'ok', 'message': 'Server is running'})
 
+@app.route('/ai_metrics')
+def ai_metrics():
+    """Expose provider-layer metrics (connection reuse, model health, cache)"""
+    response_cache = get_response_cache()
+    single_flight = get_single_flight()
+    question_bank = get_question_bank()
+    history_store = _history_store()
+    return jsonify({
+        'provider_client': get_provider_client().stats(),
+        'model_health': health_registry.snapshot(),
+        'response_cache': response_cache.stats() if response_cache else None,
+        'single_flight': single_flight.stats() if single_flight else None,
+        'rate_limiter': rate_limiter.stats(),
+        'scoring_queue': scoring_queue.stats(),
+        'response_schemas': schema_stats(),
+        'question_bank': question_bank.stats() if question_bank else None,
+        'prefetch': prefetcher.stats(),
+        'sessions': _session_interface.stats() if _session_interface else None,
+        'pdf_reports': {
+            'cache': get_report_cache().stats() if get_report_cache() else None,
+            'renderer': get_report_renderer().stats()
+        },
+        'history': history_store.stats() if history_store else None
+    })
+
 @app.route('/test_ai')
 def test_ai():
     try:
@@ -524,48 +925,21 @@ def test_wrong_answer():
 
 @app.route('/test_models')
 def test_models():
-    """Test which OpenRouter models are working"""
-    models_to_test = [
-        'google/gemma-7b-it:free',
-        'mistralai/mistral-7b-instruct:free', 
-        'gryphe/mythomax-l2-13b:free',
-        'openrouter/auto:free'
-    ]
-    
-    results = {}
-    openrouter_api_key = os.getenv('OPENROUTER_API_KEY')
+    """Report which OpenRouter models are working, from the model health registry"""
+    models_to_test = list(dict.fromkeys(_models_to_try() + ['openrouter/auto:free']))
     
-    if not openrouter_api_key:
+    if not os.getenv('OPENROUTER_API_KEY'):
         return jsonify({'error': 'No OpenRouter API key'})
     
-    for model in models_to_test:
-        try:
-            url = "https://openrouter.ai/api/v1/chat/completions"
-            headers = {
-                "Authorization": f"Bearer {openrouter_api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": "http://localhost:5000",
-                "X-Title": "LLM Interview Sim"
-            }
-            payload = {
-                "model": model,
-                "messages": [{"role": "user", "content": "Hello"}],
-                "max_tokens": 10,
-                "temperature": 0.7
-            }
-            
-            response = requests.post(url, headers=headers, json=payload, timeout=10)
-            results[model] = {
-                'status_code': response.status_code,
-                'working': response.status_code == 200,
-                'error': response.text if response.status_code != 200 else None
-            }
-        except Exception as e:
-            results[model] = {
-                'status_code': 'error',
-                'working': False,
-                'error': str(e)
-            }
+    health = health_registry.snapshot(models_to_test)
+    results = {}
+    for model, model_health in health.items():
+        results[model] = {
+            'status_code': model_health.get('last_status'),
+            'working': model_health['state'] == 'closed' and model_health['samples'] > 0,
+            'error': model_health.get('last_error'),
+            'health': model_health
+        }
     
     return jsonify({
         'status': 'success',
@@ -625,20 +999,15 @@ def test_api_key():
     
     try:
         # Test with a simple request
-        url = "https://openrouter.ai/api/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {openrouter_api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "http://localhost:5000",
-            "X-Title": "LLM Interview Sim"
-        }
+        url = OPENROUTER_CHAT_URL
+        headers = _openrouter_headers(openrouter_api_key)
         payload = {
             "model": "mistralai/mistral-7b-instruct:free",
             "messages": [{"role": "user", "content": "Hello"}],
             "max_tokens": 5
         }
         
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
+        response = get_provider_client().post(url, headers=headers, json=payload, timeout=10)
         
         return jsonify({
             'status': 'success' if response.status_code == 200 else 'error',
@@ -655,6 +1024,166 @@ def test_api_key():
             'message': f'Error testing API key: {str(e)}'
         })
 
+FALLBACK_QUESTIONS = [
+    "Tell me about a challenging project you worked on and your role.",
+    "How do you approach debugging complex, intermittent issues?",
+    "Describe a time you collaborated across teams to deliver a feature.",
+    "Explain a technical concept to a non-technical stakeholder.",
+    "What would you improve about your last project and why?"
+]
+
+def _start_interview(sess, data):
+    """Reset the session for a new interview configured by data"""
+    # The previous interview's prefetched content is no longer wanted
+    prefetcher.cancel(sess.get('interview_id'))
+    # The candidate's history outlives any one interview
+    candidate_id = sess.get('candidate_id') or uuid.uuid4().hex
+    # Clear any existing session data to avoid size issues
+    sess.clear()
+    
+    sess['candidate_id'] = candidate_id
+    # Set session data (minimal to avoid cookie size limits)
+    sess['job_role'] = data.get('job_role', 'Software Engineer')
+    sess['interview_type'] = data.get('interview_type', 'Technical')
+    sess['domain'] = data.get('domain', 'General')
+    sess['interview_started'] = True
+    sess['interview_id'] = uuid.uuid4().hex
+    sess['interview_date'] = datetime.now().strftime("%Y-%m-%d %H:%M")
+    sess['current_question_index'] = 0
+    sess['feedback_received'] = False
+    sess['interview_complete'] = False
+    
+    # Check for demo mode
+    demo_mode = data.get('demo_mode', False)
+    if demo_mode:
+        sess['demo_mode'] = True
+
+def _questions_prompt(sess):
+    if sess['interview_type'] == 'Technical':
+        return (
+            f"You are an expert interviewer. Generate exactly 5 technical interview questions for a {sess['job_role']} position in {sess['domain']}. "
+            f"Make them specific, challenging, and relevant to the role. "
+            f"CRITICAL: Respond ONLY with a valid JSON array of exactly 5 strings. "
+            f"Example: [\"What is your experience with React hooks and state management?\", \"How would you optimize a slow database query?\", \"Explain the difference between REST and GraphQL APIs.\", \"Describe your approach to testing frontend components.\", \"How do you handle cross-browser compatibility issues?\"]"
+        )
+    return (
+        f"You are an expert interviewer. Generate exactly 5 behavioral interview questions for a {sess['job_role']} position. "
+        f"Focus on leadership, teamwork, problem-solving, and past experiences. "
+        f"CRITICAL: Respond ONLY with a valid JSON array of exactly 5 strings. "
+        f"Example: [\"Tell me about a time you led a team through a difficult project.\", \"Describe a situation where you had to resolve a conflict.\", \"Give an example of how you handled a tight deadline.\", \"Tell me about a time you failed and what you learned.\", \"Describe your approach to mentoring junior team members.\"]"
+    )
+
+def _question_fallback_prompts(sess):
+    return [
+        f"Generate 5 {sess['interview_type'].lower()} interview questions for {sess['job_role']}. Return as JSON array.",
+        f"Create 5 interview questions for {sess['job_role']} position. Format: [\"Q1\", \"Q2\", \"Q3\", \"Q4\", \"Q5\"]",
+        f"List 5 {sess['interview_type'].lower()} questions for {sess['job_role']}. Use JSON format."
+    ]
+
+def _questions_from_response(questions_response, prompt):
+    """Interpret the question-generation response.
+
+    Returns (questions, error_message). (None, None) means the AI fallback
+    prompts should be tried.
+    """
+    # Handle response - be more persistent with AI when it's enabled
+    fake_ai = _fake_ai_enabled()
+    
+    if isinstance(questions_response, dict) and questions_response.get('error'):
+        app.logger.warning(f"Question generation failed, trying AI fallback. Detail: {questions_response}")
+        if fake_ai:
+            # In FAKE_AI mode, use hardcoded fallback
+            return list(FALLBACK_QUESTIONS), None
+        return None, None
+    # Well-formed lists pass straight through; wrapped or numbered ones are repaired
+    question_set = validate_questions(questions_response)
+    if question_set is not None:
+        return question_set.to_list(), None
+
+    app.logger.warning(f"Unexpected questions response format: {type(questions_response)}")
+    if fake_ai:
+        return [str(questions_response)], None
+    if isinstance(questions_response, (list, dict)):
+        # Too few usable questions: worth another prompt
+        return None, None
+    # In real AI mode, try to extract questions from the response
+    if isinstance(questions_response, str):
+        # Try to parse the string response
+        question_set = validate_questions(_parse_json_like(questions_response, prompt))
+        if question_set is not None:
+            return question_set.to_list(), None
+        return None, 'Failed to parse AI response. Please try again.'
+    return None, 'Invalid AI response format. Please try again.'
+
+def _fallback_question_list(fallback_questions):
+    """The question list the fallback race produced, or None when it failed"""
+    if fallback_questions is None:
+        app.logger.error("All AI attempts failed for question generation")
+        return None
+    return fallback_questions.to_list()
+
+def _fallback_questions(fallback_prompts, deadline):
+    """Race the simpler question prompts; None when all of them fail or the deadline passes"""
+    return _fallback_question_list(_first_valid_response(fallback_prompts, validate_questions, deadline, **QUESTIONS_FALLBACK))
+
+def _bank_questions_prompt(job_role, interview_type, domain, count, avoid):
+    prompt = (
+        f"You are an expert interviewer. Generate exactly {count} {interview_type.lower()} interview questions "
+        f"for a {job_role} position in {domain}. Make them specific, varied and relevant to the role. "
+    )
+    if avoid:
+        prompt += f"Do not repeat or rephrase any of these: {json.dumps(avoid)}. "
+    return prompt + f"CRITICAL: Respond ONLY with a valid JSON array of exactly {count} strings."
+
+def _generate_bank_questions(job_role, interview_type, domain, count, avoid):
+    """One refill batch for the question bank; None when generation fails"""
+    prompt = _bank_questions_prompt(job_role, interview_type, domain, count, avoid)
+    question_set = validate_questions(get_ai_response(prompt, expect_json=True, max_tokens=160 * count, priority=OPTIONAL), expected=count)
+    return question_set.to_list() if question_set is not None else None
+
+def _question_bank():
+    """The question bank with its refill thread running, or None when QUESTION_BANK is off"""
+    bank = get_question_bank()
+    if bank is not None:
+        bank.start_refiller(_generate_bank_questions)
+    return bank
+
+def _banked_questions(sess, previous_questions):
+    """Five questions from the bank for the session's role, avoiding the last interview's; None on a miss"""
+    bank = _question_bank()
+    if bank is None:
+        return None
+    question_set = validate_questions(bank.sample(sess['job_role'], sess['interview_type'], sess['domain'], exclude=previous_questions))
+    return question_set.to_list() if question_set is not None else None
+
+def _bank_live_questions(sess, questions):
+    """Seed the bank with questions generated live (FAKE_AI's canned sets are not worth keeping)"""
+    bank = get_question_bank()
+    if bank is not None and not _fake_ai_enabled():
+        bank.add(sess['job_role'], sess['interview_type'], sess['domain'], questions, served=True)
+
+def _begin_interview(sess, data):
+    """Reset sess for the interview data configures and start prefetching its tips.
+
+    Returns questions from the bank, or None when they have to be generated.
+    """
+    previous_questions = sess.get('questions') or []
+    _start_interview(sess, data)
+    _prefetch_interview_content(sess)
+    return _banked_questions(sess, previous_questions)
+
+def _finish_configure(sess, questions, generated):
+    """Store the interview's questions (banking generated ones) and build /configure's payload"""
+    if generated:
+        _bank_live_questions(sess, questions)
+    sess['questions'] = questions
+    return {
+        'status': 'success',
+        'question': questions[0],
+        'question_index': 1,
+        'total_questions': len(questions)
+    }
+
 @app.route('/configure', methods=['POST'])
 def configure_interview():
     try:
@@ -665,142 +1194,136 @@ def configure_interview():
             app.logger.error("No data received in configure_interview")
             return jsonify({'status': 'error', 'message': 'No data received'}), 400
 
-        # Clear any existing session data to avoid size issues
-        session.clear()
-        
-        # Set session data (minimal to avoid cookie size limits)
-        session['job_role'] = data.get('job_role', 'Software Engineer')
-        session['interview_type'] = data.get('interview_type', 'Technical')
-        session['domain'] = data.get('domain', 'General')
-        session['interview_started'] = True
-        session['current_question_index'] = 0
-        session['user_answers'] = []
-        session['feedback_scores'] = []
-        session['feedback_details'] = []
-        session['feedback_received'] = False
-        session['interview_complete'] = False
-        
-        # Check for demo mode
-        demo_mode = data.get('demo_mode', False)
-        if demo_mode:
-            session['demo_mode'] = True
-
-        # Generate questions using AI
-        if session['interview_type'] == 'Technical':
-            prompt = (
-                f"You are an expert interviewer. Generate exactly 5 technical interview questions for a {session['job_role']} position in {session['domain']}. "
-                f"Make them specific, challenging, and relevant to the role. "
-                f"CRITICAL: Respond ONLY with a valid JSON array of exactly 5 strings. "
-                f"Example: [\"What is your experience with React hooks and state management?\", \"How would you optimize a slow database query?\", \"Explain the difference between REST and GraphQL APIs.\", \"Describe your approach to testing frontend components.\", \"How do you handle cross-browser compatibility issues?\"]"
-            )
-        else:
-            prompt = (
-                f"You are an expert interviewer. Generate exactly 5 behavioral interview questions for a {session['job_role']} position. "
-                f"Focus on leadership, teamwork, problem-solving, and past experiences. "
-                f"CRITICAL: Respond ONLY with a valid JSON array of exactly 5 strings. "
-                f"Example: [\"Tell me about a time you led a team through a difficult project.\", \"Describe a situation where you had to resolve a conflict.\", \"Give an example of how you handled a tight deadline.\", \"Tell me about a time you failed and what you learned.\", \"Describe your approach to mentoring junior team members.\"]"
-            )
-
-        questions_response = get_ai_response(prompt, expect_json=True, max_tokens=800)
-        app.logger.debug(f"Questions response: {questions_response}")
-        
-        # Handle response - be more persistent with AI when it's enabled
-        fake_ai = os.getenv('FAKE_AI', 'false').lower() in ['1', 'true', 'yes']
-        
-        if isinstance(questions_response, dict) and questions_response.get('error'):
-            app.logger.warning(f"Question generation failed, trying AI fallback. Detail: {questions_response}")
+        questions = _begin_interview(session, data)
+        generated = questions is None
+        if generated:
+            # Generate questions using AI
+            deadline = time.monotonic() + QUESTIONS_DEADLINE
+            prompt = _questions_prompt(session)
+            questions_response = _ai_response_before(deadline, prompt, **QUESTIONS_REQUEST)
+            app.logger.debug(f"Questions response: {questions_response}")
             
-            # Try multiple AI fallback approaches when AI is enabled
-            if not fake_ai:
-                fallback_attempts = [
-                    f"Generate 5 {session['interview_type'].lower()} interview questions for {session['job_role']}. Return as JSON array.",
-                    f"Create 5 interview questions for {session['job_role']} position. Format: [\"Q1\", \"Q2\", \"Q3\", \"Q4\", \"Q5\"]",
-                    f"List 5 {session['interview_type'].lower()} questions for {session['job_role']}. Use JSON format."
-                ]
-                
-                for i, fallback_prompt in enumerate(fallback_attempts):
-                    app.logger.info(f"Trying AI fallback attempt {i+1}")
-                    fallback_questions = get_ai_response(fallback_prompt, expect_json=True, max_tokens=600)
-                    
-                    if isinstance(fallback_questions, list) and len(fallback_questions) >= 3:
-                        session['questions'] = fallback_questions
-                        app.logger.info(f"AI fallback attempt {i+1} successful")
-                        break
-                else:
+            questions, error_message = _questions_from_response(questions_response, prompt)
+            if error_message:
+                return jsonify({'status': 'error', 'message': error_message}), 500
+            if questions is None:
+                questions = _fallback_questions(_question_fallback_prompts(session), deadline)
+                if questions is None:
                     # If all AI attempts fail, return error instead of hardcoded
-                    app.logger.error("All AI attempts failed for question generation")
-                    return jsonify({'status': 'error', 'message': 'Failed to generate questions. Please try again.'}), 500
-            else:
-                # In FAKE_AI mode, use hardcoded fallback
-                session['questions'] = [
-                    "Tell me about a challenging project you worked on and your role.",
-                    "How do you approach debugging complex, intermittent issues?",
-                    "Describe a time you collaborated across teams to deliver a feature.",
-                    "Explain a technical concept to a non-technical stakeholder.",
-                    "What would you improve about your last project and why?"
-                ]
-        elif isinstance(questions_response, list):
-            session['questions'] = questions_response
-        else:
-            app.logger.warning(f"Unexpected questions response format: {type(questions_response)}")
-            if not fake_ai:
-                # In real AI mode, try to extract questions from the response
-                if isinstance(questions_response, str):
-                    # Try to parse the string response
-                    parsed = _parse_json_like(questions_response, prompt)
-                    if isinstance(parsed, list) and len(parsed) >= 3:
-                        session['questions'] = parsed
-                    else:
-                        return jsonify({'status': 'error', 'message': 'Failed to parse AI response. Please try again.'}), 500
-                else:
-                    return jsonify({'status': 'error', 'message': 'Invalid AI response format. Please try again.'}), 500
-            else:
-                session['questions'] = [str(questions_response)]
+                    return jsonify({'status': 'error', 'message': QUESTIONS_FAILED}), 500
 
+        payload = _finish_configure(session, questions, generated)
         app.logger.debug(f"Final questions: {session['questions']}")
-
-        return jsonify({
-            'status': 'success',
-            'question': session['questions'][0],
-            'question_index': 1,
-            'total_questions': len(session['questions'])
-        })
+        return jsonify(payload)
     except Exception as e:
         app.logger.error(f"Error in configure_interview: {str(e)}", exc_info=True)
         return jsonify({'status': 'error', 'message': f'Configuration failed: {str(e)}'}), 500
 
-@app.route('/submit_answer', methods=['POST'])
-def submit_answer():
+def _configure_commit_serializer():
+    return URLSafeTimedSerializer(app.secret_key, salt='configure-stream')
+
+@app.route('/configure_stream', methods=['POST'])
+def configure_stream():
+    """Start an interview and stream its questions over Server-Sent Events.
+
+    Events: 'question' (index and text, as soon as each question string is
+    complete), 'done' (the full list plus a signed commit token) and 'error'.
+    The interview is reset here, before streaming starts; the browser posts
+    the token to /configure_commit to store the questions in the session.
+    """
     try:
-        if not session.get('interview_started') or 'questions' not in session:
-            return jsonify({'status': 'error', 'message': 'Interview not configured yet'}), 400
-            
         data = request.get_json()
         if not data:
-            return jsonify({'status': 'error', 'message': 'No answer provided'}), 400
-            
-        user_answer = data.get('answer', '').strip()
-        if not user_answer:
-            return jsonify({'status': 'error', 'message': 'Please provide an answer'}), 400
-            
-        question_index = session.get('current_question_index', 0)
-        questions = session.get('questions', [])
-        
-        if question_index >= len(questions):
-            return jsonify({'status': 'error', 'message': 'Invalid question index'}), 400
+            return jsonify({'status': 'error', 'message': 'No data received'}), 400
 
-        # Store the answer
-        if 'user_answers' not in session:
-            session['user_answers'] = []
-        session['user_answers'].append(user_answer)
+        deadline = time.monotonic() + QUESTIONS_DEADLINE
+        banked_questions = _begin_interview(session, data)
+        prompt = _questions_prompt(session)
+        fallback_prompts = _question_fallback_prompts(session)
+        interview_id = session['interview_id']
+        interview = {name: session[name] for name in ('job_role', 'interview_type', 'domain')}
+    except Exception as e:
+        app.logger.error(f"Error in configure_stream: {str(e)}", exc_info=True)
+        return jsonify({'status': 'error', 'message': f'Configuration failed: {str(e)}'}), 500
 
-        # Get current question
-        question = questions[question_index]
-        interview_type = session.get('interview_type', 'Technical')
+    def generate():
+        # Share cached question sets with /configure, which uses the same prompt and max_tokens
+        response_cache = None if _fake_ai_enabled() else get_response_cache()
+        response_key = cache_key(os.getenv('OPENROUTER_MODEL', 'google/gemma-7b-it:free'), prompt, 800, AI_TEMPERATURE)
+        if banked_questions is not None:
+            questions = banked_questions
+        else:
+            # A cached set may be one validate_questions repairs (e.g. {"questions": [...]}): stream the repaired list
+            cached = _cached_response(response_cache, response_key, validate_questions) if response_cache is not None else None
+            question_set = validate_questions(cached) if cached is not None else None
+            questions = question_set.to_list() if question_set is not None else MISS
+        if questions is not MISS:
+            for index, question in enumerate(questions):
+                yield _sse('question', {'index': index, 'question': question})
+        else:
+            questions = []
+            parser = StreamingJSONParser()
+            try:
+                for delta in stream_ai_response(prompt, max_tokens=800, priority=NORMAL):
+                    for index, value in parser.feed(delta):
+                        if isinstance(index, int) and isinstance(value, str):
+                            questions.append(value)
+                            yield _sse('question', {'index': len(questions) - 1, 'question': value})
+                    if time.monotonic() >= deadline:
+                        app.logger.warning("Question stream still running at the deadline, closing it")
+                        break
+            except (AIStreamError, requests.exceptions.RequestException) as e:
+                app.logger.warning(f"Streaming questions failed: {e}")
 
-        # Define scoring criteria prompt
-        if interview_type == 'Technical':
-            scoring_criteria = """
+            question_set = validate_questions(questions) or validate_questions(_parse_json_like(parser.buffer, prompt))
+            if question_set is not None:
+                questions = question_set.to_list()
+                if response_cache is not None:
+                    response_cache.set(response_key, questions, QUESTIONS_CACHE_TTL)
+            else:
+                questions = _fallback_questions(fallback_prompts, deadline)
+                if questions is None:
+                    yield _sse('error', {'message': QUESTIONS_FAILED})
+                    return
+            _bank_live_questions(interview, questions)
+
+        token = _configure_commit_serializer().dumps({'interview_id': interview_id, 'questions': questions})
+        yield _sse('done', {'questions': questions, 'total_questions': len(questions), 'commit_token': token})
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/configure_commit', methods=['POST'])
+def configure_commit():
+    """Store streamed questions in the interview /configure_stream started"""
+    try:
+        data = request.get_json() or {}
+        try:
+            committed = _configure_commit_serializer().loads(data.get('commit_token', ''), max_age=STREAM_COMMIT_MAX_AGE)
+        except BadSignature:
+            return jsonify({'status': 'error', 'message': 'Invalid or expired configuration token'}), 400
+
+        if committed['interview_id'] != session.get('interview_id') or session.get('questions'):
+            return jsonify({'status': 'error', 'message': 'This interview was already configured'}), 409
+
+        session['questions'] = committed['questions']
+        return jsonify({
+            'status': 'success',
+            'question': session['questions'][0],
+            'question_index': 1,
+            'total_questions': len(session['questions'])
+        })
+    except Exception as e:
+        app.logger.error(f"Error in configure_commit: {str(e)}", exc_info=True)
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+def _feedback_prompt(question, user_answer, interview_type, job_role):
+    """Build the strict scoring prompt for one answer"""
+    # Define scoring criteria prompt
+    if interview_type == 'Technical':
+        scoring_criteria = """
 Scoring scale (1–10, integers only):
 1–2 = Very poor: fundamentally wrong, no examples, off-topic
 3–4 = Weak: some knowledge but major gaps, vague, missing details
@@ -808,8 +1331,8 @@ Scoring scale (1–10, integers only):
 7–8 = Good: mostly correct, some depth, relevant examples
 9–10 = Excellent: technically correct, deep insight, strong examples, clear explanation
 """
-        else:
-            scoring_criteria = """
+    else:
+        scoring_criteria = """
 Scoring scale (1–10, integers only):
 1–2 = Very poor: no STAR structure, irrelevant, off-topic
 3–4 = Weak: vague, generic, missing clear outcomes
@@ -818,9 +1341,17 @@ Scoring scale (1–10, integers only):
 9–10 = Excellent: strong STAR, highly relevant, impactful examples
 """
 
-        # Build strict prompt
-        prompt = f"""
-You are an expert interviewer evaluating a {interview_type.lower()} interview answer for a {session.get('job_role')} position.
+    # Notes for the rolling summary, so the interview can finish without a summary call
+    summary_notes = ""
+    if SUMMARY_MODE == 'incremental':
+        summary_notes = """,
+  "strength": "The answer's main strength, in a few words",
+  "improvement": "The most important thing to improve, in a few words",
+  "resource": "One specific book, course or practice that would help\""""
+
+    # Build strict prompt
+    return f"""
+You are an expert interviewer evaluating a {interview_type.lower()} interview answer for a {job_role} position.
 
 Question: {question}
 Answer: {user_answer}
@@ -832,70 +1363,79 @@ Return ONLY valid JSON in this format:
   "feedback": "2–3 sentences explaining strengths and weaknesses",
   "score": <integer 1–10>,
   "suggestions": "One specific actionable improvement",
-  "corrections": "If incorrect, explain briefly the right approach, else empty string"
+  "corrections": "If incorrect, explain briefly the right approach, else empty string"{summary_notes}
 }}
 """
 
-        # Call AI
-        feedback = get_ai_response(prompt, expect_json=True, max_tokens=400)
-        fake_ai = os.getenv('FAKE_AI', 'false').lower() in ['1', 'true', 'yes']
-
-        # Normalize feedback
-        if isinstance(feedback, dict) and not feedback.get('error'):
-            normalized_feedback_text = feedback.get('feedback') or "No feedback provided."
-            normalized_score = int(feedback.get('score', 3))  # force int, fallback = 3
-            normalized_corrections = feedback.get('corrections', '')
-        else:
-            app.logger.warning(f"AI feedback failed, using fallback. Detail: {feedback}")
+def _normalize_feedback(feedback, user_answer):
+    """Turn an AI feedback result into an AnswerFeedback, with fallback feedback when it is unusable"""
+    evaluation = validate_feedback(feedback)
+    if evaluation is not None:
+        return evaluation
+    app.logger.warning(f"AI feedback failed, using fallback. Detail: {feedback}")
 
-            # Penalize weak answers on fallback
-            if not user_answer or len(user_answer.split()) < 5:
-                normalized_feedback_text = "Your answer was too short or incomplete. Try providing more detail and examples."
-                normalized_score = 2
-            else:
-                normalized_feedback_text = "We could not fully evaluate your answer, but it appears to lack depth or clarity."
-                normalized_score = 4
-            normalized_corrections = ""
-
-        # Store feedback in session
-        if 'feedback_scores' not in session:
-            session['feedback_scores'] = []
-        if 'feedback_details' not in session:
-            session['feedback_details'] = []
-
-        session['feedback_scores'].append(normalized_score)
-        session['feedback_details'].append({
-            "question": question,
-            "answer": user_answer,
-            "feedback": normalized_feedback_text,
-            "score": normalized_score,
-            "corrections": normalized_corrections
-        })
-        
-        # Mark that feedback has been received
-        session['feedback_received'] = True
-
-        # Next question or finish
-        if question_index < len(session['questions']) - 1:
-            session['current_question_index'] = question_index + 1
-            next_question = session['questions'][session['current_question_index']]
-            return jsonify({
-                'status': 'next_question',
-                'feedback': normalized_feedback_text,
-                'score': normalized_score,
-                'corrections': normalized_corrections,
-                'question': next_question,
-                'question_index': session['current_question_index'] + 1,
-                'total_questions': len(session['questions'])
-            })
-        else:
-            # --- Generate summary at the end ---
-            all_answers = session.get('user_answers', [])
-            all_questions = session.get('questions', [])
-            summary_prompt = "You are an expert interviewer. Generate a summary based on these Q&A:\n\n"
-            for i, (q, a) in enumerate(zip(all_questions, all_answers), 1):
-                summary_prompt += f"Q{i}: {q}\nA{i}: {a}\n\n"
-            summary_prompt += """
+    # Penalize weak answers on fallback
+    if not user_answer or len(user_answer.split()) < 5:
+        return AnswerFeedback("Your answer was too short or incomplete. Try providing more detail and examples.", 2)
+    return AnswerFeedback("We could not fully evaluate your answer, but it appears to lack depth or clarity.", 4)
+
+def _append_turn(sess, question_index, user_answer, job_id=None):
+    """Add an answer to the transcript, unscored for now; returns its turn index"""
+    return Transcript(sess).append(Turn(question_index, user_answer, job_id=job_id))
+
+def _store_evaluation(sess, turn_index, feedback):
+    """Score a transcript turn with the model's feedback"""
+    transcript = Transcript(sess)
+    turn = transcript[turn_index]
+    evaluation = _normalize_feedback(feedback, turn.answer)
+    turn.feedback, turn.score, turn.corrections = evaluation.feedback, evaluation.score, evaluation.corrections
+    transcript.update(turn_index, turn)
+    if SUMMARY_MODE == 'incremental':
+        rolling = RollingSummary.from_dict(sess.get('rolling_summary'))
+        rolling.add(evaluation.score, evaluation.strength, evaluation.improvement, evaluation.resource)
+        sess['rolling_summary'] = rolling.to_dict()
+
+    # Mark that feedback has been received
+    sess['feedback_received'] = True
+    return {
+        'feedback': turn.feedback,
+        'score': turn.score,
+        'corrections': turn.corrections
+    }
+
+def _record_answer(question_index, user_answer, feedback):
+    """Store an evaluated answer in the session and move to the next question.
+
+    Returns the JSON payload for the client: the next question, or the
+    final summary once the last answer is in.
+    """
+    # Earlier answers scored in the background are settled first
+    _settle_pending_feedback(session)
+
+    evaluation = _store_evaluation(session, _append_turn(session, question_index, user_answer), feedback)
+    return _advance_interview(question_index, evaluation)
+
+def _next_question_payload(sess, question_index, evaluation):
+    """Advance past question_index; None when that was the last question"""
+    if question_index >= len(sess['questions']) - 1:
+        return None
+    sess['current_question_index'] = question_index + 1
+    next_question = sess['questions'][sess['current_question_index']]
+    return {
+        'status': 'next_question',
+        **evaluation,
+        'question': next_question,
+        'question_index': sess['current_question_index'] + 1,
+        'total_questions': len(sess['questions'])
+    }
+
+def _interview_summary_prompt(sess):
+    """Prompt for the end-of-interview summary over every Q&A pair"""
+    transcript = Transcript(sess)
+    summary_prompt = "You are an expert interviewer. Generate a summary based on these Q&A:\n\n"
+    for i, turn in enumerate(transcript, 1):
+        summary_prompt += f"Q{i}: {transcript.question(turn)}\nA{i}: {turn.answer}\n\n"
+    summary_prompt += """
 Provide JSON in this format:
 {
   "strengths": ["strength 1", "strength 2", "strength 3"],
@@ -904,41 +1444,358 @@ Provide JSON in this format:
   "overall_score": <integer 1–10>
 }
 """
+    return summary_prompt
+
+def _average_score(sess):
+    scores = Transcript(sess).scores()
+    return round(sum(scores)/len(scores)) if scores else 5
+
+def _rolling_summary(sess):
+    """The summary folded in answer by answer, or None when the full summary call is needed"""
+    if SUMMARY_MODE != 'incremental':
+        return None
+    return RollingSummary.from_dict(sess.get('rolling_summary')).summary()
+
+def _save_summary(sess, summary):
+    """Keep summary as the interview's summary for the current transcript version"""
+    sess['summary_artifact'] = {'version': Transcript(sess).version, 'summary': summary}
+    return summary
+
+def _cached_summary(sess):
+    """The summary for the current transcript if one exists without an LLM call, else None"""
+    artifact = sess.get('summary_artifact')
+    if artifact and artifact['version'] == Transcript(sess).version:
+        return artifact['summary']
+    rolling = _rolling_summary(sess)
+    return _save_summary(sess, rolling) if rolling is not None else None
+
+def _generated_summary(sess, summary_resp):
+    """Store a freshly generated summary; None (and nothing stored) if it is unusable"""
+    summary = validate_summary(summary_resp)
+    if summary is None:
+        return None
+    if summary.overall_score is None:
+        summary.overall_score = _average_score(sess)
+    return _save_summary(sess, summary.to_dict())
+
+def _interview_summary(sess):
+    """The interview's summary, generated at most once per transcript version; None if generation fails.
+
+    /summary, /export_pdf and any other export share it, so page refreshes
+    and repeated downloads cost no LLM calls until another answer is stored.
+    """
+    summary = _cached_summary(sess)
+    if summary is None:
+        summary = _generated_summary(sess, get_ai_response(_interview_summary_prompt(sess), **SUMMARY_REQUEST))
+    return summary
+
+def _history_store():
+    """The history store, or None when it is disabled or its database is unreachable"""
+    try:
+        return get_history_store()
+    except Exception as e:
+        app.logger.error(f"History store unavailable: {e}")
+        return None
+
+def _record_history(sess):
+    """Add the finished interview to the history; a database error must not fail the answer"""
+    store = _history_store()
+    if store is None:
+        return
+    try:
+        candidate_id = sess.setdefault('candidate_id', uuid.uuid4().hex)
+        store.record(candidate_id, sess.get('job_role'), sess.get('interview_type'),
+                     sess.get('domain') if sess.get('interview_type') == 'Technical' else 'N/A',
+                     sess.get('overall_score'))
+    except Exception as e:
+        app.logger.error(f"Failed to record interview history: {e}")
+
+def _complete_interview(sess, evaluation, summary_resp):
+    """Store the final summary (or a fallback) and build the completion payload"""
+    summary = validate_summary(summary_resp)
+    if summary is not None:
+        if summary.overall_score is None:
+            summary.overall_score = _average_score(sess)
+        sess['overall_score'] = summary.overall_score
+        sess['summary_generated'] = True
+        interview_summary = summary.to_dict()
+    else:
+        # fallback summary
+        sess['overall_score'] = _average_score(sess)
+        sess['summary_generated'] = True
+        interview_summary = {
+            "strengths": ["Good communication", "Structured thinking", "Problem-solving approach"],
+            "improvements": ["Add more specific examples", "Include metrics and outcomes", "Expand technical depth"],
+            "resources": ["Practice coding problems on LeetCode", "Study system design patterns", "Review industry best practices"],
+            "overall_score": sess['overall_score']
+        }
+
+    # Mark interview as complete
+    sess['interview_complete'] = True
+    _save_summary(sess, interview_summary)
+    _record_history(sess)
+    
+    return {
+        'status': 'complete',
+        **evaluation,
+        'summary': interview_summary
+    }
+
+def _advance_interview(question_index, evaluation):
+    """Move past question_index; evaluation holds the feedback fields to echo back"""
+    # Next question or finish
+    payload = _next_question_payload(session, question_index, evaluation)
+    if payload is not None:
+        return payload
+    # --- Generate summary at the end ---
+    summary_resp = _rolling_summary(session)
+    if summary_resp is None:
+        summary_resp = get_ai_response(_interview_summary_prompt(session), expect_json=True, max_tokens=400, priority=NORMAL)
+    return _complete_interview(session, evaluation, summary_resp)
+
+def _score_answer(prompt):
+    """Background job body: evaluate one answer"""
+    return get_ai_response(prompt, expect_json=True, max_tokens=400, priority=CRITICAL)
+
+def _collect_scoring_jobs(sess, wait_timeout=0):
+    """Move finished background evaluations into the session, in question order.
+
+    Waits up to wait_timeout seconds per outstanding job. Returns the
+    evaluations stored by this call, keyed by job id.
+    """
+    collected = {}
+    pending = sess.get('pending_feedback', [])
+    while pending:
+        entry = pending[0]
+        job = scoring_queue.wait(entry['job_id'], wait_timeout)
+        if job is None:
+            if scoring_queue.get(entry['job_id']) is not None or \
+                    time.time() - entry.get('submitted', 0) < scoring_queue.result_ttl:
+                # Still running, here or on the worker that took the answer
+                break
+            # Its worker went away, or the result expired, before anyone collected it
+            app.logger.warning(f"Scoring job {entry['job_id']} not found, using fallback feedback")
+            feedback = {"error": "Scoring job result unavailable"}
+        else:
+            feedback = job.result if job.status == DONE else {"error": job.error}
+        collected[entry['job_id']] = _store_evaluation(sess, entry['turn'], feedback)
+        pending = pending[1:]
+        sess['pending_feedback'] = pending
+    return collected
+
+def _drop_pending_feedback(sess, reason):
+    """Give every still-pending background evaluation fallback feedback"""
+    dropped = {}
+    for entry in sess.pop('pending_feedback', []):
+        app.logger.warning(f"Scoring job {entry['job_id']} not collected ({reason}), using fallback feedback")
+        dropped[entry['job_id']] = _store_evaluation(sess, entry['turn'], {"error": reason})
+    return dropped
 
-            summary_resp = get_ai_response(summary_prompt, expect_json=True, max_tokens=400)
+def _settle_pending_feedback(sess):
+    """Fold in every background evaluation, waiting up to SCORING_WAIT_TIMEOUT; stragglers get fallback feedback"""
+    if sess.get('pending_feedback'):
+        _collect_scoring_jobs(sess, SCORING_WAIT_TIMEOUT)
+        _drop_pending_feedback(sess, "Scoring timed out")
 
-            if isinstance(summary_resp, dict) and not summary_resp.get('error'):
-                session['overall_score'] = int(summary_resp.get('overall_score',  round(sum(session['feedback_scores'])/len(session['feedback_scores'])) ))
-                session['summary_generated'] = True
-                interview_summary = summary_resp
+def _record_answer_async(question_index, user_answer, job):
+    """Store an answer whose evaluation runs as a background job and move on.
+
+    Earlier evaluations that already finished are folded in on the way; on
+    the last question all outstanding jobs are awaited so the summary sees
+    every score.
+    """
+    turn_index = _append_turn(session, question_index, user_answer, job.id)
+    session['pending_feedback'] = session.get('pending_feedback', []) + [
+        {'job_id': job.id, 'index': question_index, 'turn': turn_index, 'submitted': job.created}
+    ]
+
+    is_last = question_index >= len(session['questions']) - 1
+    collected = _collect_scoring_jobs(session, SCORING_WAIT_TIMEOUT if is_last else 0)
+    if is_last:
+        # Stragglers past the timeout are scored with fallback feedback so
+        # the summary can still be built
+        collected.update(_drop_pending_feedback(session, "Scoring timed out"))
+    evaluation = collected.get(job.id) or {'feedback_pending': True}
+    evaluation['job_id'] = job.id
+    return _advance_interview(question_index, evaluation)
+
+def _check_answer(sess, data):
+    """Validate a submitted answer against the session.
+
+    Returns (question_index, question, user_answer, None) or
+    (None, None, None, error_message).
+    """
+    if not sess.get('interview_started') or 'questions' not in sess:
+        return None, None, None, 'Interview not configured yet'
+        
+    if not data:
+        return None, None, None, 'No answer provided'
+        
+    user_answer = data.get('answer', '').strip()
+    if not user_answer:
+        return None, None, None, 'Please provide an answer'
+        
+    question_index = sess.get('current_question_index', 0)
+    questions = sess.get('questions', [])
+    
+    if question_index >= len(questions):
+        return None, None, None, 'Invalid question index'
+    
+    return question_index, questions[question_index], user_answer, None
+
+def _answer_context():
+    """_check_answer for the current Flask request.
+
+    Returns (question_index, question, user_answer, None) or
+    (None, None, None, error_response).
+    """
+    question_index, question, user_answer, error_message = _check_answer(session, request.get_json())
+    if error_message:
+        return None, None, None, (jsonify({'status': 'error', 'message': error_message}), 400)
+    return question_index, question, user_answer, None
+
+@app.route('/submit_answer', methods=['POST'])
+def submit_answer():
+    try:
+        question_index, question, user_answer, error_response = _answer_context()
+        if error_response:
+            return error_response
+
+        prompt = _feedback_prompt(question, user_answer, session.get('interview_type', 'Technical'), session.get('job_role'))
+
+        if (request.get_json() or {}).get('async'):
+            try:
+                job = scoring_queue.submit('answer_scoring', _score_answer, prompt)
+            except QueueFull as e:
+                app.logger.warning(f"Scoring queue full, scoring synchronously: {e}")
             else:
-                # fallback summary
-                avg_score = round(sum(session['feedback_scores'])/len(session['feedback_scores'])) if session['feedback_scores'] else 5
-                session['overall_score'] = avg_score
-                session['summary_generated'] = True
-                interview_summary = {
-                    "strengths": ["Good communication", "Structured thinking", "Problem-solving approach"],
-                    "improvements": ["Add more specific examples", "Include metrics and outcomes", "Expand technical depth"],
-                    "resources": ["Practice coding problems on LeetCode", "Study system design patterns", "Review industry best practices"],
-                    "overall_score": session['overall_score']
-                }
+                return jsonify(_record_answer_async(question_index, user_answer, job))
 
-            # Mark interview as complete
-            session['interview_complete'] = True
-            session['final_summary'] = interview_summary
-            
-            return jsonify({
-                'status': 'complete',
-                'feedback': normalized_feedback_text,
-                'score': normalized_score,
-                'corrections': normalized_corrections,
-                'summary': interview_summary
-            })
+        # Call AI
+        feedback = get_ai_response(prompt, expect_json=True, max_tokens=400, priority=CRITICAL)
+
+        return jsonify(_record_answer(question_index, user_answer, feedback))
 
     except Exception as e:
         app.logger.error(f"Error in submit_answer: {str(e)}", exc_info=True)
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/submit_answer_stream', methods=['POST'])
+def submit_answer_stream():
+    """Stream answer feedback to the browser over Server-Sent Events.
+
+    Events: 'feedback_delta' (new feedback text as it is generated), 'field'
+    (a feedback/score/suggestions/corrections value once it is complete),
+    'done' (the full result plus a signed commit token) and 'error'.
+    The session is not touched here: the browser posts the token to
+    /submit_answer_commit once, which records the result and advances.
+    """
+    try:
+        question_index, question, user_answer, error_response = _answer_context()
+        if error_response:
+            return error_response
+
+        prompt = _feedback_prompt(question, user_answer, session.get('interview_type', 'Technical'), session.get('job_role'))
+        interview_id = session.get('interview_id')
+    except Exception as e:
+        app.logger.error(f"Error in submit_answer_stream: {str(e)}", exc_info=True)
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+    def generate():
+        parser = StreamingJSONParser()
+        sent_text = ''
+        try:
+            for delta in stream_ai_response(prompt, max_tokens=400, priority=CRITICAL):
+                for name, value in parser.feed(delta):
+                    if name in FEEDBACK_FIELDS:
+                        yield _sse('field', {'name': name, 'value': value})
+                feedback_text = parser.partial_string('feedback')
+                if feedback_text and len(feedback_text) > len(sent_text):
+                    yield _sse('feedback_delta', {'text': feedback_text[len(sent_text):]})
+                    sent_text = feedback_text
+        except (AIStreamError, requests.exceptions.RequestException) as e:
+            app.logger.warning(f"Streaming feedback failed: {e}")
+            yield _sse('error', {'message': str(e)})
+            return
+
+        feedback = dict(parser.fields) if {'feedback', 'score'} & parser.fields.keys() else None
+        if feedback is None:
+            feedback = _parse_json_like(parser.buffer, prompt)
+        evaluation = _normalize_feedback(feedback, user_answer)
+        token = _stream_commit_serializer().dumps({
+            'interview_id': interview_id,
+            'question_index': question_index,
+            'answer': user_answer,
+            'feedback': feedback if isinstance(feedback, dict) else None
+        })
+        yield _sse('done', {
+            'feedback': evaluation.feedback,
+            'score': evaluation.score,
+            'corrections': evaluation.corrections,
+            'commit_token': token
+        })
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/submit_answer_commit', methods=['POST'])
+def submit_answer_commit():
+    """Record a streamed evaluation in the session exactly once"""
+    try:
+        data = request.get_json() or {}
+        try:
+            committed = _stream_commit_serializer().loads(data.get('commit_token', ''), max_age=STREAM_COMMIT_MAX_AGE)
+        except BadSignature:
+            return jsonify({'status': 'error', 'message': 'Invalid or expired feedback token'}), 400
+
+        question_index = session.get('current_question_index', 0)
+        questions = session.get('questions', [])
+        if (not session.get('interview_started') or committed['interview_id'] != session.get('interview_id')
+                or committed['question_index'] != question_index or question_index >= len(questions)):
+            return jsonify({'status': 'error', 'message': 'This answer was already recorded'}), 409
+
+        return jsonify(_record_answer(question_index, committed['answer'], committed['feedback']))
+
+    except Exception as e:
+        app.logger.error(f"Error in submit_answer_commit: {str(e)}", exc_info=True)
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/feedback_status/<job_id>')
+def feedback_status(job_id):
+    """Poll (or long-poll with ?wait=N seconds) a background answer evaluation"""
+    try:
+        entry = next((e for e in session.get('pending_feedback', []) if e['job_id'] == job_id), None)
+        if entry is not None:
+            wait_seconds = min(max(request.args.get('wait', 0, type=float), 0), 30)
+            if wait_seconds:
+                scoring_queue.wait(job_id, wait_seconds)
+            collected = _collect_scoring_jobs(session, 0)
+            if job_id not in collected:
+                return jsonify({'status': 'pending', 'job_id': job_id, 'question_index': entry['index'] + 1})
+            return jsonify({'status': 'done', 'job_id': job_id, 'question_index': entry['index'] + 1, **collected[job_id]})
+
+        # Already folded into the session by an earlier poll or answer
+        for turn in Transcript(session):
+            if turn.job_id == job_id and turn.scored:
+                return jsonify({
+                    'status': 'done',
+                    'job_id': job_id,
+                    'question_index': turn.question_id + 1,
+                    'feedback': turn.feedback,
+                    'score': turn.score,
+                    'corrections': turn.corrections
+                })
+        return jsonify({'status': 'error', 'message': 'Unknown feedback job'}), 404
+
+    except Exception as e:
+        app.logger.error(f"Error in feedback_status: {str(e)}", exc_info=True)
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
 
 @app.route('/current_question', methods=['GET'])
 def current_question():
@@ -964,197 +1821,200 @@ def current_question():
 
 @app.route('/history')
 def get_history():
+    """One page of the caller's finished interviews, newest first: ?limit=&before=<next_before>&role=&type=&domain="""
     try:
-        # Return empty history for now (no database)
-        return jsonify([])
+        limit = min(max(int(request.args.get('limit', HISTORY_PAGE_SIZE)), 1), HISTORY_PAGE_MAX)
+        store = _history_store()
+        candidate_id = session.get('candidate_id')
+        if store is None or not candidate_id:
+            return jsonify({'items': [], 'next_before': None})
+        return jsonify(store.page(candidate_id, request.args.get('before'), limit, request.args.get('role'),
+                                  request.args.get('type'), request.args.get('domain')))
+    except ValueError as e:
+        return jsonify({'error': f"Invalid history query: {e}"}), 400
     except Exception as e:
         app.logger.error(f"Error in get_history: {str(e)}", exc_info=True)
-        return jsonify([])
+        return jsonify({'items': [], 'next_before': None})
+
+def _report_description(sess):
+    """Everything the PDF report shows, as plain data for pdf_report"""
+    # Summary - the interview's stored summary, generated once if there is none yet
+    summary = None
+    if len(Transcript(sess)) > 0:
+        try:
+            summary = _interview_summary(sess)
+        except Exception as e:
+            app.logger.warning(f"Failed to generate AI summary for PDF: {e}")
+
+    return describe_report(sess, summary)
 
 @app.route('/export_pdf')
 def export_pdf():
+    """Download the report; rendered off-thread once per content hash, which is also the ETag.
+
+    The PDF is streamed from its file, so the worker never holds the whole document.
+    """
     try:
-        buffer = BytesIO()
-        p = canvas.Canvas(buffer, pagesize=letter)
-        width, height = letter
-
-        # Title
-        p.setFont('Helvetica-Bold', 16)
-        p.drawString(100, height - 100, 'Interview Simulation Report')
-        p.setFont('Helvetica', 12)
-        p.drawString(100, height - 130, f'Job Role: {session.get("job_role", "N/A")}')
-        p.drawString(100, height - 150, f'Interview Type: {session.get("interview_type", "N/A")}')
-        if session.get('interview_type') == 'Technical':
-            p.drawString(100, height - 170, f'Domain: {session.get("domain", "N/A")}')
-        p.drawString(100, height - 190, f'Date: {datetime.now().strftime("%Y-%m-%d %H:%M")}')
-
-        # Summary - Try to generate AI summary for PDF
-        y_position = height - 230
-        summary = None
-        
-        # Try to generate AI summary for PDF if we have answers
-        if session.get('user_answers') and len(session.get('user_answers', [])) > 0:
-            try:
-                pdf_prompt = (
-                    f"Generate a brief interview summary for a {session.get('interview_type', 'Technical')} interview for {session.get('job_role', 'Software Engineer')} position. "
-                    f"Provide 3 strengths, 3 improvements, 3 resources, and an overall score (1-10). "
-                    f"Respond in JSON format with keys: strengths, improvements, resources, overall_score."
-                )
-                pdf_summary = get_ai_response(pdf_prompt, expect_json=True, max_tokens=400)
-                if isinstance(pdf_summary, dict) and not pdf_summary.get('error'):
-                    summary = pdf_summary
-            except Exception as e:
-                app.logger.warning(f"Failed to generate AI summary for PDF: {e}")
-        
-        # Fallback to hardcoded summary
-        if not summary:
-            summary = {
-                'strengths': ['Clear communication style', 'Good problem-solving approach', 'Structured thinking'],
-                'improvements': ['Provide more specific examples', 'Include metrics and outcomes', 'Expand technical depth'],
-                'resources': ['Practice coding problems on LeetCode', 'Study system design patterns', 'Review industry best practices'],
-                'overall_score': session.get('overall_score', 7)
-            }
-        
-        p.setFont('Helvetica-Bold', 14)
-        p.drawString(100, y_position, 'Summary')
-        y_position -= 30
-
-        p.setFont('Helvetica-Bold', 12)
-        p.drawString(100, y_position, 'Strengths:')
-        y_position -= 20
-        p.setFont('Helvetica', 12)
-        for strength in summary.get('strengths', []):
-            p.drawString(120, y_position, f'• {strength}')
-            y_position -= 20
-
-        p.setFont('Helvetica-Bold', 12)
-        p.drawString(100, y_position, 'Areas for Improvement:')
-        y_position -= 20
-        p.setFont('Helvetica', 12)
-        for improvement in summary.get('improvements', []):
-            p.drawString(120, y_position, f'• {improvement}')
-            y_position -= 20
-
-        p.setFont('Helvetica-Bold', 12)
-        p.drawString(100, y_position, 'Suggested Resources:')
-        y_position -= 20
-        p.setFont('Helvetica', 12)
-        for resource in summary.get('resources', []):
-            p.drawString(120, y_position, f'• {resource}')
-            y_position -= 20
-
-        p.setFont('Helvetica-Bold', 12)
-        p.drawString(100, y_position, f'Overall Score: {summary.get("overall_score", "N/A")}/10')
-
-        p.showPage()
-        p.save()
-
-        buffer.seek(0)
-        return send_file(buffer, as_attachment=True, download_name='interview_report.pdf', mimetype='application/pdf')
+        report = _report_description(session)
+        etag = report_key(report)
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            source = open_report(report, etag, get_report_cache(), get_report_renderer())
+            response = send_file(source, as_attachment=True, download_name='interview_report.pdf', mimetype='application/pdf')
+        response.set_etag(etag)
+        # Per-candidate content: browsers may keep it but must revalidate
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    except RenderTimeout as e:
+        # The render carries on and lands in the cache, so a retry is usually served from there
+        app.logger.warning(f"export_pdf: {e}")
+        response = jsonify({'error': 'The report is taking longer than usual to prepare. Please try again shortly.'})
+        response.headers['Retry-After'] = '5'
+        return response, 503
     except Exception as e:
         app.logger.error(f"Error in export_pdf: {str(e)}", exc_info=True)
         return jsonify({'error': str(e)}), 500
 
+def _summary_page_data(sess, summary_content):
+    """Generate summary data from session"""
+    ai_summary = validate_summary(summary_content)
+    transcript = Transcript(sess)
+    return {
+        'job_role': sess.get('job_role', 'Software Engineer'),
+        'interview_type': sess.get('interview_type', 'Technical'),
+        'domain': sess.get('domain', 'General'),
+        'overall_score': sess.get('overall_score', 7),
+        'feedback_scores': transcript.scores(),
+        'questions': sess.get('questions', []),
+        'user_answers': transcript.answers(),
+        'feedback_details': transcript.details(),
+        'summary_generated': sess.get('summary_generated', False),
+        'ai_summary': ai_summary.to_dict() if ai_summary is not None else None
+    }
+
 @app.route('/summary')
 def summary_page():
     """Render the summary page"""
     try:
         if not session.get('feedback_received') and not session.get('interview_complete'):
             return redirect('/')
+
+        # Fold in background evaluations that finished since the last answer
+        if session.get('pending_feedback'):
+            _collect_scoring_jobs(session, SCORING_WAIT_TIMEOUT)
         
-        # Use final summary if available, otherwise try to generate AI summary
-        summary_content = session.get('final_summary')
+        # The interview's stored summary, generated once if there is none yet
+        summary_content = None
         
-        if not summary_content and session.get('user_answers') and len(session.get('user_answers', [])) > 0:
+        if len(Transcript(session)) > 0:
             try:
-                summary_prompt = (
-                    f"Generate a comprehensive interview summary for a {session.get('interview_type', 'Technical')} interview for {session.get('job_role', 'Software Engineer')} position. "
-                    f"Based on the interview responses, provide 3 specific strengths, 3 concrete improvements, 3 practical resources, and an overall score (1-10). "
-                    f"Respond in JSON format with keys: strengths, improvements, resources, overall_score."
-                )
-                summary_content = get_ai_response(summary_prompt, expect_json=True, max_tokens=500)
+                summary_content = _interview_summary(session)
             except Exception as e:
                 app.logger.warning(f"Failed to generate AI summary for summary page: {e}")
         
-        # Generate summary data from session
-        summary_data = {
-            'job_role': session.get('job_role', 'Software Engineer'),
-            'interview_type': session.get('interview_type', 'Technical'),
-            'domain': session.get('domain', 'General'),
-            'overall_score': session.get('overall_score', 7),
-            'feedback_scores': session.get('feedback_scores', []),
-            'questions': session.get('questions', []),
-            'user_answers': session.get('user_answers', []),
-            'feedback_details': session.get('feedback_details', []),
-            'summary_generated': session.get('summary_generated', False),
-            'ai_summary': summary_content if isinstance(summary_content, dict) and not summary_content.get('error') else None
-        }
-        
-        return render_template('summary.html', summary=summary_data)
+        return render_template('summary.html', summary=_summary_page_data(session, summary_content))
     except Exception as e:
         app.logger.error(f"Error in summary_page: {str(e)}", exc_info=True)
         return redirect('/')
 
+FALLBACK_TIPS = [
+    "Research the company and role thoroughly before the interview",
+    "Prepare specific examples using the STAR method (Situation, Task, Action, Result)",
+    "Practice explaining technical concepts in simple terms",
+    "Ask thoughtful questions about the team, projects, and company culture",
+    "Follow up with a thank you email within 24 hours"
+]
+
+def _tips_prompt(job_role, interview_type):
+    return (
+        f"Generate 5 practical interview tips for a {interview_type.lower()} interview for a {job_role} position. "
+        f"Make them specific, actionable, and relevant to the role. "
+        f"Respond as a JSON array of strings, each tip being one string."
+    )
+
+def _tips_fallback_prompts(job_role, interview_type):
+    return [
+        f"Give 5 interview tips for {job_role} position. Return as JSON array.",
+        f"List 5 tips for {interview_type.lower()} interviews. Use JSON format.",
+        f"Provide 5 interview advice for {job_role}. Return as JSON array."
+    ]
+
+def _interview_tips(job_role, interview_type, abandoned=None, deadline=None):
+    """Generate AI-based interview tips; returns (payload, status_code).
+
+    Shared by /interview_tips and the prefetch /configure starts. Gives up at
+    deadline (a time.monotonic() value, TIPS_DEADLINE from now by default).
+    Once the abandoned event is set no fallback prompts are sent.
+    """
+    if deadline is None:
+        deadline = time.monotonic() + TIPS_DEADLINE
+    tips_response = _ai_response_before(deadline, _tips_prompt(job_role, interview_type), abandoned=abandoned, **TIPS_REQUEST)
+    result = _tips_result(tips_response, abandoned)
+    if result is not None:
+        return result
+    fallback_tips = _first_valid_response(_tips_fallback_prompts(job_role, interview_type), validate_tips, deadline, **TIPS_FALLBACK)
+    return _fallback_tips_result(fallback_tips)
+
+def _tips_result(tips_response, abandoned=None):
+    """(payload, status_code) the main tips prompt's response settles, or None to race the fallback prompts"""
+    tips = validate_tips(tips_response)
+    if tips is not None:
+        return {'status': 'success', 'tips': tips.to_list()}, 200
+    if _fake_ai_enabled():
+        # In FAKE_AI mode, use hardcoded fallback
+        return {'status': 'success', 'tips': list(FALLBACK_TIPS)}, 200
+    
+    # Tips are optional: don't spend more requests once the limiter started shedding
+    if isinstance(tips_response, dict) and tips_response.get('rate_limited'):
+        app.logger.info(f"Tips generation shed by rate limiter: {tips_response['error']}")
+        return {'status': 'error', 'message': 'Tips are temporarily unavailable.'}, 503
+    if _is_abandoned(abandoned):
+        return {'status': 'error', 'message': 'Tips are no longer needed.'}, 503
+    
+    # Try multiple AI fallback approaches when AI is enabled
+    app.logger.warning(f"Tips generation failed, trying AI fallback. Detail: {tips_response}")
+    return None
+
+def _fallback_tips_result(fallback_tips):
+    """(payload, status_code) for the fallback race's TipList, or its failure"""
+    if fallback_tips is not None:
+        return {'status': 'success', 'tips': fallback_tips.to_list()}, 200
+    # If all AI attempts fail, return error instead of hardcoded
+    app.logger.error("All AI attempts failed for tips generation")
+    return {'status': 'error', 'message': 'Failed to generate tips. Please try again.'}, 500
+
+def _prefetch_interview_content(sess):
+    """Start fetching the tips the interview page loads next, alongside question generation"""
+    prefetcher.start(sess['interview_id'], 'tips', _interview_tips, sess['job_role'], sess['interview_type'])
+
+def _prefetched_tips(prefetched, deadline):
+    """/interview_tips's (payload, status_code) without a live call, or None to generate tips before deadline.
+
+    A successful prefetch is served as is. Waiting for the prefetch comes out
+    of the same TIPS_DEADLINE, so a failed prefetch is only retried live with
+    the time that is left, and its own answer is served once none is.
+    """
+    if prefetched is not NOT_PREFETCHED and (prefetched[1] == 200 or time.monotonic() >= deadline):
+        return prefetched
+    if time.monotonic() >= deadline:
+        # Still prefetching at the deadline: a second request would only add load
+        return {'status': 'error', 'message': 'Tips are temporarily unavailable.'}, 503
+    return None
+
 @app.route('/interview_tips')
 def get_interview_tips():
-    """Generate AI-based interview tips"""
+    """Interview tips, from the prefetch /configure started when there is one"""
     try:
-        job_role = session.get('job_role', 'Software Engineer')
-        interview_type = session.get('interview_type', 'Technical')
-        
-        tips_prompt = (
-            f"Generate 5 practical interview tips for a {interview_type.lower()} interview for a {job_role} position. "
-            f"Make them specific, actionable, and relevant to the role. "
-            f"Respond as a JSON array of strings, each tip being one string."
-        )
-        
-        tips_response = get_ai_response(tips_prompt, expect_json=True, max_tokens=400)
-        
-        if isinstance(tips_response, list) and len(tips_response) >= 3:
-            return jsonify({
-                'status': 'success',
-                'tips': tips_response
-            })
-        else:
-            # Try multiple AI fallback approaches when AI is enabled
-            fake_ai = os.getenv('FAKE_AI', 'false').lower() in ['1', 'true', 'yes']
-            
-            if not fake_ai:
-                app.logger.warning(f"Tips generation failed, trying AI fallback. Detail: {tips_response}")
-                
-                fallback_attempts = [
-                    f"Give 5 interview tips for {job_role} position. Return as JSON array.",
-                    f"List 5 tips for {interview_type.lower()} interviews. Use JSON format.",
-                    f"Provide 5 interview advice for {job_role}. Return as JSON array."
-                ]
-                
-                for i, fallback_prompt in enumerate(fallback_attempts):
-                    app.logger.info(f"Trying AI tips fallback attempt {i+1}")
-                    fallback_tips = get_ai_response(fallback_prompt, expect_json=True, max_tokens=300)
-                    
-                    if isinstance(fallback_tips, list) and len(fallback_tips) >= 3:
-                        return jsonify({
-                            'status': 'success',
-                            'tips': fallback_tips
-                        })
-                else:
-                    # If all AI attempts fail, return error instead of hardcoded
-                    app.logger.error("All AI attempts failed for tips generation")
-                    return jsonify({'status': 'error', 'message': 'Failed to generate tips. Please try again.'}), 500
-            else:
-                # In FAKE_AI mode, use hardcoded fallback
-                fallback_tips = [
-                    "Research the company and role thoroughly before the interview",
-                    "Prepare specific examples using the STAR method (Situation, Task, Action, Result)",
-                    "Practice explaining technical concepts in simple terms",
-                    "Ask thoughtful questions about the team, projects, and company culture",
-                    "Follow up with a thank you email within 24 hours"
-                ]
-                return jsonify({
-                    'status': 'success',
-                    'tips': fallback_tips
-                })
-            
+        # A prefetch still in flight is awaited rather than duplicated
+        deadline = time.monotonic() + TIPS_DEADLINE
+        prefetched = prefetcher.take(session.get('interview_id'), 'tips', timeout=TIPS_DEADLINE)
+        result = _prefetched_tips(prefetched, deadline)
+        if result is None:
+            result = _interview_tips(session.get('job_role', 'Software Engineer'),
+                                     session.get('interview_type', 'Technical'), deadline=deadline)
+        payload, status_code = result
+        return jsonify(payload), status_code
     except Exception as e:
         app.logger.error(f"Error generating interview tips: {str(e)}")
         return jsonify({
@@ -1166,7 +2026,12 @@ def get_interview_tips():
 def clear_session():
     """Clear the current session data"""
     try:
+        prefetcher.cancel(session.get('interview_id'))
+        # The candidate id keys the history store; clearing the interview must not orphan it
+        candidate_id = session.get('candidate_id')
         session.clear()
+        if candidate_id:
+            session['candidate_id'] = candidate_id
         return jsonify({'status': 'success', 'message': 'Session cleared'})
     except Exception as e:
         app.logger.error(f"Error clearing session: {str(e)}")